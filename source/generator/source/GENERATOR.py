@@ -37,13 +37,14 @@ import uuid
 
 from objects import objects
 from objects.GENERATOR_logic import GeneratorLogic
-from env_generator.phase_3.test_handler import TestHandler as TestHandler_3
+from environment_workers import EnvironmentWorkerPool, RemoteTestHandler, WarmEnvironmentPool
 
 
 class ThreadedTestHandler(threading.Thread):
     def __init__(self, domain: str, novelty: int, difficulty: str, seed: int, trial_novelty: int,
                  day_offset: int, response_queue: queue.Queue, use_image: bool,
-                 ta2_generator_config: dict, hint_level: int, phase: str):
+                 ta2_generator_config: dict, hint_level: int, phase: str,
+                 warm_pool: WarmEnvironmentPool):
         threading.Thread.__init__(self)
         self.domain = domain
         self.novelty = novelty
@@ -56,45 +57,24 @@ class ThreadedTestHandler(threading.Thread):
         self.ta2_generator_config = copy.deepcopy(ta2_generator_config)
         self.hint_level = hint_level
         self.phase = phase
+        self.warm_pool = warm_pool
 
         self.is_done = False
         return
 
     def run(self):
         # Initialize GENERATOR here with novelty, difficulty, and seed.
-        if self.phase == objects.PHASE_2:
-            from env_generator.phase_2.test_handler import TestHandler as TestHandler_2
-            self.response_queue.put(TestHandler_2(domain=self.domain,
-                                                  novelty=self.novelty,
-                                                  difficulty=self.difficulty,
-                                                  seed=self.seed,
-                                                  trial_novelty=self.trial_novelty,
-                                                  day_offset=self.day_offset,
-                                                  use_img=self.use_image,
-                                                  ta2_generator_config=self.ta2_generator_config))
-        elif self.phase == objects.PHASE_3:
-            self.response_queue.put(TestHandler_3(domain=self.domain,
-                                                  novelty=self.novelty,
-                                                  difficulty=self.difficulty,
-                                                  seed=self.seed,
-                                                  trial_novelty=self.trial_novelty,
-                                                  day_offset=self.day_offset,
-                                                  use_img=self.use_image,
-                                                  ta2_generator_config=self.ta2_generator_config,
-                                                  hint_level=self.hint_level,
-                                                  phase=self.phase))
-        elif self.phase in [objects.PHASE_4A, objects.PHASE_4B]:
-            from env_generator.phase_4.test_handler import TestHandler as TestHandler_4
-            self.response_queue.put(TestHandler_4(domain=self.domain,
-                                                  novelty=self.novelty,
-                                                  difficulty=self.difficulty,
-                                                  seed=self.seed,
-                                                  trial_novelty=self.trial_novelty,
-                                                  day_offset=self.day_offset,
-                                                  use_img=self.use_image,
-                                                  ta2_generator_config=self.ta2_generator_config,
-                                                  hint_level=self.hint_level,
-                                                  phase=self.phase))
+        self.response_queue.put(self.warm_pool.acquire(
+            domain=self.domain,
+            novelty=self.novelty,
+            difficulty=self.difficulty,
+            seed=self.seed,
+            trial_novelty=self.trial_novelty,
+            day_offset=self.day_offset,
+            use_image=self.use_image,
+            ta2_generator_config=self.ta2_generator_config,
+            hint_level=self.hint_level,
+            phase=self.phase))
         while not self.is_done:
             time.sleep(0.1)
         return
@@ -119,6 +99,32 @@ class GeneratorAgent(GeneratorLogic):
         self.episode_data_count = None
         self.last_label = dict()
         self.episode_score = list()
+
+        # Environments of finished episodes are kept to be reset for the next ones.
+        warm_pool_size = self.config.getint('sail-on', 'warm_pool_size')
+        self.warm_pool = WarmEnvironmentPool(log=self.log, size=warm_pool_size)
+
+        # Step the environments in worker processes when asked to, otherwise in this one.
+        self.worker_pool = None
+        worker_processes = self.config.getint('sail-on', 'worker_processes')
+        if worker_processes > 0:
+            self.worker_pool = EnvironmentWorkerPool(
+                log=self.log,
+                processes=worker_processes,
+                max_environments=self.max_environments,
+                frame_size=self.config.getint('sail-on', 'frame_buffer_bytes'),
+                warm_pool_size=warm_pool_size,
+                idle_function=self.amqp.process_data_events)
+            self.worker_pool.start()
+        return
+
+    def run(self):
+        try:
+            super().run()
+        finally:
+            if self.worker_pool is not None:
+                self.worker_pool.stop()
+            self.warm_pool.clear()
         return
 
     def get_novelty_description(self, domain: str, novelty: int, difficulty: str) -> dict:
@@ -133,6 +139,20 @@ class GeneratorAgent(GeneratorLogic):
         self.is_episode_done = False
 
         self.GENERATOR = None
+        if self.worker_pool is not None:
+            self.GENERATOR = self.worker_pool.start_environment(
+                domain=domain,
+                novelty=novelty,
+                difficulty=difficulty,
+                seed=seed,
+                trial_novelty=trial_novelty,
+                day_offset=day_offset,
+                use_image=use_image,
+                ta2_generator_config=ta2_generator_config,
+                hint_level=hint_level,
+                phase=phase)
+            return
+
         response_queue = queue.Queue()
         # Initialize GENERATOR here with novelty, difficulty, and seed.
         threaded_gen = ThreadedTestHandler(domain=domain,
@@ -145,7 +165,8 @@ class GeneratorAgent(GeneratorLogic):
                                            use_image=use_image,
                                            ta2_generator_config=ta2_generator_config,
                                            hint_level=hint_level,
-                                           phase=phase)
+                                           phase=phase,
+                                           warm_pool=self.warm_pool)
         threaded_gen.start()
         while self.GENERATOR is None:
             try:
@@ -198,6 +219,10 @@ class GeneratorAgent(GeneratorLogic):
         else:
             self.log.debug('Server comms cut')
 
+        if isinstance(self.GENERATOR, RemoteTestHandler):
+            self.GENERATOR.close()
+        elif self.GENERATOR is not None:
+            self.warm_pool.release(test_handler=self.GENERATOR)
         del self.GENERATOR
         self.GENERATOR = None
         return
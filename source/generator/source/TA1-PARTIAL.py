@@ -30,6 +30,7 @@ import logging.handlers
 import optparse
 import pika
 import psycopg2
+import psycopg2.pool
 import pytz
 import queue
 import random
@@ -38,7 +39,7 @@ import sys
 import threading
 import time
 import uuid
-from psycopg2.extras import Json
+from psycopg2.extras import Json, execute_batch
 
 from objects import rabbitmq
 from objects import objects
@@ -49,7 +50,8 @@ class LiveGeneratorThread(threading.Thread):
                  amqp_port: str, amqp_vhost: str, amqp_ssl: bool, ta2_response_queue: queue.Queue,
                  live_output_queue: queue.Queue, domain: str, novelty: int, difficulty: str,
                  seed: int, trial_novelty: int, day_offset: int, request_timeout: int,
-                 use_image: bool, generator_config: dict, hint_level: int, phase: str):
+                 use_image: bool, generator_config: dict, hint_level: int, phase: str,
+                 binary_transport: bool = False, wire_codec: str = None):
         threading.Thread.__init__(self)
         self.name = 'LiveGeneratorThread'
         self.log = log.getChild(self.name)
@@ -59,6 +61,8 @@ class LiveGeneratorThread(threading.Thread):
         self.amqp_port = amqp_port
         self.amqp_vhost = amqp_vhost
         self.amqp_ssl = amqp_ssl
+        self.binary_transport = binary_transport
+        self.wire_codec = wire_codec
         self.request_timeout = abs(request_timeout - 5)
         self.ta2_response_queue = ta2_response_queue
         self.live_output_queue = live_output_queue
@@ -84,7 +88,9 @@ class LiveGeneratorThread(threading.Thread):
                                         amqp_port=self.amqp_port,
                                         amqp_vhost=self.amqp_vhost,
                                         amqp_ssl=self.amqp_ssl,
-                                        request_timeout=self.request_timeout)
+                                        request_timeout=self.request_timeout,
+                                        binary_transport=self.binary_transport,
+                                        wire_codec=self.wire_codec)
         self.log.debug('Initialized')
         return
 
@@ -111,13 +117,13 @@ class LiveGeneratorThread(threading.Thread):
             try:
                 # Try getting a message to send.
                 message = self.ta2_response_queue.get(block=True, timeout=0.2)
-                self.log.debug('message: {}'.format(str(message)))
+                self.log.debug('message: %s', rabbitmq.LogSummary(message))
 
                 response = None
                 try:
                     # If we have a message, we can send it to the generator.
                     response = self.amqp.send_generator_data(data_request=message)
-                    self.log.debug('response: {}'.format(str(response)))
+                    self.log.debug('response: %s', rabbitmq.LogSummary(response))
                 except objects.AiqExperimentException:
                     self.log.warning('Generator took too long to respond.')
                     response = objects.ExperimentException(
@@ -204,8 +210,620 @@ class LogMessage:
         self.action = action
         self.message = message
         self.data_object = copy.deepcopy(data_object)
+        self.utc_stamp = objects.epoch_to_stamp(time.time())
+        return
+
+
+class TestInstanceRecord:
+    """Everything written to the database for a single step: the data row for live episodes,
+    the test_instance row and, once the prediction arrives, the test_label row.
+    """
+    def __init__(self, trial_episode_id: int, data_id: int = None, episode_id: int = None,
+                 feature_vector: dict = None, label: dict = None, data_index: int = None):
+        self.trial_episode_id = trial_episode_id
+        self.data_id = data_id
+        self.episode_id = episode_id
+        self.feature_vector = None
+        if feature_vector is not None:
+            # Images are never stored in the database.
+            self.feature_vector = dict({k: v for k, v in feature_vector.items() if k != 'image'})
+        self.label = label
+        self.data_index = data_index
+        self.utc_stamp_sent = objects.epoch_to_stamp(time.time())
+        self.utc_stamp_received = None
+        self.utc_remote_stamp_arrived = None
+        self.utc_remote_stamp_replied = None
+        self.has_label = False
+        self.label_prediction = None
+        self.performance = None
+        self.feedback = None
+        return
+
+    def set_received(self, remote_stamp_arrived: datetime.datetime,
+                     remote_stamp_replied: datetime.datetime):
+        self.utc_stamp_received = objects.epoch_to_stamp(time.time())
+        self.utc_remote_stamp_arrived = remote_stamp_arrived
+        self.utc_remote_stamp_replied = remote_stamp_replied
+        return
+
+    def set_label(self, label_prediction: dict, performance: float, feedback: dict = None):
+        self.has_label = True
+        self.label_prediction = label_prediction
+        self.performance = performance
+        self.feedback = feedback
+        return
+
+
+class EpisodeSizeRecord:
+    def __init__(self, episode_id: int, size: int):
+        self.episode_id = episode_id
+        self.size = size
+        return
+
+
+class PreparedStatements:
+    """Registry of statements that are PREPAREd once on a connection and then run by name, so
+    the server does not parse and plan them again for every row.
+    """
+    def __init__(self):
+        self.statements = dict()
+        return
+
+    def register(self, name: str, sql: str, num_params: int):
+        self.statements[name] = dict({'sql': sql,
+                                      'execute': 'EXECUTE {} ({})'.format(
+                                          name, ', '.join(['%s'] * num_params))})
+        return
+
+    def prepare(self, cr):
+        # Start clean, a pooled connection may have been prepared by an earlier holder.
+        cr.execute('DEALLOCATE ALL;')
+        for name, statement in self.statements.items():
+            cr.execute('PREPARE {} AS {};'.format(name, statement['sql']))
+        return
+
+    def execute(self, cr, name: str, data: tuple):
+        cr.execute(self.statements[name]['execute'], data)
+        return
+
+    def execute_rows(self, cr, name: str, rows: list):
+        if len(rows) > 0:
+            execute_batch(cr, self.statements[name]['execute'], rows, page_size=len(rows))
+        return
+
+
+WRITER_STATEMENTS = PreparedStatements()
+WRITER_STATEMENTS.register(
+    name='reserve_ids',
+    sql='SELECT nextval($1::regclass) FROM generate_series(1, $2)',
+    num_params=2)
+WRITER_STATEMENTS.register(
+    name='insert_data',
+    sql=('INSERT INTO data (data_id, episode_id, feature_vector, label, data_index) '
+         'VALUES ($1, $2, $3, $4, $5)'),
+    num_params=5)
+WRITER_STATEMENTS.register(
+    name='insert_test_instance',
+    sql=('INSERT INTO test_instance (test_instance_id, trial_episode_id, data_id, '
+         'utc_stamp_sent, utc_stamp_received, utc_remote_stamp_arrived, '
+         'utc_remote_stamp_replied) VALUES ($1, $2, $3, $4, $5, $6, $7)'),
+    num_params=7)
+WRITER_STATEMENTS.register(
+    name='insert_test_label',
+    sql=('INSERT INTO test_label (test_instance_id, label_prediction, performance, feedback) '
+         'VALUES ($1, $2, $3, $4)'),
+    num_params=4)
+WRITER_STATEMENTS.register(
+    name='insert_experiment_log',
+    sql=('INSERT INTO experiment_log (model_experiment_id, experiment_trial_id, utc_stamp, '
+         'action, message, object) VALUES ($1, $2, $3, $4, $5, $6)'),
+    num_params=6)
+WRITER_STATEMENTS.register(
+    name='update_episode_size',
+    sql='UPDATE episode SET size=$1 WHERE episode_id=$2',
+    num_params=2)
+
+
+class DatabaseFlush:
+    def __init__(self):
+        self.done = threading.Event()
+        self.errors = list()
+        return
+
+
+class DatabaseWriterThread(threading.Thread):
+    """Write-behind for the per-step rows and the experiment_log.  Records are committed in
+    batches on a connection of its own, once batch_size records are waiting, the oldest has
+    waited flush_seconds, or a flush() is requested.  A lost connection retries the whole batch,
+    so nothing queued is lost.
+    """
+    def __init__(self, log: logging.Logger, db_pool: psycopg2.pool.ThreadedConnectionPool,
+                 batch_size: int, flush_seconds: float, name: str = 'DatabaseWriterThread'):
+        threading.Thread.__init__(self)
+        self.name = name
+        self.log = log.getChild(self.name)
+        self.db_pool = db_pool
+        self.db_conn = None
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self.write_queue = queue.Queue()
+        self.reserved_ids = dict()
+        self.errors = list()
+        self.done = False
+        self.log.debug('Initialized')
+        return
+
+    def run(self):
+        self.log.debug('run()')
+        self.reconnect_db()
+        batch = list()
+        flush_at = None
+        while not self.done or not self.write_queue.empty():
+            timeout = 0.2
+            if flush_at is not None:
+                timeout = min(timeout, max(0.0, flush_at - time.time()))
+            flush = None
+            try:
+                item = self.write_queue.get(block=True, timeout=timeout)
+                if isinstance(item, DatabaseFlush):
+                    flush = item
+                else:
+                    batch.append(item)
+                    if flush_at is None:
+                        flush_at = time.time() + self.flush_seconds
+            except queue.Empty:
+                pass
+
+            if len(batch) > 0 and (flush is not None or len(batch) >= self.batch_size
+                                   or time.time() >= flush_at):
+                self.write_batch(batch=batch)
+                batch = list()
+                flush_at = None
+            if flush is not None:
+                flush.errors = self.errors
+                self.errors = list()
+                flush.done.set()
+
+        if len(batch) > 0:
+            self.write_batch(batch=batch)
+        if self.db_conn is not None:
+            self.db_pool.putconn(self.db_conn, key=self.name)
+            self.db_conn = None
+        self.log.debug('exiting')
+        return
+
+    def stop(self):
+        self.log.debug('stop()')
+        self.done = True
+        return
+
+    def put(self, record):
+        self.write_queue.put(record)
+        return
+
+    def flush(self, timeout: float = None) -> list:
+        """Blocks until everything queued so far is committed and returns the error messages
+        collected since the last flush.
+        """
+        errors = list()
+        if self.is_alive():
+            flush = DatabaseFlush()
+            self.write_queue.put(flush)
+            if flush.done.wait(timeout=timeout):
+                errors = flush.errors
+            else:
+                errors.append('Timed out waiting for the database writes to finish.')
+        return errors
+
+    def reconnect_db(self, force: bool = False):
+        if force and self.db_conn is not None:
+            self.db_pool.putconn(self.db_conn, key=self.name, close=True)
+            self.db_conn = None
+        while self.db_conn is None or self.db_conn.closed != 0:
+            if self.db_conn is not None:
+                self.db_pool.putconn(self.db_conn, key=self.name, close=True)
+                self.db_conn = None
+            try:
+                self.db_conn = self.db_pool.getconn(key=self.name)
+                with self.db_conn:
+                    with self.db_conn.cursor() as cr:
+                        WRITER_STATEMENTS.prepare(cr=cr)
+            except psycopg2.Error as e:
+                self.log.error("Error trying to connect to the database: " + str(e.pgerror))
+                if self.db_conn is not None:
+                    self.db_pool.putconn(self.db_conn, key=self.name, close=True)
+                    self.db_conn = None
+                time.sleep(1)
+        return
+
+    def write_batch(self, batch: list):
+        self.log.debug('write_batch({} records)'.format(len(batch)))
+        written = False
+        while not written:
+            try:
+                with self.db_conn:
+                    with self.db_conn.cursor() as cr:
+                        self.write_records(cr=cr, records=batch)
+                written = True
+            except (psycopg2.InterfaceError, psycopg2.OperationalError) as e:
+                # The transaction never committed, reconnect and write the whole batch again.
+                self.log.error("{}: {}".format(type(e).__name__, str(e.pgerror)))
+                self.reconnect_db(force=True)
+            except psycopg2.DatabaseError as e:
+                self.log.error("psycopg2.DatabaseError: " + str(e.pgerror))
+                # Write the records one at a time so a single bad row does not drop the batch.
+                for record in batch:
+                    try:
+                        with self.db_conn:
+                            with self.db_conn.cursor() as cr:
+                                self.write_records(cr=cr, records=[record])
+                    except psycopg2.DatabaseError as e:
+                        self.log.error("psycopg2.DatabaseError: " + str(e.pgerror))
+                        self.errors.append("There were errors writing to the database.")
+                written = True
+        return
+
+    def allocate_ids(self, cr, sequence: str, count: int) -> list:
+        """Hands out count ids from sequence, reserving at least batch_size at a time so most
+        batches never ask the database for ids.
+        """
+        reserved = self.reserved_ids.setdefault(sequence, list())
+        if len(reserved) < count:
+            data = (sequence,
+                    max(count - len(reserved), self.batch_size),)
+            WRITER_STATEMENTS.execute(cr=cr, name='reserve_ids', data=data)
+            reserved.extend([row[0] for row in cr.fetchall()])
+        ids = reserved[:count]
+        del reserved[:count]
+        return ids
+
+    def write_records(self, cr, records: list):
+        data_rows = list()
+        test_instance_rows = list()
+        test_label_rows = list()
+        experiment_log_rows = list()
+        episode_sizes = dict()
+        steps = [x for x in records if isinstance(x, TestInstanceRecord)]
+        new_data_ids = iter(self.allocate_ids(
+            cr=cr,
+            sequence='data_data_id_seq',
+            count=len([x for x in steps if x.data_id is None])))
+        test_instance_ids = iter(self.allocate_ids(cr=cr,
+                                                   sequence='test_instance_test_instance_id_seq',
+                                                   count=len(steps)))
+        for record in records:
+            if isinstance(record, EpisodeSizeRecord):
+                episode_sizes[record.episode_id] = record.size
+                continue
+            if isinstance(record, LogMessage):
+                data_object = None
+                if record.data_object is not None:
+                    data_object = Json(record.data_object)
+                experiment_log_rows.append((record.model_experiment_id,
+                                            record.experiment_trial_id,
+                                            record.utc_stamp,
+                                            record.action,
+                                            record.message,
+                                            data_object,))
+                continue
+            data_id = record.data_id
+            if data_id is None:
+                data_id = next(new_data_ids)
+                data_rows.append((data_id,
+                                  record.episode_id,
+                                  Json(record.feature_vector),
+                                  Json(record.label),
+                                  record.data_index,))
+            test_instance_id = next(test_instance_ids)
+            test_instance_rows.append((test_instance_id,
+                                       record.trial_episode_id,
+                                       data_id,
+                                       record.utc_stamp_sent,
+                                       record.utc_stamp_received,
+                                       record.utc_remote_stamp_arrived,
+                                       record.utc_remote_stamp_replied,))
+            if record.has_label:
+                feedback = None
+                if record.feedback is not None:
+                    feedback = Json(record.feedback)
+                test_label_rows.append((test_instance_id,
+                                        Json(record.label_prediction),
+                                        record.performance,
+                                        feedback,))
+        WRITER_STATEMENTS.execute_rows(cr=cr, name='insert_data', rows=data_rows)
+        WRITER_STATEMENTS.execute_rows(cr=cr, name='insert_test_instance', rows=test_instance_rows)
+        WRITER_STATEMENTS.execute_rows(cr=cr, name='insert_test_label', rows=test_label_rows)
+        WRITER_STATEMENTS.execute_rows(cr=cr, name='insert_experiment_log',
+                                       rows=experiment_log_rows)
+        WRITER_STATEMENTS.execute_rows(cr=cr, name='update_episode_size',
+                                       rows=[(size, episode_id) for episode_id, size in
+                                             episode_sizes.items()])
+        return
+
+
+class DataPrefetchThread(threading.Thread):
+    """Read-ahead for recorded episodes.  Windows of data rows are streamed on a connection of
+    its own through a server-side cursor and handed back in fetch_size chunks, which the TA1
+    thread merges into its data_cache with collect() or wait_for().  Only the TA1 thread calls
+    prefetch(), collect(), wait_for() and reset().
+    """
+    def __init__(self, log: logging.Logger, db_pool: psycopg2.pool.ThreadedConnectionPool,
+                 fetch_size: int = 25):
+        threading.Thread.__init__(self)
+        self.name = 'DataPrefetchThread'
+        self.log = log.getChild(self.name)
+        self.db_pool = db_pool
+        self.db_conn = None
+        self.fetch_size = fetch_size
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        # Bumped by reset() so windows loaded for an older experiment are thrown away.
+        self.generation = 0
+        # [episode_id] = first data_index not requested yet.
+        self.requested = dict()
+        # [episode_id] = first data_index not loaded yet.
+        self.loaded = dict()
+        # [episode_id] = first data_index a window failed to load, until prefetch() retries it.
+        self.failed = dict()
+        self.done = False
+        self.log.debug('Initialized')
+        return
+
+    def run(self):
+        self.log.debug('run()')
+        while not self.done:
+            try:
+                job = self.jobs.get(block=True, timeout=0.2)
+                self.load_window(generation=job[0],
+                                 episode_id=job[1],
+                                 start=job[2],
+                                 stop=job[3])
+            except queue.Empty:
+                pass
+        if self.db_conn is not None:
+            self.db_pool.putconn(self.db_conn, key=self.name)
+            self.db_conn = None
+        self.log.debug('exiting')
+        return
+
+    def stop(self):
+        self.log.debug('stop()')
+        self.done = True
+        return
+
+    def reconnect_db(self):
+        while not self.done and (self.db_conn is None or self.db_conn.closed != 0):
+            if self.db_conn is not None:
+                self.db_pool.putconn(self.db_conn, key=self.name, close=True)
+                self.db_conn = None
+            try:
+                self.db_conn = self.db_pool.getconn(key=self.name)
+            except psycopg2.Error as e:
+                self.log.error("Error trying to connect to the database: " + str(e.pgerror))
+                time.sleep(1)
+        return
+
+    def load_window(self, generation: int, episode_id: int, start: int, stop: int):
+        self.log.debug('load_window(episode_id={}, start={}, stop={})'.format(episode_id,
+                                                                              start,
+                                                                              stop))
+        loaded = False
+        failed = False
+        while not loaded and not failed and not self.done and generation == self.generation:
+            self.reconnect_db()
+            try:
+                with self.db_conn:
+                    with self.db_conn.cursor(name='{}_{}_{}'.format(self.name.lower(),
+                                                                    episode_id,
+                                                                    start)) as cr:
+                        sql = ('SELECT data_index, feature_vector, label, data_id FROM data '
+                               'WHERE episode_id=%s AND data_index>=%s AND data_index<%s '
+                               'ORDER BY data_index;')
+                        data = (episode_id,
+                                start,
+                                stop,)
+                        cr.execute(sql, data)
+                        rows = cr.fetchmany(self.fetch_size)
+                        while len(rows) > 0 and generation == self.generation:
+                            self.results.put((generation, episode_id, None, rows, None))
+                            # A retry only needs what has not been handed over yet.
+                            start = rows[-1][0] + 1
+                            rows = cr.fetchmany(self.fetch_size)
+                loaded = True
+            except (psycopg2.InterfaceError, psycopg2.OperationalError) as e:
+                self.log.error("{}: {}".format(type(e).__name__, str(e.pgerror)))
+                self.db_pool.putconn(self.db_conn, key=self.name, close=True)
+                self.db_conn = None
+            except psycopg2.DatabaseError as e:
+                self.log.error("psycopg2.DatabaseError: " + str(e.pgerror))
+                failed = True
+        # Always mark the window as finished so nobody waits on it forever, a failed window is
+        # marked from the first row that was not handed over so it can be asked for again.
+        if failed:
+            self.results.put((generation, episode_id, None, None, start))
+        else:
+            self.results.put((generation, episode_id, stop, None, None))
+        return
+
+    def prefetch(self, episode_id: int, start: int, stop: int):
+        if episode_id in self.failed:
+            # Ask for the rows of a failed window again before moving on.
+            start = min(start, self.failed[episode_id])
+        start = max(start, self.requested.get(episode_id, 0))
+        if start < stop:
+            self.failed.pop(episode_id, None)
+            self.requested[episode_id] = stop
+            self.jobs.put((self.generation, episode_id, start, stop))
+        return
+
+    def merge(self, data_cache: dict, result: tuple):
+        generation, episode_id, stop, rows, failed = result
+        if generation != self.generation:
+            return
+        if failed is not None:
+            # Nothing from failed on is loaded, the next prefetch() asks for it again.
+            self.requested[episode_id] = min(failed, self.requested.get(episode_id, 0))
+            self.failed[episode_id] = min(failed, self.failed.get(episode_id, failed))
+            if episode_id in self.loaded:
+                self.loaded[episode_id] = min(failed, self.loaded[episode_id])
+            return
+        if episode_id not in data_cache:
+            data_cache[episode_id] = dict()
+        if rows is not None:
+            for row in rows:
+                data_cache[episode_id][row[0]] = dict({
+                    'data_index': row[0],
+                    'feature_vector': row[1],
+                    'label': row[2],
+                    'data_id': row[3]})
+        if stop is not None:
+            self.loaded[episode_id] = max(stop, self.loaded.get(episode_id, 0))
+            if episode_id in self.failed:
+                self.loaded[episode_id] = min(self.failed[episode_id], self.loaded[episode_id])
         return
 
+    def collect(self, data_cache: dict):
+        try:
+            while True:
+                self.merge(data_cache=data_cache, result=self.results.get(block=False))
+        except queue.Empty:
+            pass
+        return
+
+    def wait_for(self, data_cache: dict, episode_id: int, data_index: int, timeout: float,
+                 idle_function=None) -> bool:
+        """Blocks until the row at data_index is in data_cache, or known not to exist.  Returns
+        False if the row did not arrive within timeout seconds, or loading it failed.
+        """
+        self.collect(data_cache=data_cache)
+        if episode_id in self.failed or self.requested.get(episode_id, 0) <= data_index:
+            self.prefetch(episode_id=episode_id, start=data_index, stop=data_index + 1)
+        end_time = time.time() + timeout
+        while data_index not in data_cache.get(episode_id, dict()) \
+                and self.loaded.get(episode_id, 0) <= data_index:
+            if time.time() >= end_time:
+                return False
+            if self.failed.get(episode_id, data_index + 1) <= data_index:
+                return False
+            try:
+                self.merge(data_cache=data_cache, result=self.results.get(block=True,
+                                                                          timeout=1.0))
+            except queue.Empty:
+                if idle_function is not None:
+                    idle_function()
+        return True
+
+    def reset(self):
+        self.generation += 1
+        self.requested = dict()
+        self.loaded = dict()
+        self.failed = dict()
+        return
+
+
+class MaintenanceThread(threading.Thread):
+    """Housekeeping that an experiment does not need to wait for, run on a connection of its
+    own.  clear_abandoned_trials() queues a cleanup of trials abandoned for over an hour, which
+    resets them a batch at a time with set-based statements.
+    """
+    def __init__(self, log: logging.Logger, db_pool: psycopg2.pool.ThreadedConnectionPool,
+                 batch_size: int = 10):
+        threading.Thread.__init__(self)
+        self.name = 'MaintenanceThread'
+        self.log = log.getChild(self.name)
+        self.db_pool = db_pool
+        self.db_conn = None
+        self.batch_size = max(1, batch_size)
+        self.clear_requested = threading.Event()
+        self.done = False
+        self.log.debug('Initialized')
+        return
+
+    def run(self):
+        self.log.debug('run()')
+        while not self.done:
+            if self.clear_requested.wait(timeout=0.2):
+                self.clear_requested.clear()
+                cleared = self.batch_size
+                while cleared == self.batch_size and not self.done:
+                    cleared = self.clear_abandoned_batch()
+        if self.db_conn is not None:
+            self.db_pool.putconn(self.db_conn, key=self.name)
+            self.db_conn = None
+        self.log.debug('exiting')
+        return
+
+    def stop(self):
+        self.log.debug('stop()')
+        self.done = True
+        return
+
+    def clear_abandoned_trials(self):
+        # Requests made while a cleanup is already waiting are folded into it.
+        self.clear_requested.set()
+        return
+
+    def reconnect_db(self):
+        while not self.done and (self.db_conn is None or self.db_conn.closed != 0):
+            if self.db_conn is not None:
+                self.db_pool.putconn(self.db_conn, key=self.name, close=True)
+                self.db_conn = None
+            try:
+                self.db_conn = self.db_pool.getconn(key=self.name)
+            except psycopg2.Error as e:
+                self.log.error("Error trying to connect to the database: " + str(e.pgerror))
+                time.sleep(1)
+        return
+
+    def clear_abandoned_batch(self) -> int:
+        self.log.debug('clear_abandoned_batch()')
+        cleared = 0
+        self.reconnect_db()
+        if self.db_conn is None:
+            return cleared
+        try:
+            with self.db_conn:
+                with self.db_conn.cursor() as cr:
+                    # The row locks are held until commit, SKIP LOCKED leaves the trials another
+                    # TA1 is clearing to that TA1.
+                    sql = ('SELECT experiment_trial_id FROM experiment_trial WHERE '
+                           'is_active=%s AND is_complete=%s AND '
+                           'utc_last_updated<(NOW() - interval\'1 hour\') '
+                           'LIMIT %s FOR UPDATE SKIP LOCKED;')
+                    data = (True,
+                            False,
+                            self.batch_size,)
+                    cr.execute(sql, data)
+                    trial_ids = list()
+                    for row in cr.fetchall():
+                        trial_ids.append(row[0])
+                    if len(trial_ids) > 0:
+                        sql = ('DELETE FROM test_instance USING trial_episode WHERE '
+                               'test_instance.trial_episode_id=trial_episode.trial_episode_id '
+                               'AND trial_episode.experiment_trial_id=ANY(%s);')
+                        data = (trial_ids,)
+                        cr.execute(sql, data)
+                        sql = ('UPDATE trial_episode SET novelty=NULL, performance=NULL, '
+                               'novelty_probability=NULL, novelty_characterization=NULL, '
+                               'novelty_threshold=NULL, utc_stamp_started=NULL, '
+                               'utc_stamp_ended=NULL WHERE experiment_trial_id=ANY(%s);')
+                        data = (trial_ids,)
+                        cr.execute(sql, data)
+                        sql = ('UPDATE experiment_trial SET locked_by=NULL, is_active=%s, '
+                               'utc_last_updated=NULL WHERE experiment_trial_id=ANY(%s);')
+                        data = (False,
+                                trial_ids,)
+                        cr.execute(sql, data)
+                        self.log.info('Cleared abandoned experiment_trials {}'.format(trial_ids))
+                    self.db_conn.commit()
+                    cleared = len(trial_ids)
+        except psycopg2.InterfaceError as e:
+            self.log.error("psycopg2.InterfaceError: " + str(e.pgerror))
+            self.reconnect_db()
+        except psycopg2.DatabaseError as e:
+            self.log.error("psycopg2.DatabaseError: " + str(e.pgerror))
+        return cleared
+
 
 class TA1:
     def __init__(self, options):
@@ -324,12 +942,18 @@ class TA1:
         self.db_name = objects.DATABASE_PATTERN.format(config.get('postgresql', 'database'))
         self.log.warning('database: {}'.format(self.db_name))
         self.db_conn = None
+        self.db_pool = None
+        self.db_write_batch_size = config.getint('postgresql', 'write_batch_size')
+        self.db_write_flush_seconds = config.getfloat('postgresql', 'write_flush_seconds')
         self.amqp_user = config.get("amqp", "user")
         self.amqp_pass = config.get("amqp", "pass")
         self.amqp_host = config.get("amqp", "host")
         self.amqp_vhost = config.get("amqp", "vhost")
         self.amqp_port = config.getint("amqp", "port")
         self.amqp_ssl = config.getboolean("amqp", "ssl")
+        self.amqp_binary = config.getboolean("amqp", "binary_transport")
+        self.amqp_codec = config.get("amqp", "wire_codec")
+        objects.set_zero_copy(config.getboolean("amqp", "zero_copy"))
         self._AMQP_EXPERIMENT_TIMEOUT = config.getint('sail-on', 'normal_timeout_seconds')
         self._AMQP_EXPERIMENT_TIMEOUT -= 5
         if self.is_testing and not self.is_demo:
@@ -425,12 +1049,17 @@ class TA1:
         self.sota_client_ex_req = None
         self.sota_client_ex_response = None
         self.private_queue = None
-        # [dataset_id][episode_index] = dict( episode_id, data_index )
+        # [(dataset_id, episode_index)] = dict( episode_id, data_index )
         self.episode_cache = dict()
         # [episode_id] = episode_index
         self.episode_index_cache = dict()
-        # [domain_id][data_type][novelty][difficulty][trial_novelty] = dict(various dataset things)
+        # [episode_id] = dataset_id
+        self.episode_dataset_ids = dict()
+        # [(domain_id, data_type, novelty, difficulty, trial_novelty)] = dict(dataset things)
         self.dataset_cache = dict()
+        # The episode prepare_episode() resolved and its episode_cache entry.
+        self._current_episode = None
+        self._current_episode_entry = None
         # [episode_id][data_index] = dict( data stuff )
         self.data_cache = dict()
         self.domain_cache = list()
@@ -480,7 +1109,13 @@ class TA1:
         self._TEST_WINDOW_BEFORE_NOVEL = random.randint(200, 4000)
         self._TEST_WINDOW_PROGRESS = 0
         self._DATA_CACHE_SIZE = 100
-        self._DATA_CACHE_RELOAD = 2
+        # Read the next window ahead once half of the current one has been used.
+        self._DATA_CACHE_RELOAD = int(self._DATA_CACHE_SIZE / 2)
+        # Key of the pooled database connection used by the experiment steps.
+        self._DB_TICK_KEY = 'tick'
+        # One connection for each key, the steps, the two writer threads, the data prefetcher
+        # and the maintenance thread.
+        self._DB_POOL_SIZE = 5
         self._VALID_DATA_TYPES = list(['train', 'test'])
         self._TorN = 0
         self._TorN_OPTIONS = list([0, 0])
@@ -488,6 +1123,8 @@ class TA1:
         self._live_thread = None
         self._ta2_response = queue.Queue()
         self._live_output = queue.Queue()
+        self._pending_test_instance = None
+        self._live_episode_sizes = dict()
         self._experiment = None
         self._exper_train_index = None
         self._exper_novelty_index = None
@@ -508,7 +1145,9 @@ class TA1:
                                         amqp_port=self.amqp_port,
                                         amqp_vhost=self.amqp_vhost,
                                         amqp_ssl=self.amqp_ssl,
-                                        request_timeout=self._AMQP_EXPERIMENT_TIMEOUT)
+                                        request_timeout=self._AMQP_EXPERIMENT_TIMEOUT,
+                                        binary_transport=self.amqp_binary,
+                                        wire_codec=self.amqp_codec)
 
         self.subscribe_experiment_queue()
         self.subscribe_sota_queue()
@@ -516,6 +1155,24 @@ class TA1:
 
         self.connect_db()
         self.reconnect_db()
+        self.db_writer = DatabaseWriterThread(log=self.log,
+                                              db_pool=self.db_pool,
+                                              batch_size=self.db_write_batch_size,
+                                              flush_seconds=self.db_write_flush_seconds)
+        self.db_writer.start()
+        # The experiment_log gets a writer of its own, so audit rows never queue behind steps.
+        self.log_writer = DatabaseWriterThread(log=self.log,
+                                               db_pool=self.db_pool,
+                                               batch_size=self.db_write_batch_size,
+                                               flush_seconds=self.db_write_flush_seconds,
+                                               name='ExperimentLogWriterThread')
+        self.log_writer.start()
+        self.data_prefetcher = DataPrefetchThread(log=self.log,
+                                                  db_pool=self.db_pool)
+        self.data_prefetcher.start()
+        self.maintenance = MaintenanceThread(log=self.log,
+                                             db_pool=self.db_pool)
+        self.maintenance.start()
         random.seed(time.time())
         return
 
@@ -528,6 +1185,8 @@ class TA1:
         config.set("postgresql", "host", "hostname")
         config.set("postgresql", "port", "port")
         config.set("postgresql", "database", "database")
+        config.set("postgresql", "write_batch_size", "100")
+        config.set("postgresql", "write_flush_seconds", "1.0")
         config.add_section("amqp")
         config.set("amqp", "user", "username")
         config.set("amqp", "pass", "password")
@@ -535,6 +1194,9 @@ class TA1:
         config.set("amqp", "vhost", "/")
         config.set("amqp", "port", "5671")
         config.set("amqp", "ssl", "True")
+        config.set("amqp", "binary_transport", "False")
+        config.set("amqp", "wire_codec", objects.WIRE_CODEC_JSON)
+        config.set("amqp", "zero_copy", "False")
         # For SOTA, we will only accept a connection that can provide a pre-shared
         # username and secret, defined in the config file.
         config.add_section('sota')
@@ -605,6 +1267,8 @@ class TA1:
         return
 
     def publish_analysis(self, model_experiment_id: int):
+        # The analysis reads the experiment_log, so it has to be written first.
+        self.log_writer.flush(timeout=self._AMQP_EXPERIMENT_TIMEOUT)
         analysis_ready = objects.AnalysisReady(model_experiment_id=model_experiment_id)
 
         self.amqp.publish_to_queue(queue_name=objects.ANALYSIS_READY_QUEUE,
@@ -613,6 +1277,7 @@ class TA1:
 
     def publish_partial_analysis(self, model_experiment_id: int = None,
                                  experiment_trial_id: int = None):
+        self.log_writer.flush(timeout=self._AMQP_EXPERIMENT_TIMEOUT)
         analysis_partial = objects.AnalysisPartial(
             model_experiment_id=model_experiment_id,
             experiment_trial_id=experiment_trial_id)
@@ -628,25 +1293,42 @@ class TA1:
         self.log.debug("start()")
 
         x = True
-        while x:
-            try:
-                self.amqp.run()
-                self.amqp.start_consuming()
-                x = False
-            except KeyboardInterrupt:
-                break
+        try:
+            while x:
+                try:
+                    self.amqp.run()
+                    self.amqp.start_consuming()
+                    x = False
+                except KeyboardInterrupt:
+                    break
+        finally:
+            # Commit whatever is still waiting to be written before exiting.
+            self.db_writer.stop()
+            self.log_writer.stop()
+            self.data_prefetcher.stop()
+            self.maintenance.stop()
+            self.db_writer.join()
+            self.log_writer.join()
+            self.data_prefetcher.join()
+            self.maintenance.join()
         return
 
     def connect_db(self):
-        """Creates the psycopg2 connection to the postgres database.
+        """Creates the psycopg2 connection pool to the postgres database and takes the connection
+        used by the experiment steps from it.
         """
         self.log.debug("connect_db()")
         try:
-            self.db_conn = psycopg2.connect(database=self.db_name,
-                                            host=self.db_host,
-                                            port=self.db_port,
-                                            user=self.db_user,
-                                            password=self.db_pass)
+            if self.db_pool is None:
+                self.db_pool = psycopg2.pool.ThreadedConnectionPool(
+                    minconn=1,
+                    maxconn=self._DB_POOL_SIZE,
+                    database=self.db_name,
+                    host=self.db_host,
+                    port=self.db_port,
+                    user=self.db_user,
+                    password=self.db_pass)
+            self.db_conn = self.db_pool.getconn(key=self._DB_TICK_KEY)
         except psycopg2.Error as e:
             self.log.error("Error trying to connect to the database: " + str(e.pgerror))
             time.sleep(1)
@@ -660,56 +1342,22 @@ class TA1:
         while self.db_conn is None:
             self.connect_db()
         while self.db_conn.closed != 0:
-            self.connect_db()
+            self.db_pool.putconn(self.db_conn, key=self._DB_TICK_KEY, close=True)
+            self.db_conn = None
+            while self.db_conn is None:
+                self.connect_db()
+        return
+
+    def log_sql(self, cr, sql: str, data: tuple):
+        # mogrify formats the whole statement on the client, only pay for that when debugging.
+        if self.log.isEnabledFor(logging.DEBUG):
+            self.log.debug(cr.mogrify(sql, data))
         return
 
     def log_message(self, msg: LogMessage):
-        try:
-            with self.db_conn:
-                with self.db_conn.cursor() as cr:
-                    self.log.debug('{}   {}   {}'.format(msg.action, msg.message, msg.data_object))
-                    if msg.message is None and msg.data_object is None:
-                        sql = ('INSERT INTO experiment_log (model_experiment_id, action) '
-                               'VALUES (%s, %s) RETURNING experiment_log_id;')
-                        data = (msg.model_experiment_id,
-                                msg.action,)
-                    elif msg.message is not None and msg.data_object is None:
-                        sql = ('INSERT INTO experiment_log (model_experiment_id, action, message) '
-                               'VALUES (%s, %s, %s) RETURNING experiment_log_id;')
-                        data = (msg.model_experiment_id,
-                                msg.action,
-                                msg.message,)
-                    elif msg.message is None and msg.data_object is not None:
-                        sql = ('INSERT INTO experiment_log (model_experiment_id, action, object) '
-                               'VALUES (%s, %s, %s) RETURNING experiment_log_id;')
-                        data = (msg.model_experiment_id,
-                                msg.action,
-                                Json(msg.data_object),)
-                    else:
-                        sql = ('INSERT INTO experiment_log (model_experiment_id, action, message, '
-                               'object) VALUES (%s, %s, %s, %s) RETURNING experiment_log_id;')
-                        data = (msg.model_experiment_id,
-                                msg.action,
-                                msg.message,
-                                Json(msg.data_object),)
-                    self.log.debug(cr.mogrify(sql, data))
-                    cr.execute(sql, data)
-                    self.db_conn.commit()
-                    if msg.experiment_trial_id is not None:
-                        row = cr.fetchone()
-                        if row is not None:
-                            experiment_log_id = row[0]
-                            sql = ('UPDATE experiment_log SET experiment_trial_id=%s '
-                                   'WHERE experiment_log_id=%s;')
-                            data = (msg.experiment_trial_id,
-                                    experiment_log_id)
-                            cr.execute(sql, data)
-                            self.db_conn.commit()
-        except psycopg2.InterfaceError as e:
-            self.log.error("psycopg2.InterfaceError: " + str(e.pgerror))
-            self.reconnect_db()
-        except psycopg2.DatabaseError as e:
-            self.log.error("psycopg2.DatabaseError: " + str(e.pgerror))
+        self.log.debug('log_message(%s, %s, %s)', msg.action, msg.message,
+                       rabbitmq.LogSummary(msg.data_object))
+        self.log_writer.put(msg)
         return
 
     def handle_user(self, aiq_username: str, aiq_secret: str, errormsgs: list):
@@ -1082,115 +1730,9 @@ class TA1:
             errormsgs.append("There were errors getting the experiment json.")
         return experiment
 
-    def lock_experiment_trial_to_clear(self, errormsgs: list) -> int:
-        self.log.debug('lock_experiment_trial_to_clear()')
-        experiment_trial_id = None
-        try:
-            my_uuid = str(uuid.uuid4())
-            is_locked = False
-            max_wait = 10.0
-            end_time = float(time.time()) + max_wait
-            while not is_locked and float(time.time()) < end_time:
-                with self.db_conn:
-                    with self.db_conn.cursor() as cr:
-                        sql = ('SELECT experiment_trial_id FROM experiment_trial WHERE '
-                               'is_active=%s AND is_complete=%s AND '
-                               'utc_last_updated<(NOW() - interval\'1 hour\') LIMIT 1;')
-                        data = (True,
-                                False,)
-                        self.log.debug(cr.mogrify(sql, data))
-                        cr.execute(sql, data)
-                        row = cr.fetchone()
-                        if row is None:
-                            # There is no available trial, so no point in trying again.
-                            is_locked = True
-                        elif row is not None:
-                            ext_id = row[0]
-                            sql = ('UPDATE experiment_trial SET locked_by=%s, '
-                                   'utc_last_updated=NOW() WHERE '
-                                   'is_active=%s AND is_complete=%s AND '
-                                   'utc_last_updated<(NOW() - interval\'1 hour\') AND '
-                                   'experiment_trial_id=%s;')
-                            data = (my_uuid,
-                                    True,
-                                    False,
-                                    ext_id,)
-                            cr.execute(sql, data)
-                            self.db_conn.commit()
-                            sql = ('SELECT experiment_trial_id FROM experiment_trial WHERE '
-                                   'locked_by=%s AND experiment_trial_id=%s;')
-                            data = (my_uuid,
-                                    ext_id,)
-                            cr.execute(sql, data)
-                            row = cr.fetchone()
-                            if row is not None:
-                                if row[0] is not None:
-                                    experiment_trial_id = row[0]
-                                    is_locked = True
-                            if not is_locked:
-                                self.amqp.sleep(duration=(random.random() / 2.0))
-        except psycopg2.InterfaceError as e:
-            self.log.error("psycopg2.InterfaceError: " + str(e.pgerror))
-            errormsgs.append("Database connection unavailable, please try again in a few minutes")
-            self.reconnect_db()
-        except psycopg2.DatabaseError as e:
-            self.log.error("psycopg2.DatabaseError: " + str(e.pgerror))
-            errormsgs.append("There were errors locking the experiment_trial for clearing.")
-        return experiment_trial_id
-
-    def clear_abandoned_trial(self, experiment_trial_id: int, errormsgs: list):
-        self.log.debug('clear_abandoned_trial(experiment_trial_id={})'.format(experiment_trial_id))
-        try:
-            with self.db_conn:
-                with self.db_conn.cursor() as cr:
-                    trial_sql = ('UPDATE experiment_trial SET locked_by=NULL, is_active=%s, '
-                                 'utc_last_updated=NULL WHERE experiment_trial_id=%s;')
-                    episode_sql = ('UPDATE trial_episode SET novelty=NULL, performance=NULL, '
-                                   'novelty_probability=NULL, novelty_characterization=NULL, '
-                                   'novelty_threshold=NULL, utc_stamp_started=NULL, '
-                                   'utc_stamp_ended=NULL WHERE experiment_trial_id=%s;')
-                    episode_ids = list()
-                    sql = ('SELECT trial_episode_id FROM trial_episode WHERE '
-                           'experiment_trial_id=%s;')
-                    data = (experiment_trial_id,)
-                    self.log.debug(cr.mogrify(sql, data))
-                    cr.execute(sql, data)
-                    row = cr.fetchone()
-                    while row is not None:
-                        episode_ids.append(row[0])
-                        row = cr.fetchone()
-
-                    for ep_id in episode_ids:
-                        # Refresh any needed AMQP heartbeats.
-                        self.amqp.process_data_events()
-
-                        del_sql = 'DELETE FROM test_instance WHERE trial_episode_id=%s;'
-                        data = (ep_id,)
-                        self.log.debug(cr.mogrify(del_sql, data))
-                        cr.execute(del_sql, data)
-                        data = (experiment_trial_id,)
-                        self.log.debug(cr.mogrify(episode_sql, data))
-                        cr.execute(episode_sql, data)
-                    data = (False,
-                            experiment_trial_id,)
-                    self.log.debug(cr.mogrify(trial_sql, data))
-                    cr.execute(trial_sql, data)
-                    self.db_conn.commit()
-        except psycopg2.InterfaceError as e:
-            self.log.error("psycopg2.InterfaceError: " + str(e.pgerror))
-            errormsgs.append("Database connection unavailable, please try again in a few minutes")
-            self.reconnect_db()
-        except psycopg2.DatabaseError as e:
-            self.log.error("psycopg2.DatabaseError: " + str(e.pgerror))
-            errormsgs.append("There were errors inserting the experiment_trial.")
-        return
-
-    def clear_abandoned_trials(self, errormsgs: list):
-        for i in range(2):
-            experiment_trial_id = self.lock_experiment_trial_to_clear(errormsgs=errormsgs)
-            if len(errormsgs) == 0 and experiment_trial_id is not None:
-                self.clear_abandoned_trial(experiment_trial_id=experiment_trial_id,
-                                           errormsgs=errormsgs)
+    def clear_abandoned_trials(self):
+        # The cleanup runs in the maintenance thread, starting a trial does not wait for it.
+        self.maintenance.clear_abandoned_trials()
         return
 
     def add_all_experiment_trials(self, model_experiment_id: int, experiment: objects.Experiment,
@@ -1408,7 +1950,7 @@ class TA1:
                         data = (model_experiment_id,
                                 False,
                                 False,)
-                        self.log.debug(cr.mogrify(sql, data))
+                        self.log_sql(cr=cr, sql=sql, data=data)
                         cr.execute(sql, data)
                         row = cr.fetchone()
                         if row is None:
@@ -1531,6 +2073,8 @@ class TA1:
 
     def stop_trial_episode(self, trial_episode_id: int, errormsgs: list):
         self.log.debug('stop_trial_episode(trial_episode_id={})'.format(trial_episode_id))
+        # Make sure every step of the episode is in the database before it is marked ended.
+        self.flush_test_instances(errormsgs=errormsgs)
         try:
             with self.db_conn:
                 with self.db_conn.cursor() as cr:
@@ -1689,43 +2233,6 @@ class TA1:
             errormsgs.append("There were errors updating the experiment.")
         return
 
-    def refresh_dataset_in_cache(self, dataset_id: int, errormsgs: list):
-        self.log.debug('refresh_dataset_in_cache(dataset_id={})'.format(dataset_id))
-        try:
-            with self.db_conn:
-                with self.db_conn.cursor() as cr:
-                    sql = ('SELECT domain_id, data_type, novelty, difficulty, episodes, name, '
-                           'version, trial_novelty FROM dataset WHERE dataset_id=%s;')
-                    data = (dataset_id,)
-                    cr.execute(sql, data)
-                    row = cr.fetchone()
-                    if row is not None:
-                        domain_id = row[0]
-                        data_type = row[1]
-                        novelty = row[2]
-                        difficulty = row[3]
-                        episodes = row[4]
-                        name = row[5]
-                        version = row[6]
-                        trial_novelty = row[7]
-                        self.dataset_cache[domain_id][data_type][novelty][difficulty][
-                            trial_novelty]['episodes'] = episodes
-                        self.dataset_cache[domain_id][data_type][novelty][difficulty][
-                            trial_novelty]['name'] = name
-                        self.dataset_cache[domain_id][data_type][novelty][difficulty][
-                            trial_novelty]['version'] = version
-                        for i in range(episodes):
-                            self.add_episode_to_cache(dataset_id=dataset_id,
-                                                      episode_index=i)
-        except psycopg2.InterfaceError as e:
-            self.log.error("psycopg2.InterfaceError: " + str(e.pgerror))
-            errormsgs.append("Database connection unavailable, please try again in a few minutes")
-            self.reconnect_db()
-        except psycopg2.DatabaseError as e:
-            self.log.error("psycopg2.DatabaseError: " + str(e.pgerror))
-            errormsgs.append("There were errors refreshing the cached dataset.")
-        return
-
     def get_dataset_id(self, d_id: int, d_type: str, novel: int, d_diff: str, t_nov: int,
                        errormsgs: list):
         self.log.debug('get_dataset_id()')
@@ -1739,7 +2246,7 @@ class TA1:
                             d_id,
                             d_diff,
                             t_nov,)
-                    self.log.debug(cr.mogrify(sql, data))
+                    self.log_sql(cr=cr, sql=sql, data=data)
                     cr.execute(sql, data)
                     row = cr.fetchone()
                     if row is None:
@@ -1761,7 +2268,7 @@ class TA1:
                                 d_diff,
                                 0,
                                 t_nov,)
-                        self.log.debug(cr.mogrify(sql, data))
+                        self.log_sql(cr=cr, sql=sql, data=data)
                         cr.execute(sql, data)
                         self.db_conn.commit()
                     sql = ('SELECT dataset_id, episodes, name, version FROM dataset WHERE '
@@ -1777,12 +2284,11 @@ class TA1:
                     if row is not None:
                         self.log.debug('dataset_id = {}  name = {}  episodes = {}  version = {}'
                                        ''.format(row[0], row[2], row[1], row[3]))
-                        self.dataset_cache[d_id][d_type][novel][d_diff][t_nov][
-                            'dataset_id'] = row[0]
-                        self.dataset_cache[d_id][d_type][novel][d_diff][t_nov]['episodes'] = row[1]
-                        self.dataset_cache[d_id][d_type][novel][d_diff][t_nov]['name'] = row[2]
-                        self.dataset_cache[d_id][d_type][novel][d_diff][t_nov]['version'] = row[3]
-                        self.episode_cache[row[0]] = dict()
+                        dataset = self.dataset_cache[(d_id, d_type, novel, d_diff, t_nov)]
+                        dataset['dataset_id'] = row[0]
+                        dataset['episodes'] = row[1]
+                        dataset['name'] = row[2]
+                        dataset['version'] = row[3]
                         if row[1] is not None:
                             for i in range(row[1]):
                                 self.add_episode_to_cache(dataset_id=row[0],
@@ -1797,34 +2303,65 @@ class TA1:
         return
 
     def add_episode_to_cache(self, dataset_id: int, episode_index: int):
-        # First make sure the dataset_id is in the episode_cache.
-        if dataset_id not in self.episode_cache:
-            self.episode_cache[dataset_id] = dict()
-
         # Only add episode if it is not in the episode_cache already.
-        if episode_index not in self.episode_cache[dataset_id]:
-            self.episode_cache[dataset_id][episode_index] = dict({
+        if (dataset_id, episode_index) not in self.episode_cache:
+            self.episode_cache[(dataset_id, episode_index)] = dict({
                 'episode_id': None,
                 'dataset_id': dataset_id,
-                'test_instance_id': None,
                 'size': None,
                 'data_index': 0})
         return
 
+    def set_episode_id(self, dataset_id: int, episode_index: int, episode_id: int, size: int):
+        self.episode_cache[(dataset_id, episode_index)]['episode_id'] = episode_id
+        self.episode_cache[(dataset_id, episode_index)]['size'] = size
+        self.episode_dataset_ids[episode_id] = dataset_id
+        return
+
+    def invalidate_episode_ids(self, episode: objects.Episode):
+        # Forget the episode_id and size so the next get_episode_ids() reads them again.
+        entry = self.get_episode_entry(episode)
+        self.episode_dataset_ids.pop(entry['episode_id'], None)
+        entry['episode_id'] = None
+        entry['size'] = None
+        self._current_episode = None
+        self._current_episode_entry = None
+        return
+
+    def reset_episode_cache(self):
+        self.episode_cache = dict()
+        self.episode_dataset_ids = dict()
+        self._current_episode = None
+        self._current_episode_entry = None
+        return
+
+    def get_episode_dataset(self, episode: objects.Episode) -> dict:
+        return self.dataset_cache[(self.domain_ids[episode.domain],
+                                   episode.data_type,
+                                   episode.novelty,
+                                   episode.difficulty,
+                                   episode.trial_novelty)]
+
+    def get_episode_entry(self, episode: objects.Episode) -> dict:
+        # prepare_episode() resolves the entry once, every later lookup for the episode reuses it.
+        if episode is not self._current_episode:
+            dataset_id = self.get_episode_dataset(episode)['dataset_id']
+            self.add_episode_to_cache(dataset_id=dataset_id,
+                                      episode_index=episode.episode_index)
+            self._current_episode = episode
+            self._current_episode_entry = self.episode_cache[(dataset_id, episode.episode_index)]
+        return self._current_episode_entry
+
     def get_dataset_ids(self, errormsgs: list):
         self.log.debug('get_dataset_ids()')
 
-        for d_id in list(self.dataset_cache.keys()):
-            for d_type in list(self.dataset_cache[d_id].keys()):
-                for novel in list(self.dataset_cache[d_id][d_type].keys()):
-                    for d_diff in list(self.dataset_cache[d_id][d_type][novel].keys()):
-                        for t_nov in list(self.dataset_cache[d_id][d_type][novel][d_diff].keys()):
-                            self.get_dataset_id(d_id=d_id,
-                                                d_type=d_type,
-                                                novel=novel,
-                                                d_diff=d_diff,
-                                                t_nov=t_nov,
-                                                errormsgs=errormsgs)
+        for (d_id, d_type, novel, d_diff, t_nov) in list(self.dataset_cache.keys()):
+            self.get_dataset_id(d_id=d_id,
+                                d_type=d_type,
+                                novel=novel,
+                                d_diff=d_diff,
+                                t_nov=t_nov,
+                                errormsgs=errormsgs)
         return
 
     def build_domain_cache(self, request: objects.RequestExperiment, errormsgs: list):
@@ -1842,12 +2379,13 @@ class TA1:
     def build_dataset_cache(self, request: objects.RequestExperiment, errormsgs: list,
                             experiment: objects.Experiment = None):
         self.log.debug('build_dataset_cache()')
-        # [dataset_id][episode_index] = dict( episode_id, data_index )
-        self.episode_cache = dict()
-        # [domain_id][data_type][novelty][difficulty] = dict( various things )
+        # [(dataset_id, episode_index)] = dict( episode_id, data_index )
+        self.reset_episode_cache()
+        # [(domain_id, data_type, novelty, difficulty, trial_novelty)] = dict( various things )
         self.dataset_cache = dict()
         # [episode_id][data_index] = dict( data stuff )
         self.data_cache = dict()
+        self.data_prefetcher.reset()
         self.rolling_score = list()
         self._server_novelty_index = 0
         self._sota_server_novelty_index = 0
@@ -1975,26 +2513,23 @@ class TA1:
                     cache_valid_data_types.append(objects.DTYPE_TRAIN)
                     cache_valid_data_types.append(objects.DTYPE_TEST)
             domain_id = self.domain_ids[domain]
-            self.dataset_cache[domain_id] = dict()
             for data_type in cache_valid_data_types:
                 # Refresh any needed AMQP heartbeats.
                 self.amqp.process_data_events()
 
                 self.log.debug('data_type = {}'.format(data_type))
-                self.dataset_cache[domain_id][data_type] = dict()
                 self.log.debug('cache_novelty_types: {}'.format(str(cache_novelty_types)))
                 for novelty in cache_novelty_types:
                     self.log.debug('novelty = {}'.format(novelty))
-                    self.dataset_cache[domain_id][data_type][novelty] = dict()
                     for difficulty in cache_valid_difficulty:
                         self.log.debug('difficulty = {}'.format(difficulty))
-                        self.dataset_cache[domain_id][data_type][novelty][difficulty] = dict()
                         self.log.debug('cache_trial_novelty = {}'.format(str(cache_trial_novelty)))
                         self.log.debug('ctn[dt] = {}'.format(str(cache_trial_novelty[data_type])))
                         if novelty in cache_trial_novelty[data_type]:
                             for t_novelty in cache_trial_novelty[data_type][novelty]:
-                                self.dataset_cache[domain_id][data_type][novelty][difficulty][
-                                    t_novelty] = dict({
+                                dataset_key = (domain_id, data_type, novelty, difficulty,
+                                               t_novelty)
+                                self.dataset_cache[dataset_key] = dict({
                                         'domain_id': domain_id,
                                         'domain': domain,
                                         'novelty': novelty,
@@ -2008,184 +2543,57 @@ class TA1:
                                         'test_instance_id': None,
                                         'episode_index': 0})
                                 self.log.debug('DATASET: {}'.format(
-                                    self.dataset_cache[domain_id][data_type][novelty][difficulty][
-                                        t_novelty]))
+                                    self.dataset_cache[dataset_key]))
         self.get_dataset_ids(errormsgs=errormsgs)
         return
 
-    def get_dataset_episodes(self, dataset_id: int, errormsgs: list) -> int:
-        self.log.debug('get_dataset_episodes(dataset_id={})'.format(dataset_id))
-        episodes = 0
-        try:
-            with self.db_conn:
-                with self.db_conn.cursor() as cr:
-                    sql = 'SELECT count(*) FROM episode WHERE dataset_id=%s;'
-                    data = (dataset_id,)
-                    cr.execute(sql, data)
-                    row = cr.fetchone()
-                    if row is not None:
-                        if row[0] is not None:
-                            episodes = row[0]
-        except psycopg2.InterfaceError as e:
-            self.log.error("psycopg2.InterfaceError: " + str(e.pgerror))
-            errormsgs.append("Database connection unavailable, please try again in a few minutes")
-            self.reconnect_db()
-        except psycopg2.DatabaseError as e:
-            self.log.error("psycopg2.DatabaseError: " + str(e.pgerror))
-            errormsgs.append("There were errors gathering the dataset episodes count.")
-        return episodes
-
-    def update_dataset_episodes(self, dataset_id: int, episodes: int, errormsgs: list):
-        self.log.debug('update_dataset_episodes(dataset_id={}, episodes={})'.format(dataset_id,
-                                                                                    episodes))
-        try:
-            with self.db_conn:
-                with self.db_conn.cursor() as cr:
-                    sql = 'UPDATE dataset SET episodes=%s WHERE dataset_id=%s'
-                    data = (episodes,
-                            dataset_id,)
-                    cr.execute(sql, data)
-                    self.db_conn.commit()
-        except psycopg2.InterfaceError as e:
-            self.log.error("psycopg2.InterfaceError: " + str(e.pgerror))
-            errormsgs.append("Database connection unavailable, please try again in a few minutes")
-            self.reconnect_db()
-        except psycopg2.DatabaseError as e:
-            self.log.error("psycopg2.DatabaseError: " + str(e.pgerror))
-            errormsgs.append("There were errors updating the dataset episodes count.")
-        return
-
-    def lock_dataset(self, dataset_id: int, my_uuid: str, errormsgs: list):
-        self.log.debug('lock_dataset(dataset_id={}, my_uuid={})'.format(dataset_id, my_uuid))
-        try:
-            is_locked = False
-            max_wait = 30.0
-            end_time = float(time.time()) + max_wait
-            while not is_locked and float(time.time()) < end_time:
-                with self.db_conn:
-                    with self.db_conn.cursor() as cr:
-                        sql = ('UPDATE dataset SET locked_by=%s, locked_at=NOW() WHERE '
-                               'dataset_id=%s AND ( locked_by IS NULL OR '
-                               'locked_at<(NOW() - interval \'10 seconds\') ) '
-                               'RETURNING locked_by;')
-                        data = (my_uuid,
-                                dataset_id,)
-                        self.log.debug(cr.mogrify(sql, data))
-                        cr.execute(sql, data)
-                        row = cr.fetchone()
-                        if row is not None:
-                            if row[0] is not None:
-                                if my_uuid == row[0]:
-                                    is_locked = True
-                        if not is_locked:
-                            sql = ('SELECT locked_by, locked_at, NOW() FROM dataset WHERE '
-                                   'dataset_id=%s;')
-                            data = (dataset_id,)
-                            cr.execute(sql, data)
-                            row = cr.fetchone()
-                            self.log.debug('not locked... locked_by={}, locked_at={} NOW()={} '
-                                           'remaining={}'.format(row[0],
-                                                                 str(row[1]),
-                                                                 str(row[2]),
-                                                                 end_time - time.time()))
-                            self.amqp.sleep(duration=(random.random() / 2.0))
-            # The dataset is now locked and we may modify it.
-            if not is_locked:
-                # The dataset took too long to lock, throw an exception.
-                raise objects.AiqExperimentException('Could not lock the dataset.')
-        except psycopg2.InterfaceError as e:
-            self.log.error("psycopg2.InterfaceError: " + str(e.pgerror))
-            errormsgs.append("Database connection unavailable, please try again in a few minutes")
-            self.reconnect_db()
-        except psycopg2.DatabaseError as e:
-            self.log.error("psycopg2.DatabaseError: " + str(e.pgerror))
-            errormsgs.append("There were errors locking the dataset.")
-        return
-
-    def unlock_dataset(self, dataset_id: int, my_uuid: str, errormsgs: list):
-        self.log.debug('unlock_dataset(dataset_id={}, my_uuid={})'.format(dataset_id, my_uuid))
-        try:
-            with self.db_conn:
-                with self.db_conn.cursor() as cr:
-                    sql = ('UPDATE dataset SET locked_by=NULL WHERE '
-                           'dataset_id=%s AND locked_by=%s;')
-                    data = (dataset_id,
-                            my_uuid,)
-                    cr.execute(sql, data)
-        except psycopg2.InterfaceError as e:
-            self.log.error("psycopg2.InterfaceError: " + str(e.pgerror))
-            errormsgs.append("Database connection unavailable, please try again in a few minutes")
-            self.reconnect_db()
-        except psycopg2.DatabaseError as e:
-            self.log.error("psycopg2.DatabaseError: " + str(e.pgerror))
-            errormsgs.append("There were errors unlocking the dataset.")
-        return
-
     def add_episode_to_dataset(self, dataset_id: int, seed: int, errormsgs: list) -> int:
         self.log.debug('add_episode_to_dataset( dataset_id={}, seed={} )'.format(dataset_id,
                                                                                  seed))
         episode_index = -1
         try:
-            # with self.db_conn:
-            #     with self.db_conn.cursor() as cr:
-            # First we need to lock the dataset to add a new episode and update the count.
-            my_uuid = str(uuid.uuid4())
-            self.lock_dataset(dataset_id=dataset_id,
-                              my_uuid=my_uuid,
-                              errormsgs=errormsgs)
-
-            # Refresh the dataset cache while locked.
-            self.refresh_dataset_in_cache(dataset_id=dataset_id,
-                                          errormsgs=errormsgs)
-
-            # Now get the episode count.
-            episodes = self.get_dataset_episodes(dataset_id=dataset_id,
-                                                 errormsgs=errormsgs)
-            episode_index = episodes
-
-            # Add the new episode to the episode_cache so we can then add episode_id.
-            self.add_episode_to_cache(dataset_id=dataset_id,
-                                      episode_index=episode_index)
-            episodes += 1
-
             with self.db_conn:
                 with self.db_conn.cursor() as cr:
-                    # Insert the new episode.
-                    sql = ('INSERT INTO episode (dataset_id, episode_index, size, seed) '
-                           'VALUES (%s, %s, %s, %s) RETURNING episode_id;')
+                    # Take the next episode_index and insert the episode in one statement, the
+                    # dataset row is only locked until this transaction commits.
+                    sql = ('WITH ds AS (UPDATE dataset SET episodes=COALESCE(episodes, 0) + 1 '
+                           'WHERE dataset_id=%s RETURNING episodes - 1 AS episode_index) '
+                           'INSERT INTO episode (dataset_id, episode_index, size, seed) '
+                           'SELECT %s, episode_index, %s, %s FROM ds '
+                           'RETURNING episode_id, episode_index;')
                     data = (dataset_id,
-                            episode_index,
+                            dataset_id,
                             0,
                             seed)
+                    self.log_sql(cr=cr, sql=sql, data=data)
                     cr.execute(sql, data)
                     row = cr.fetchone()
                     if row is not None:
-                        episode_id = row[0]
-                        self.episode_cache[dataset_id][episode_index]['episode_id'] = episode_id
-                        self.episode_cache[dataset_id][episode_index]['size'] = 0
-
-            # Update the dataset with new episodes value.
-            self.update_dataset_episodes(dataset_id=dataset_id,
-                                         episodes=episodes,
-                                         errormsgs=errormsgs)
-
-            # Finally, unlock the dataset row.
-            self.unlock_dataset(dataset_id=dataset_id,
-                                my_uuid=my_uuid,
-                                errormsgs=errormsgs)
+                        episode_index = row[1]
+                        # Add the new episode to the episode_cache with its episode_id.
+                        self.add_episode_to_cache(dataset_id=dataset_id,
+                                                  episode_index=episode_index)
+                        self.set_episode_id(dataset_id=dataset_id,
+                                            episode_index=episode_index,
+                                            episode_id=row[0],
+                                            size=0)
+                    self.db_conn.commit()
         except psycopg2.InterfaceError as e:
             self.log.error("psycopg2.InterfaceError: " + str(e.pgerror))
             errormsgs.append("Database connection unavailable, please try again in a few minutes")
             self.reconnect_db()
         except psycopg2.DatabaseError as e:
             self.log.error("psycopg2.DatabaseError: " + str(e.pgerror))
-            errormsgs.append("There were errors gathering the dataset episodes count.")
+            errormsgs.append("There were errors adding the episode to the dataset.")
         return episode_index
 
     def get_episode_ids(self, dataset_id: int, episode_index: int, errormsgs: list):
         self.log.debug('get_episode_ids()')
         self.add_episode_to_cache(dataset_id=dataset_id,
                                   episode_index=episode_index)
+        # The episode_id and size are kept until invalidate_episode_ids() or a cache reset.
+        if self.episode_cache[(dataset_id, episode_index)]['episode_id'] is not None:
+            return
         try:
             with self.db_conn:
                 with self.db_conn.cursor() as cr:
@@ -2196,8 +2604,10 @@ class TA1:
                     cr.execute(sql, data)
                     row = cr.fetchone()
                     if row is not None:
-                        self.episode_cache[dataset_id][episode_index]['episode_id'] = row[0]
-                        self.episode_cache[dataset_id][episode_index]['size'] = row[1]
+                        self.set_episode_id(dataset_id=dataset_id,
+                                            episode_index=episode_index,
+                                            episode_id=row[0],
+                                            size=row[1])
         except psycopg2.InterfaceError as e:
             self.log.error("psycopg2.InterfaceError: " + str(e.pgerror))
             errormsgs.append("Database connection unavailable, please try again in a few minutes")
@@ -2207,189 +2617,99 @@ class TA1:
             errormsgs.append("There were errors gathering the episode IDs.")
         return
 
-    def load_data_to_cache(self, episode_id: int, at_data_index: int, errormsgs: list):
+    def load_data_to_cache(self, episode_id: int, at_data_index: int):
         self.log.debug('load_data_to_cache( episode_id={}, at_data_index={} )'.format(
             episode_id,
             at_data_index))
-        try:
-            with self.db_conn:
-                with self.db_conn.cursor() as cr:
-                    sql = ('SELECT data_index, feature_vector, label, data_id FROM data WHERE '
-                           'episode_id=%s AND data_index BETWEEN %s AND %s '
-                           'ORDER BY data_index;')
-                    data = (episode_id,
-                            at_data_index,
-                            at_data_index + self._DATA_CACHE_SIZE,)
-                    cr.execute(sql, data)
-                    row = cr.fetchone()
-                    if episode_id not in self.data_cache:
-                        self.data_cache[episode_id] = dict()
-                    while row is not None:
-                        self.data_cache[episode_id][row[0]] = dict({
-                            'data_index': row[0],
-                            'feature_vector': copy.deepcopy(row[1]),
-                            'label': copy.deepcopy(row[2]),
-                            'data_id': row[3]})
-                        row = cr.fetchone()
-        except psycopg2.InterfaceError as e:
-            self.log.error("psycopg2.InterfaceError: " + str(e.pgerror))
-            errormsgs.append("Database connection unavailable, please try again in a few minutes")
-            self.reconnect_db()
-        except psycopg2.DatabaseError as e:
-            self.log.error("psycopg2.DatabaseError: " + str(e.pgerror))
+        # The rows are read in the background, wait_for_data() picks them up when needed.
+        self.data_prefetcher.prefetch(episode_id=episode_id,
+                                      start=at_data_index,
+                                      stop=at_data_index + self._DATA_CACHE_SIZE + 1)
+        return
+
+    def wait_for_data(self, episode_id: int, data_index: int, errormsgs: list) -> bool:
+        if not self.data_prefetcher.wait_for(data_cache=self.data_cache,
+                                             episode_id=episode_id,
+                                             data_index=data_index,
+                                             timeout=self._AMQP_EXPERIMENT_TIMEOUT,
+                                             idle_function=self.amqp.process_data_events):
             errormsgs.append("There were errors loading data to the cache.")
+            return False
+        if data_index not in self.data_cache.get(episode_id, dict()):
+            errormsgs.append("Data index {} of episode {} was not found.".format(data_index,
+                                                                                 episode_id))
+            return False
+        return True
+
+    def prefetch_next_episode(self, episodes: list, index: int, errormsgs: list):
+        # Start reading the first window of the next recorded episode while this one runs.
+        if index < len(episodes):
+            episode = episodes[index]
+            if episode.data_type in [objects.DTYPE_TRAIN, objects.DTYPE_TEST]:
+                dataset_id = self.get_episode_dataset(episode)['dataset_id']
+                if episode.episode_id is None:
+                    self.get_episode_ids(dataset_id=dataset_id,
+                                         episode_index=episode.episode_index,
+                                         errormsgs=errormsgs)
+                    episode.episode_id \
+                        = self.episode_cache[(dataset_id, episode.episode_index)]['episode_id']
+                if episode.episode_id is not None:
+                    self.load_data_to_cache(episode_id=episode.episode_id,
+                                            at_data_index=0)
         return
 
-    def update_episode_size(self, episode_id: int, size: int, errormsgs: list):
-        self.log.debug('update_episode_size(episode_id={}, size={})'.format(episode_id, size))
-        try:
-            with self.db_conn:
-                with self.db_conn.cursor() as cr:
-                    sql = 'UPDATE episode SET size=%s WHERE episode_id=%s'
-                    data = (size,
-                            episode_id,)
-                    cr.execute(sql, data)
-                    self.db_conn.commit()
-        except psycopg2.InterfaceError as e:
-            self.log.error("psycopg2.InterfaceError: " + str(e.pgerror))
-            errormsgs.append("Database connection unavailable, please try again in a few minutes")
-            self.reconnect_db()
-        except psycopg2.DatabaseError as e:
-            self.log.error("psycopg2.DatabaseError: " + str(e.pgerror))
-            errormsgs.append("There were errors updating the episode size..")
+    def start_test_instance(self, data_id: int = None, episode_id: int = None,
+                            feature_vector: dict = None, label: dict = None,
+                            data_index: int = None):
+        self.log.debug('start_test_instance(data_id={}, episode_id={}, data_index={})'.format(
+            data_id, episode_id, data_index))
+        pending = self._pending_test_instance
+        if pending is not None and data_id is not None and pending.data_id == data_id \
+                and pending.trial_episode_id == self.trial_episode_id:
+            # The same recorded instance was requested again, keep the original test_instance.
+            return
+        self.write_pending_test_instance()
+        self._pending_test_instance = TestInstanceRecord(trial_episode_id=self.trial_episode_id,
+                                                         data_id=data_id,
+                                                         episode_id=episode_id,
+                                                         feature_vector=feature_vector,
+                                                         label=label,
+                                                         data_index=data_index)
         return
 
-    def create_data_instance(self, episode_id: int, feature_vector: dict, label: dict,
-                             data_index: int, errormsgs: list) -> int:
-        self.log.debug('create_data_instance( episode_id={}, feature_vector={}, label={}, '
-                       'data_index={} )'.format(episode_id,
-                                                str(feature_vector),
-                                                str(label),
-                                                data_index))
-        data_id = -1
-        try:
-            with self.db_conn:
-                with self.db_conn.cursor() as cr:
-                    tmp_fv = copy.deepcopy(feature_vector)
-                    if 'image' in tmp_fv:
-                        del tmp_fv['image']
-                    sql = ('INSERT INTO data (episode_id, feature_vector, label, data_index) '
-                           'VALUES (%s, %s, %s, %s) RETURNING data_id;')
-                    data = (episode_id,
-                            Json(tmp_fv),
-                            Json(label),
-                            data_index,)
-                    # self.log.debug(cr.mogrify(sql, data))
-                    cr.execute(sql, data)
-                    row = cr.fetchone()
-                    if row is not None:
-                        data_id = row[0]
-                    self.db_conn.commit()
-        except psycopg2.InterfaceError as e:
-            self.log.error("psycopg2.InterfaceError: " + str(e.pgerror))
-            errormsgs.append("Database connection unavailable, please try again in a few minutes")
-            self.reconnect_db()
-        except psycopg2.DatabaseError as e:
-            self.log.error("psycopg2.DatabaseError: " + str(e.pgerror))
-            errormsgs.append("There were errors inserting the data instance.")
-        return data_id
+    def receive_test_instance(self, request: objects.BasicDataPrediction):
+        if self._pending_test_instance is not None:
+            self._pending_test_instance.set_received(
+                remote_stamp_arrived=objects.epoch_to_stamp(request.utc_remote_epoch_received),
+                remote_stamp_replied=objects.epoch_to_stamp(request.utc_remote_epoch_sent))
+        return
 
-    def create_test_instance(self, data_id: int, trial_episode_id: int, errormsgs: list):
-        self.log.debug('create_test_instance( data_id={}, trial_episode_id={} )'.format(
-            data_id, trial_episode_id))
-        test_instance_id = None
-        try:
-            with self.db_conn:
-                with self.db_conn.cursor() as cr:
-                    sql = ('SELECT test_instance_id FROM test_instance WHERE '
-                           'data_id=%s AND trial_episode_id=%s;')
-                    data = (data_id,
-                            trial_episode_id,)
-                    cr.execute(sql, data)
-                    row = cr.fetchone()
-                    if row is not None:
-                        test_instance_id = row[0]
-                    else:
-                        sql = ('INSERT INTO test_instance (trial_episode_id, data_id) VALUES '
-                               '(%s, %s) RETURNING test_instance_id;')
-                        data = (trial_episode_id,
-                                data_id,)
-                        cr.execute(sql, data)
-                        row = cr.fetchone()
-                        if row is not None:
-                            test_instance_id = row[0]
-                        self.db_conn.commit()
-        except psycopg2.InterfaceError as e:
-            self.log.error("psycopg2.InterfaceError: " + str(e.pgerror))
-            errormsgs.append("Database connection unavailable, please try again in a few minutes")
-            self.reconnect_db()
-        except psycopg2.DatabaseError as e:
-            self.log.error("psycopg2.DatabaseError: " + str(e.pgerror))
-            errormsgs.append("There were errors inserting the test_instance.")
-        return test_instance_id
-
-    def update_test_instance(self, test_instance_id: int, remote_stamp_arrived: datetime.datetime,
-                             remote_stamp_delivered: datetime.datetime, errormsgs: list):
-        self.log.debug('update_test_instance(test_instance_id={}, stamp_arrived={}, '
-                       'stamp_delivered={})'.format(test_instance_id,
-                                                    remote_stamp_arrived,
-                                                    remote_stamp_delivered))
-        try:
-            with self.db_conn:
-                with self.db_conn.cursor() as cr:
-                    sql = ('UPDATE test_instance SET utc_stamp_received=NOW(), '
-                           'utc_remote_stamp_arrived=%s, utc_remote_stamp_replied=%s '
-                           'WHERE test_instance_id=%s;')
-                    data = (remote_stamp_arrived,
-                            remote_stamp_delivered,
-                            test_instance_id,)
-                    cr.execute(sql, data)
-                    self.db_conn.commit()
-        except psycopg2.InterfaceError as e:
-            self.log.error("psycopg2.InterfaceError: " + str(e.pgerror))
-            errormsgs.append("Database connection unavailable, please try again in a few minutes")
-            self.reconnect_db()
-        except psycopg2.DatabaseError as e:
-            self.log.error("psycopg2.DatabaseError: " + str(e.pgerror))
-            errormsgs.append("There were errors updating the test_instance.")
+    def finish_test_instance(self, label_prediction: dict, performance: float,
+                             feedback: dict = None):
+        self.log.debug('finish_test_instance(performance={})'.format(performance))
+        if self._pending_test_instance is not None:
+            self._pending_test_instance.set_label(label_prediction=label_prediction,
+                                                  performance=performance,
+                                                  feedback=feedback)
+            self.db_writer.put(self._pending_test_instance)
+            self._pending_test_instance = None
         return
 
-    def create_test_label(self, test_instance_id: int, label_prediction: dict, performance: float,
-                          errormsgs: list, feedback: dict = None):
-        self.log.debug('create_test_label(test_instance_id={}, label_prediction={}, '
-                       'performance={}, feedback={})'
-                       .format(test_instance_id,
-                               label_prediction,
-                               performance,
-                               str(feedback)))
-        try:
-            with self.db_conn:
-                with self.db_conn.cursor() as cr:
-                    if feedback is None:
-                        sql = ('INSERT INTO test_label (test_instance_id, label_prediction, '
-                               'performance) '
-                               'VALUES (%s, %s, %s);')
-                        data = (test_instance_id,
-                                Json(label_prediction),
-                                performance,)
-                        cr.execute(sql, data)
-                    else:
-                        sql = ('INSERT INTO test_label (test_instance_id, label_prediction, '
-                               'performance, feedback) '
-                               'VALUES (%s, %s, %s, %s);')
-                        data = (test_instance_id,
-                                Json(label_prediction),
-                                performance,
-                                Json(feedback),)
-                        cr.execute(sql, data)
-                    self.db_conn.commit()
-        except psycopg2.InterfaceError as e:
-            self.log.error("psycopg2.InterfaceError: " + str(e.pgerror))
-            errormsgs.append("Database connection unavailable, please try again in a few minutes")
-            self.reconnect_db()
-        except psycopg2.DatabaseError as e:
-            self.log.error("psycopg2.DatabaseError: " + str(e.pgerror))
-            errormsgs.append("There were errors inserting the test_label.")
+    def write_pending_test_instance(self):
+        # A test_instance that never got a prediction is still recorded, without a label.
+        if self._pending_test_instance is not None:
+            self.db_writer.put(self._pending_test_instance)
+            self._pending_test_instance = None
+        return
+
+    def flush_test_instances(self, errormsgs: list):
+        self.write_pending_test_instance()
+        # Live episode sizes are only written once the episode is over.
+        for episode_id, size in self._live_episode_sizes.items():
+            self.db_writer.put(EpisodeSizeRecord(episode_id=episode_id, size=size))
+        self._live_episode_sizes = dict()
+        errormsgs.extend(self.db_writer.flush(timeout=self._AMQP_EXPERIMENT_TIMEOUT))
+        self.log_writer.flush(timeout=self._AMQP_EXPERIMENT_TIMEOUT)
         return
 
     def insert_sota_experiment(self, domain_id: int, model_experiment_id: int,
@@ -2508,13 +2828,7 @@ class TA1:
 
     def get_episode_dataset_id(self, episode_id: int, episode_index: int):
         self.log.debug('get_episode_dataset_id({}, {})'.format(episode_id, episode_index))
-        dataset_id = -1
-        for d_id_key in list(self.episode_cache.keys()):
-            if episode_index in self.episode_cache[d_id_key]:
-                if self.episode_cache[d_id_key][episode_index]['episode_id'] == episode_id:
-                    dataset_id = d_id_key
-                    break
-        return dataset_id
+        return self.episode_dataset_ids.get(episode_id, -1)
 
     def calculate_episode_numbers_for_domain(self, domain_id: int, data_type: str, novelty: int,
                                              difficulty: str, trial_novelty: int, novelty_p: float,
@@ -2539,12 +2853,12 @@ class TA1:
         num_eps = initial_episodes
         num_n_zero = n_zero
         if num_n_zero is None:
-            num_n_zero = self.dataset_cache[domain_id][data_type][objects.NOVELTY_200][
-                difficulty][trial_novelty]['episodes']
+            num_n_zero = self.dataset_cache[(domain_id, data_type, objects.NOVELTY_200, difficulty,
+                                             trial_novelty)]['episodes']
         num_n_level = n_level
         if num_n_level is None:
-            num_n_level = self.dataset_cache[domain_id][data_type][novelty][difficulty][
-                trial_novelty]['episodes']
+            num_n_level = self.dataset_cache[(domain_id, data_type, novelty, difficulty,
+                                              trial_novelty)]['episodes']
         num_episodes = num_n_zero + num_n_level
         if num_eps > num_episodes:
             num_eps = num_episodes
@@ -2583,8 +2897,8 @@ class TA1:
     def select_first_episode_index(self, domain_id: int, data_type: str, novelty: int,
                                    difficulty: str, trial_novelty: int, size: int) -> int:
         # episode_index = 0
-        num_episodes = self.dataset_cache[domain_id][data_type][novelty][difficulty][
-            trial_novelty]['episodes'] - 1
+        num_episodes = self.dataset_cache[(domain_id, data_type, novelty, difficulty,
+                                           trial_novelty)]['episodes'] - 1
         if size < num_episodes:
             num_episodes = num_episodes - size
         episode_index = random.randint(0, num_episodes)
@@ -2619,9 +2933,9 @@ class TA1:
         if domain != objects.DOMAIN_SMARTENV:
             for difficulty in [objects.DIFFICULTY_EASY]:
                 if data_source == objects.SOURCE_RECORDED:
-                    available_episodes = \
-                        self.dataset_cache[domain_id][objects.DTYPE_TRAIN][objects.NOVELTY_200][
-                            difficulty][objects.NOVELTY_200]['episodes']
+                    available_episodes = self.dataset_cache[(domain_id, objects.DTYPE_TRAIN,
+                                                             objects.NOVELTY_200, difficulty,
+                                                             objects.NOVELTY_200)]['episodes']
                     episode_indexes = list(range(available_episodes))
                 for i in list(range(type_episodes[difficulty])):
                     episode_index = None
@@ -2719,8 +3033,8 @@ class TA1:
             for d in self._server_difficulty:
                 episode_indexes[objects.NOVELTY_200][d] = dict()
                 for n in testing_novelty:
-                    available_episodes = self.dataset_cache[domain_id][objects.DTYPE_TEST][
-                        objects.NOVELTY_200][d][n]['episodes']
+                    available_episodes = self.dataset_cache[(domain_id, objects.DTYPE_TEST,
+                                                             objects.NOVELTY_200, d, n)]['episodes']
                     episode_indexes[objects.NOVELTY_200][d][n] = list(range(available_episodes))
         novelty_diff = list()
 
@@ -2737,12 +3051,12 @@ class TA1:
                     if d not in episode_indexes[n]:
                         episode_indexes[n][d] = dict()
                     if n not in episode_indexes[objects.NOVELTY_200][d]:
-                        size = self.dataset_cache[domain_id][objects.DTYPE_TEST][
-                            objects.NOVELTY_200][d][n]['episodes']
+                        size = self.dataset_cache[(domain_id, objects.DTYPE_TEST,
+                                                   objects.NOVELTY_200, d, n)]['episodes']
                         episode_indexes[objects.NOVELTY_200][d][n] = list(range(size))
                     if n not in episode_indexes[n][d]:
-                        size = self.dataset_cache[domain_id][objects.DTYPE_TEST][
-                            n][d][n]['episodes']
+                        size = self.dataset_cache[(domain_id, objects.DTYPE_TEST, n, d,
+                                                   n)]['episodes']
                         episode_indexes[n][d][n] = list(range(size))
 
         for novelty_visibility in self._server_novelty_visibility:
@@ -2798,12 +3112,13 @@ class TA1:
                                     trial_novelty=novelty,
                                     size=ep_n_level)
                             else:
-                                size = self.dataset_cache[domain_id][objects.DTYPE_TEST][
-                                    objects.NOVELTY_200][difficulty][novelty]['episodes']
+                                size = self.dataset_cache[(domain_id, objects.DTYPE_TEST,
+                                                           objects.NOVELTY_200, difficulty,
+                                                           novelty)]['episodes']
                                 episode_indexes[objects.NOVELTY_200][difficulty][novelty] = \
                                     list(range(size))
-                                size = self.dataset_cache[domain_id][objects.DTYPE_TEST][novelty][
-                                    difficulty][novelty]['episodes']
+                                size = self.dataset_cache[(domain_id, objects.DTYPE_TEST, novelty,
+                                                           difficulty, novelty)]['episodes']
                                 episode_indexes[novelty][difficulty][novelty] = list(range(size))
                         trial_episodes = list()
                         for i in list(range(ep_before_nov)):
@@ -3223,7 +3538,7 @@ class TA1:
             # Start the created training (-1) experiment_trial.
             self.start_experiment_trial(experiment_trial_id=self.experiment_trial_id,
                                         errormsgs=errormsgs)
-            self.clear_abandoned_trials(errormsgs=errormsgs)
+            self.clear_abandoned_trials()
 
         if len(errormsgs) == 0:
             # Set the experiment domain.
@@ -3687,7 +4002,7 @@ class TA1:
                         # Refresh any needed AMQP heartbeats.
                         self.amqp.process_data_events()
 
-                        self.clear_abandoned_trials(errormsgs=errormsgs)
+                        self.clear_abandoned_trials()
 
                     if len(errormsgs) == 0:
                         # Set the experiment domain.
@@ -3903,7 +4218,7 @@ class TA1:
 
     """
     def on_aiq_request(self, ch, method, props, body, request):
-        self.log.debug('on_aiq_request( {} )'.format(str(request)))
+        self.log.debug('on_aiq_request( %s )', rabbitmq.LogSummary(request))
         errormsgs = list()
         data = None
         refresh_dataset_cache = False
@@ -3982,7 +4297,7 @@ class TA1:
                     self.get_episode_ids(dataset_id=dataset_id,
                                          episode_index=episode_index,
                                          errormsgs=errormsgs)
-                    episode_id = self.episode_cache[dataset_id][episode_index]['episode_id']
+                    episode_id = self.episode_cache[(dataset_id, episode_index)]['episode_id']
                     self.episode_id_list.append(episode_id)
                     self.episode_index_cache[episode_id] = episode_index
 
@@ -3990,12 +4305,11 @@ class TA1:
                 episode_id = self.episode_id_list[self.episode_id_list_index]
                 episode_index = self.episode_index_cache[episode_id]
                 # Set the current data_index for the episode to 0.
-                self.episode_cache[dataset_id][episode_index]['data_index'] = 0
+                self.episode_cache[(dataset_id, episode_index)]['data_index'] = 0
                 # Load the episode data to the data_cache.
                 self.load_data_to_cache(
                     episode_id=episode_id,
-                    at_data_index=0,
-                    errormsgs=errormsgs)
+                    at_data_index=0)
                 self.STATE = objects.TrainingEpisodeStart(
                     episode_number=self.episode_id_list_index,
                     total_episodes=len(self.episode_id_list))
@@ -4007,12 +4321,11 @@ class TA1:
                 dataset_id = self.get_episode_dataset_id(episode_id=episode_id,
                                                          episode_index=episode_index)
                 # Set the current data_index for the episode to 0.
-                self.episode_cache[dataset_id][episode_index]['data_index'] = 0
+                self.episode_cache[(dataset_id, episode_index)]['data_index'] = 0
                 # Load the episode data to the data_cache.
                 self.load_data_to_cache(
                     episode_id=episode_id,
-                    at_data_index=0,
-                    errormsgs=errormsgs)
+                    at_data_index=0)
             elif isinstance(self.STATE, objects.TrainingEnd):
                 self.STATE = objects.TestingStart()
             elif isinstance(self.STATE, objects.TestingStart):
@@ -4064,7 +4377,7 @@ class TA1:
                     self.get_episode_ids(dataset_id=dset_id_z,
                                          episode_index=episode_index,
                                          errormsgs=errormsgs)
-                    episode_id = self.episode_cache[dset_id_z][episode_index]['episode_id']
+                    episode_id = self.episode_cache[(dset_id_z, episode_index)]['episode_id']
                     self.episode_id_list.append(episode_id)
                     self.episode_index_cache[episode_id] = episode_index
 
@@ -4079,7 +4392,7 @@ class TA1:
                     self.get_episode_ids(dataset_id=dset_id_n,
                                          episode_index=episode_index,
                                          errormsgs=errormsgs)
-                    episode_id = self.episode_cache[dset_id_n][episode_index]['episode_id']
+                    episode_id = self.episode_cache[(dset_id_n, episode_index)]['episode_id']
                     episode_id_list.append(episode_id)
                     self.episode_index_cache[episode_id] = episode_index
 
@@ -4087,7 +4400,7 @@ class TA1:
                     self.get_episode_ids(dataset_id=dset_id_z,
                                          episode_index=episode_index,
                                          errormsgs=errormsgs)
-                    episode_id = self.episode_cache[dset_id_z][episode_index]['episode_id']
+                    episode_id = self.episode_cache[(dset_id_z, episode_index)]['episode_id']
                     episode_id_list.append(episode_id)
                     self.episode_index_cache[episode_id] = episode_index
 
@@ -4103,7 +4416,7 @@ class TA1:
                         self.get_episode_ids(dataset_id=dset_id_z,
                                              episode_index=episode_index,
                                              errormsgs=errormsgs)
-                        episode_id = self.episode_cache[dset_id_z][episode_index]['episode_id']
+                        episode_id = self.episode_cache[(dset_id_z, episode_index)]['episode_id']
                         self.episode_id_list.append(episode_id)
                         self.episode_index_cache[episode_id] = episode_index
                     random.shuffle(self.episode_id_list)
@@ -4114,12 +4427,11 @@ class TA1:
                 dataset_id = self.get_episode_dataset_id(episode_id=episode_id,
                                                          episode_index=episode_index)
                 # Set the current data_index for the episode to 0.
-                self.episode_cache[dataset_id][episode_index]['data_index'] = 0
+                self.episode_cache[(dataset_id, episode_index)]['data_index'] = 0
                 # Load the episode data to the data_cache.
                 self.load_data_to_cache(
                     episode_id=episode_id,
-                    at_data_index=0,
-                    errormsgs=errormsgs)
+                    at_data_index=0)
                 self.STATE = objects.TestingEpisodeStart(
                     episode_number=self.episode_id_list_index,
                     total_episodes=len(self.episode_id_list))
@@ -4131,12 +4443,11 @@ class TA1:
                 dataset_id = self.get_episode_dataset_id(episode_id=episode_id,
                                                          episode_index=episode_index)
                 # Set the current data_index for the episode to 0.
-                self.episode_cache[dataset_id][episode_index]['data_index'] = 0
+                self.episode_cache[(dataset_id, episode_index)]['data_index'] = 0
                 # Load the episode data to the data_cache.
                 self.load_data_to_cache(
                     episode_id=episode_id,
-                    at_data_index=0,
-                    errormsgs=errormsgs)
+                    at_data_index=0)
 
                 # Check to see if we reached novelty.
                 self._TEST_EPISODE_PROGRESS += 1
@@ -4189,10 +4500,10 @@ class TA1:
                 self.domain_cache = list()
                 del self.dataset_cache
                 self.dataset_cache = dict()
-                del self.episode_cache
-                self.episode_cache = dict()
+                self.reset_episode_cache()
                 del self.data_cache
                 self.data_cache = dict()
+                self.data_prefetcher.reset()
                 del self.rolling_score
                 self.rolling_score = list()
                 if self._AMQP_EXP_CALLBACK_ID is not None:
@@ -4217,19 +4528,17 @@ class TA1:
                 episode_index = self.episode_index_cache[episode_id]
                 dataset_id = self.get_episode_dataset_id(episode_id=episode_id,
                                                          episode_index=episode_index)
-                data_index = self.episode_cache[dataset_id][episode_index]['data_index']
-                data_id = self.data_cache[episode_id][data_index]['data_id']
-                test_instance_id = self.create_test_instance(
-                    data_id=data_id,
-                    experiment_trial_id=self.experiment_trial_id,
-                    errormsgs=errormsgs)
-                self.episode_cache[dataset_id][episode_index]['test_instance_id'] \
-                    = test_instance_id
-                data = objects.TrainingData(
-                    secret=request.secret,
-                    feature_vector=self.data_cache[episode_id][data_index]['feature_vector'],
-                    feature_label=self.data_cache[episode_id][data_index]['label'])
-                data.utc_remote_epoch_received = None
+                data_index = self.episode_cache[(dataset_id, episode_index)]['data_index']
+                if self.wait_for_data(episode_id=episode_id,
+                                      data_index=data_index,
+                                      errormsgs=errormsgs):
+                    data_id = self.data_cache[episode_id][data_index]['data_id']
+                    self.start_test_instance(data_id=data_id)
+                    data = objects.TrainingData(
+                        secret=request.secret,
+                        feature_vector=self.data_cache[episode_id][data_index]['feature_vector'],
+                        feature_label=self.data_cache[episode_id][data_index]['label'])
+                    data.utc_remote_epoch_received = None
         elif isinstance(request, objects.TrainingDataPrediction):
             if not isinstance(self.STATE, objects.TrainingEpisodeActive):
                 errormsgs.append('ERROR: Will not accept a TrainingDataAck outside of the '
@@ -4240,22 +4549,11 @@ class TA1:
                 episode_index = self.episode_index_cache[episode_id]
                 dataset_id = self.get_episode_dataset_id(episode_id=episode_id,
                                                          episode_index=episode_index)
-                data_index = self.episode_cache[dataset_id][episode_index]['data_index']
-                dataset_size = self.episode_cache[dataset_id][episode_index]['size']
-                test_instance_id \
-                    = self.episode_cache[dataset_id][episode_index]['test_instance_id']
-                remote_stamp_arrived = objects.epoch_to_stamp(request.utc_remote_epoch_received)
-                remote_stamp_delivered = objects.epoch_to_stamp(request.utc_remote_epoch_sent)
-                self.update_test_instance(test_instance_id=test_instance_id,
-                                          remote_stamp_arrived=remote_stamp_arrived,
-                                          remote_stamp_delivered=remote_stamp_delivered,
-                                          errormsgs=errormsgs)
-                self.create_test_label(test_instance_id=test_instance_id,
-                                       label_prediction=request.label_prediction,
-                                       novelty=request.novelty,
-                                       novelty_probability=request.novelty_probability,
-                                       novelty_initiated=self.novelty_initiated,
-                                       errormsgs=errormsgs)
+                data_index = self.episode_cache[(dataset_id, episode_index)]['data_index']
+                dataset_size = self.episode_cache[(dataset_id, episode_index)]['size']
+                self.receive_test_instance(request=request)
+                self.finish_test_instance(label_prediction=request.label_prediction,
+                                          performance=None)
 
                 self.update_rolling_score(
                     solution=self.data_cache[episode_id][data_index]['label'],
@@ -4267,7 +4565,7 @@ class TA1:
                 del self.data_cache[episode_id][data_index]
 
                 # Increment the index on the dataset we just finished a test instance on.
-                self.episode_cache[dataset_id][episode_index]['data_index'] += 1
+                self.episode_cache[(dataset_id, episode_index)]['data_index'] += 1
 
                 # Check if we need to mark the flag for a dataset reload.
                 if len(self.data_cache[episode_id]) < self._DATA_CACHE_RELOAD:
@@ -4307,20 +4605,17 @@ class TA1:
                 episode_index = self.episode_index_cache[episode_id]
                 dataset_id = self.get_episode_dataset_id(episode_id=episode_id,
                                                          episode_index=episode_index)
-                data_index = self.episode_cache[dataset_id][episode_index]['data_index']
-                data_id = self.data_cache[episode_id][data_index]['data_id']
-                test_instance_id = self.create_test_instance(
-                    data_id=data_id,
-                    experiment_trial_id=self.experiment_trial_id,
-                    errormsgs=errormsgs)
-                self.episode_cache[dataset_id][episode_index]['test_instance_id'] \
-                    = test_instance_id
-                data = objects.TestingData(
-                    secret=request.secret,
-                    feature_vector=self.data_cache[episode_id][data_index]['feature_vector'],
-                    feature_vector_id=test_instance_id,
-                    novelty_indicator=self.get_novelty_indicator_value())
-                data.utc_remote_epoch_received = None
+                data_index = self.episode_cache[(dataset_id, episode_index)]['data_index']
+                if self.wait_for_data(episode_id=episode_id,
+                                      data_index=data_index,
+                                      errormsgs=errormsgs):
+                    data_id = self.data_cache[episode_id][data_index]['data_id']
+                    self.start_test_instance(data_id=data_id)
+                    data = objects.TestingData(
+                        secret=request.secret,
+                        feature_vector=self.data_cache[episode_id][data_index]['feature_vector'],
+                        novelty_indicator=self.get_novelty_indicator_value())
+                    data.utc_remote_epoch_received = None
         elif isinstance(request, objects.TestingDataPrediction):
             if not isinstance(self.STATE, objects.TestingEpisodeActive):
                 errormsgs.append('ERROR: Will not accept a TestingDataPrediction outside of the '
@@ -4331,22 +4626,11 @@ class TA1:
                 episode_index = self.episode_index_cache[episode_id]
                 dataset_id = self.get_episode_dataset_id(episode_id=episode_id,
                                                          episode_index=episode_index)
-                data_index = self.episode_cache[dataset_id][episode_index]['data_index']
-                dataset_size = self.episode_cache[dataset_id][episode_index]['size']
-                test_instance_id \
-                    = self.episode_cache[dataset_id][episode_index]['test_instance_id']
-                remote_stamp_arrived = objects.epoch_to_stamp(request.utc_remote_epoch_received)
-                remote_stamp_delivered = objects.epoch_to_stamp(request.utc_remote_epoch_sent)
-                self.update_test_instance(test_instance_id=test_instance_id,
-                                          remote_stamp_arrived=remote_stamp_arrived,
-                                          remote_stamp_delivered=remote_stamp_delivered,
-                                          errormsgs=errormsgs)
-                self.create_test_label(test_instance_id=test_instance_id,
-                                       label_prediction=request.label_prediction,
-                                       novelty=request.novelty,
-                                       novelty_probability=request.novelty_probability,
-                                       novelty_initiated=self.novelty_initiated,
-                                       errormsgs=errormsgs)
+                data_index = self.episode_cache[(dataset_id, episode_index)]['data_index']
+                dataset_size = self.episode_cache[(dataset_id, episode_index)]['size']
+                self.receive_test_instance(request=request)
+                self.finish_test_instance(label_prediction=request.label_prediction,
+                                          performance=None)
 
                 self.update_rolling_score(
                     solution=self.data_cache[episode_id][data_index]['label'],
@@ -4358,7 +4642,7 @@ class TA1:
                 del self.data_cache[episode_id][data_index]
 
                 # Increment the index on the dataset we just finished a test instance on.
-                self.episode_cache[dataset_id][episode_index]['data_index'] += 1
+                self.episode_cache[(dataset_id, episode_index)]['data_index'] += 1
 
                 # Check if we need to mark the flag for a dataset reload.
                 if len(self.data_cache[episode_id]) < self._DATA_CACHE_RELOAD:
@@ -4417,12 +4701,11 @@ class TA1:
             dataset_id = self.get_episode_dataset_id(episode_id=episode_id,
                                                      episode_index=episode_index)
             # Get the current data_index for the episode.
-            data_index = self.episode_cache[dataset_id][episode_index]['data_index']
+            data_index = self.episode_cache[(dataset_id, episode_index)]['data_index']
             # Load the episode data to the data_cache.
             self.load_data_to_cache(
                 episode_id=episode_id,
-                at_data_index=data_index,
-                errormsgs=errormsgs)
+                at_data_index=data_index)
 
         if self.STATE is not None:
             self._AMQP_EXP_CALLBACK_ID = self.amqp.call_later(
@@ -4470,24 +4753,24 @@ class TA1:
         if episode.data_type in [objects.DTYPE_TRAIN, objects.DTYPE_TEST]:
             self.log.info('prepare_episode({})'.format(str(episode)))
             # Get the next episode_id, episode_index, and dataset_id for the episode.
-            domain_id = self.domain_ids[episode.domain]
-            dataset_id = self.dataset_cache[domain_id][episode.data_type][episode.novelty][
-                episode.difficulty][episode.trial_novelty]['dataset_id']
+            dataset_id = self.get_episode_dataset(episode)['dataset_id']
             self.get_episode_ids(dataset_id=dataset_id,
                                  episode_index=episode.episode_index,
                                  errormsgs=errormsgs)
-            episode_id = self.episode_cache[dataset_id][episode.episode_index]['episode_id']
+            # Resolve the episode_cache entry once, the data requests for the episode reuse it.
+            self._current_episode = None
+            entry = self.get_episode_entry(episode)
+            episode_id = entry['episode_id']
             episode.episode_id = episode_id
             # Set the current data_index for the episode to 0.
-            self.episode_cache[dataset_id][episode.episode_index]['data_index'] = 0
-            self.episode_data_total = self.episode_cache[dataset_id][episode.episode_index]['size']
+            entry['data_index'] = 0
+            self.episode_data_total = entry['size']
             del self.rolling_score
             self.rolling_score = list()
             # Load the episode data to the data_cache.
             self.load_data_to_cache(
                 episode_id=episode_id,
-                at_data_index=0,
-                errormsgs=errormsgs)
+                at_data_index=0)
         elif episode.data_type in [objects.DTYPE_LIVE_TRAIN, objects.DTYPE_LIVE_TEST]:
             self.episode_data_count = 0
             del self._ta2_response
@@ -4513,70 +4796,46 @@ class TA1:
                                                     use_image=episode.use_image,
                                                     generator_config=self._exper_generator_config,
                                                     hint_level=episode.hint_level,
-                                                    phase=episode.phase)
+                                                    phase=episode.phase,
+                                                    binary_transport=self.amqp_binary,
+                                                    wire_codec=self.amqp_codec)
             self._live_thread.start()
             # Get the dataset_id so we can add a new episode.
-            domain_id = self.domain_ids[episode.domain]
-            """
-            self.log.debug('domain_id={} data_type={} novelty={} difficulty={} '
-                           'trial_novelty={}'.format(domain_id,
-                                                     episode.data_type,
-                                                     episode.novelty,
-                                                     episode.difficulty,
-                                                     episode.trial_novelty))
-            self.log.debug('{}'.format(self.dataset_cache[domain_id]))
-            self.log.debug('{}'.format(self.dataset_cache[domain_id][episode.data_type]))
-            self.log.debug('{}'.format(self.dataset_cache[domain_id][episode.data_type]
-                                       [episode.novelty]))
-            self.log.debug('{}'.format(self.dataset_cache[domain_id][episode.data_type]
-                                       [episode.novelty][episode.difficulty]))
-            self.log.debug('{}'.format(self.dataset_cache[domain_id][episode.data_type]
-                                       [episode.novelty][episode.difficulty]
-                                       [episode.trial_novelty]))
-            self.log.debug('{}'.format(self.dataset_cache[domain_id][episode.data_type]
-                                       [episode.novelty][episode.difficulty]
-                                       [episode.trial_novelty]['dataset_id']))
-            """
-            dataset_id = self.dataset_cache[domain_id][episode.data_type][episode.novelty][
-                episode.difficulty][episode.trial_novelty]['dataset_id']
+            dataset_id = self.get_episode_dataset(episode)['dataset_id']
             # Create the new episode and return the index.
             episode_index = self.add_episode_to_dataset(dataset_id=dataset_id,
                                                         seed=episode.seed,
                                                         errormsgs=errormsgs)
-            episode_id = self.episode_cache[dataset_id][episode_index]['episode_id']
+            episode_id = self.episode_cache[(dataset_id, episode_index)]['episode_id']
             # Save the episode_id and episode_index to the episode object.
             episode.episode_index = episode_index
             episode.episode_id = episode_id
+            # Resolve the episode_cache entry once, the data requests for the episode reuse it.
+            self._current_episode = None
+            self.get_episode_entry(episode)
         return
 
     def get_episode_data(self, request: objects.RequestData, episode: objects.Episode,
                          errormsgs: list) -> objects.AiqObject:
-        self.log.debug('get_episode_data(request={})'.format(str(request)))
+        self.log.debug('get_episode_data(request=%s)', rabbitmq.LogSummary(request))
         data = objects.AiqObject()
         # Check if recorded or live training episode.
         if episode.data_type in [objects.DTYPE_TRAIN, objects.DTYPE_TEST]:
-            # Get the episode_id, episode_index, and dataset_id for the episode.
-            domain_id = self.domain_ids[episode.domain]
-            dataset_id = self.dataset_cache[domain_id][episode.data_type][episode.novelty][
-                episode.difficulty][episode.trial_novelty]['dataset_id']
-            self.get_episode_ids(dataset_id=dataset_id,
-                                 episode_index=episode.episode_index,
-                                 errormsgs=errormsgs)
-            episode_id = self.episode_cache[dataset_id][episode.episode_index]['episode_id']
-            episode_index = episode.episode_index
+            # The episode_id was resolved in prepare_episode(), no need to query it again.
+            entry = self.get_episode_entry(episode)
+            episode_id = entry['episode_id']
 
             # Grab the data_index and data_id for the feature vector we will be sending.
-            # The data itself should already be in self.data_cache.
-            data_index = self.episode_cache[dataset_id][episode_index]['data_index']
+            # The data itself is read ahead into self.data_cache, only wait if it is not there yet.
+            data_index = entry['data_index']
+            if not self.wait_for_data(episode_id=episode_id,
+                                      data_index=data_index,
+                                      errormsgs=errormsgs):
+                return data
             data_id = self.data_cache[episode_id][data_index]['data_id']
-            # Create the test_instance row for this evaluation.
-            test_instance_id = self.create_test_instance(
-                data_id=data_id,
-                trial_episode_id=self.trial_episode_id,
-                errormsgs=errormsgs)
-            # Store the test_instance_id for use later.
-            self.episode_cache[dataset_id][episode_index]['test_instance_id'] \
-                = test_instance_id
+            # Start the test_instance for this evaluation, it is written once the prediction
+            # comes back.
+            self.start_test_instance(data_id=data_id)
             # Create the response object to send to TA2/SOTA.
             if episode.data_type == objects.DTYPE_TRAIN:
                 data = objects.TrainingData(
@@ -4600,7 +4859,7 @@ class TA1:
                     done = True
                 except queue.Empty:
                     self.amqp.process_data_events()
-            self.log.debug('GEN RESPONSE: {}'.format(str(response)))
+            self.log.debug('GEN RESPONSE: %s', rabbitmq.LogSummary(response))
             if isinstance(response, objects.ExperimentException):
                 data = copy.deepcopy(response)
                 self._live_thread.stop()
@@ -4613,32 +4872,19 @@ class TA1:
                         self.episode_hint_json = copy.deepcopy(response.feature_vector['hint'])
                     else:
                         self.episode_hint_json = None
-                # Grab the domain_id and dataset_id that we are dealing with.
-                domain_id = self.domain_ids[episode.domain]
-                dataset_id = self.dataset_cache[domain_id][episode.data_type][episode.novelty][
-                    episode.difficulty][episode.trial_novelty]['dataset_id']
+                # Grab the episode_cache entry that we are dealing with.
+                entry = self.get_episode_entry(episode)
                 # The next data_index is the current size, as we start with 0.
-                data_index = self.episode_cache[dataset_id][episode.episode_index]['size']
-                # Create the data instance in the database.
-                data_id = self.create_data_instance(episode_id=episode.episode_id,
-                                                    feature_vector=response.feature_vector,
-                                                    label=response.feature_label,
-                                                    data_index=data_index,
-                                                    errormsgs=errormsgs)
-                # Update the episode size in cache and in the database.
-                self.episode_cache[dataset_id][episode.episode_index]['size'] += 1
-                self.update_episode_size(episode_id=episode.episode_id,
-                                         size=self.episode_cache[dataset_id][episode.episode_index][
-                                             'size'],
-                                         errormsgs=errormsgs)
-                # Create the test_instance row for this evaluation.
-                test_instance_id = self.create_test_instance(
-                    data_id=data_id,
-                    trial_episode_id=self.trial_episode_id,
-                    errormsgs=errormsgs)
-                # Store the test_instance_id for use later.
-                self.episode_cache[dataset_id][episode.episode_index]['test_instance_id'] \
-                    = test_instance_id
+                data_index = entry['size']
+                # Update the episode size in cache, the database gets it when the episode ends.
+                entry['size'] += 1
+                self._live_episode_sizes[episode.episode_id] = entry['size']
+                # Start the data instance and test_instance for this evaluation, both are
+                # written once the prediction comes back.
+                self.start_test_instance(episode_id=episode.episode_id,
+                                         feature_vector=response.feature_vector,
+                                         label=response.feature_label,
+                                         data_index=data_index)
                 # Create the response object to send to TA2/SOTA.
                 if episode.data_type == objects.DTYPE_LIVE_TRAIN:
                     data = objects.TrainingData(
@@ -4656,34 +4902,24 @@ class TA1:
     def process_episode_data_prediction(self, request: objects.BasicDataPrediction,
                                         episode: objects.Episode, errormsgs: list)\
             -> objects.AiqObject:
-        self.log.debug('process_episode_data_prediction({})'.format(str(request)))
+        self.log.debug('process_episode_data_prediction(%s)', rabbitmq.LogSummary(request))
         data = objects.AiqObject()
         # We have some basic things that apply to ALL episode types first.
-        # Get the episode_id, episode_index, and dataset_id for the episode.
-        domain_id = self.domain_ids[episode.domain]
-        dataset_id = self.dataset_cache[domain_id][episode.data_type][episode.novelty][
-            episode.difficulty][episode.trial_novelty]['dataset_id']
-        test_instance_id \
-            = self.episode_cache[dataset_id][episode.episode_index]['test_instance_id']
-        remote_stamp_arrived = objects.epoch_to_stamp(request.utc_remote_epoch_received)
-        remote_stamp_delivered = objects.epoch_to_stamp(request.utc_remote_epoch_sent)
-        self.update_test_instance(test_instance_id=test_instance_id,
-                                  remote_stamp_arrived=remote_stamp_arrived,
-                                  remote_stamp_delivered=remote_stamp_delivered,
-                                  errormsgs=errormsgs)
+        # Get the episode_cache entry for the episode.
+        entry = self.get_episode_entry(episode)
+        self.receive_test_instance(request=request)
         # Check if recorded or live training episode.
         if episode.data_type in [objects.DTYPE_TRAIN, objects.DTYPE_TEST]:
             # Get the data_index and episode size.
-            data_index = self.episode_cache[dataset_id][episode.episode_index]['data_index']
-            dataset_size = self.episode_cache[dataset_id][episode.episode_index]['size']
+            data_index = entry['data_index']
+            dataset_size = entry['size']
             # Update the score.
-            self.log.debug('data_cache keys: {}'.format(str(self.data_cache.keys())))
-            self.log.debug('episode_id = {}'.format(episode.episode_id))
-            self.log.debug('data_cache[ep_id] keys: {}'.format(str(self.data_cache[
-                episode.episode_id].keys())))
-            self.log.debug('data_index = {}'.format(data_index))
-            self.log.debug('data_cache object = {}'.format(
-                self.data_cache[episode.episode_id][data_index]))
+            self.log.debug('data_cache keys: %s', self.data_cache.keys())
+            self.log.debug('episode_id = %s', episode.episode_id)
+            self.log.debug('data_cache[ep_id] keys: %s', self.data_cache[episode.episode_id].keys())
+            self.log.debug('data_index = %s', data_index)
+            self.log.debug('data_cache object = %s',
+                           rabbitmq.LogSummary(self.data_cache[episode.episode_id][data_index]))
             self.update_rolling_score(
                 solution=self.data_cache[episode.episode_id][data_index]['label'],
                 prediction=request.label_prediction)
@@ -4696,17 +4932,15 @@ class TA1:
                                                                   data_index]['label'])})
             self.trial_episode_performance = performance
             # Log the response values in the database.
-            self.create_test_label(test_instance_id=test_instance_id,
-                                   label_prediction=request.label_prediction,
-                                   performance=performance,
-                                   feedback=feedback,
-                                   errormsgs=errormsgs)
+            self.finish_test_instance(label_prediction=request.label_prediction,
+                                      performance=performance,
+                                      feedback=feedback)
 
             # Go ahead and delete the data instance.
             del self.data_cache[episode.episode_id][data_index]
 
             # Increment the index on the dataset we just finished a test instance on.
-            self.episode_cache[dataset_id][episode.episode_index]['data_index'] += 1
+            entry['data_index'] += 1
 
             # Check if we need to mark the flag for a dataset reload.
             if len(self.data_cache[episode.episode_id]) < self._DATA_CACHE_RELOAD:
@@ -4760,7 +4994,7 @@ class TA1:
                     done = True
                 except queue.Empty:
                     self.amqp.process_data_events()
-            self.log.debug('GEN RESPONSE: {}'.format(str(response)))
+            self.log.debug('GEN RESPONSE: %s', rabbitmq.LogSummary(response))
             feedback = None
             if self.trial_budget_active:
                 if random.random() < self._experiment.budget:
@@ -4778,11 +5012,9 @@ class TA1:
                         response = objects.EpisodeEnd(performance=response.performance,
                                                       feedback=feedback)
                 # Log the response values in the database.
-                self.create_test_label(test_instance_id=test_instance_id,
-                                       label_prediction=request.label_prediction,
-                                       performance=response.performance,
-                                       feedback=feedback,
-                                       errormsgs=errormsgs)
+                self.finish_test_instance(label_prediction=request.label_prediction,
+                                          performance=response.performance,
+                                          feedback=feedback)
                 if episode.data_type == objects.DTYPE_LIVE_TRAIN:
                     if isinstance(response, objects.EpisodeEnd):
                         data = objects.TrainingEpisodeEnd(performance=response.performance,
@@ -4807,8 +5039,19 @@ class TA1:
                     self._live_thread = None
         return data
 
+    def refresh_episode_data_cache(self, episode: objects.Episode, errormsgs: list):
+        # Get the next episode_id and the current data_index for the episode.
+        episode_id = episode.episode_id
+        data_index = self.get_episode_entry(episode)['data_index']
+        # Load the episode data to the data_cache.
+        self.load_data_to_cache(
+            episode_id=episode_id,
+            at_data_index=data_index)
+        self.refresh_dataset_cache = False
+        return
+
     def on_sail_on_request(self, ch, method, props, body, request):
-        self.log.debug('on_sail_on_request( {} )'.format(str(request)))
+        self.log.debug('on_sail_on_request( %s )', rabbitmq.LogSummary(request))
         self.log.debug('STATE: {}'.format(str(self.STATE)))
         errormsgs = list()
         data = None
@@ -4843,6 +5086,8 @@ class TA1:
         #         - Client then requests objects.TestingData, and response with
         #           objects.TestingDataPrediction. This repeats until we send an
         #           objects.TestingEpisodeEnd response instead of an objects.TestingDataAck.
+        #           When the prediction sets request_next, the objects.TestingDataAck carries the
+        #           next objects.TestingData so the client skips requesting it.
         #         - During this, the TA1 state is objects.TestingEpisodeActive.
         #     - objects.TrialEnd
         # - objects.ExperimentEnd
@@ -4861,7 +5106,7 @@ class TA1:
                     self.STATE = objects.TrainingStart()
                 else:
                     # Do a little housekeeping on any abandoned trials.
-                    self.clear_abandoned_trials(errormsgs=errormsgs)
+                    self.clear_abandoned_trials()
                     # We are skipping testing and jumping to 1 or more trials.
                     self.experiment_trial_id = self.lock_experiment_trial(
                         model_experiment_id=self.model_experiment_id,
@@ -4899,6 +5144,9 @@ class TA1:
                 # Prepare the training episode.
                 self.prepare_episode(episode=episode,
                                      errormsgs=errormsgs)
+                self.prefetch_next_episode(episodes=self._experiment.training.episodes,
+                                           index=self._exper_train_index + 1,
+                                           errormsgs=errormsgs)
 
                 # Start the trial_episode and get the trial_episode_id.
                 self.trial_episode_id = self.start_trial_episode(
@@ -4935,7 +5183,7 @@ class TA1:
                     self.STATE = objects.ExperimentEnd()
                 else:
                     # Do a little housekeeping on any abandoned trials.
-                    self.clear_abandoned_trials(errormsgs=errormsgs)
+                    self.clear_abandoned_trials()
                     # There was no flag for no testing, so we continue on to try and secure a
                     # trial to evaluate on.
                     self.experiment_trial_id = self.lock_experiment_trial(
@@ -5001,10 +5249,7 @@ class TA1:
                 if episode.data_type == objects.DTYPE_TEST:
                     for i in range(len(trial.episodes)):
                         # Get the episode_id, episode_index, and dataset_id for the episode.
-                        domain_id = self.domain_ids[trial.episodes[i].domain]
-                        dataset_id = self.dataset_cache[domain_id][episode.data_type][
-                            episode.novelty][episode.difficulty][episode.trial_novelty][
-                            'dataset_id']
+                        dataset_id = self.get_episode_dataset(episode)['dataset_id']
 
                         # Load episode_id and size to episode_cache from the database.
                         self.get_episode_ids(dataset_id=dataset_id,
@@ -5013,29 +5258,21 @@ class TA1:
                         self.log.debug('i = {}'.format(i))
                         self.log.debug('len(trial.episodes) = {}'.format(len(trial.episodes)))
                         self.log.debug('dataset_id = {}'.format(dataset_id))
-                        self.log.debug('episode_cache dataset_ids = {}'.format(
-                            str(list(self.episode_cache.keys()).sort())))
                         self.log.debug('trial.episodes[i].episode_index = {}'.format(
                             trial.episodes[i].episode_index))
-                        self.log.debug('episode_cache[dataset_id].keys = {}'.format(
-                            str(list(self.episode_cache[dataset_id].keys()).sort())))
+                        self.log.debug('episode_cache keys = {}'.format(
+                            str(sorted(self.episode_cache.keys()))))
                         # Update the episode_id in the Episode object.
-                        trial.episodes[i].episode_id = self.episode_cache[dataset_id][
-                            trial.episodes[i].episode_index]['episode_id']
-
-                    # Get the dataset_id for the current episode.
-                    domain_id = self.domain_ids[episode.domain]
-                    dataset_id = self.dataset_cache[domain_id][episode.data_type][episode.novelty][
-                        episode.difficulty][episode.trial_novelty]['dataset_id']
+                        trial.episodes[i].episode_id = self.episode_cache[(
+                            dataset_id, trial.episodes[i].episode_index)]['episode_id']
 
-                    # Set the current data_index for the episode to 0.
-                    self.episode_cache[dataset_id][episode.episode_index]['data_index'] = 0
+                    # Set the current data_index for the current episode to 0.
+                    self.get_episode_entry(episode)['data_index'] = 0
 
                     # Load the episode data to the data_cache.
                     self.load_data_to_cache(
                         episode_id=episode.episode_id,
-                        at_data_index=0,
-                        errormsgs=errormsgs)
+                        at_data_index=0)
             elif isinstance(self.STATE, objects.TestingEpisodeStart):
                 self.STATE = objects.TestingEpisodeActive()
 
@@ -5049,6 +5286,9 @@ class TA1:
                 # Prepare the testing episode.
                 self.prepare_episode(episode=episode,
                                      errormsgs=errormsgs)
+                self.prefetch_next_episode(episodes=trial.episodes,
+                                           index=self._exper_episode_index + 1,
+                                           errormsgs=errormsgs)
 
                 # Start the trial_episode and get the trial_episode_id.
                 self.trial_episode_id = self.start_trial_episode(
@@ -5081,7 +5321,7 @@ class TA1:
                     self.STATE = objects.ExperimentEnd()
                 else:
                     # Do a little housekeeping on any abandoned trials.
-                    self.clear_abandoned_trials(errormsgs=errormsgs)
+                    self.clear_abandoned_trials()
                     # Lets see if we can get another trial to process.
                     self.experiment_trial_id = self.lock_experiment_trial(
                         model_experiment_id=self.model_experiment_id,
@@ -5144,10 +5384,10 @@ class TA1:
                 self.domain_cache = list()
                 del self.dataset_cache
                 self.dataset_cache = dict()
-                del self.episode_cache
-                self.episode_cache = dict()
+                self.reset_episode_cache()
                 del self.data_cache
                 self.data_cache = dict()
+                self.data_prefetcher.reset()
                 del self.rolling_score
                 self.rolling_score = list()
                 if self._AMQP_EXP_CALLBACK_ID is not None:
@@ -5197,6 +5437,7 @@ class TA1:
                 if isinstance(data, objects.EpisodeEnd):
                     self.stop_trial_episode(trial_episode_id=self.trial_episode_id,
                                             errormsgs=errormsgs)
+                    self.invalidate_episode_ids(episode=episode)
                     # Check to see if we have a next training episode.
                     next_episode_index = self._exper_train_index + 1
                     if next_episode_index < len(self._experiment.training.episodes) and \
@@ -5285,6 +5526,7 @@ class TA1:
                 if isinstance(data, objects.EpisodeEnd):
                     self.stop_trial_episode(trial_episode_id=self.trial_episode_id,
                                             errormsgs=errormsgs)
+                    self.invalidate_episode_ids(episode=episode)
                     # Check to see if we have a next testing episode.
                     next_episode_index = self._exper_episode_index + 1
                     if next_episode_index < len(trial.episodes) and \
@@ -5302,6 +5544,21 @@ class TA1:
                                        action=data.obj_type,
                                        data_object=data.get_json_obj(),
                                        experiment_trial_id=self.experiment_trial_id))
+                elif isinstance(data, objects.TestingDataAck) and request.request_next \
+                        and len(errormsgs) == 0:
+                    # Send the next TestingData with the ack, saving the client a round trip.
+                    if self.refresh_dataset_cache:
+                        self.refresh_episode_data_cache(episode=episode, errormsgs=errormsgs)
+                    next_data = self.get_episode_data(
+                        request=objects.RequestTestingData(
+                            model_experiment_id=self.model_experiment_id,
+                            secret=request.secret),
+                        episode=episode,
+                        errormsgs=errormsgs)
+                    if isinstance(next_data, objects.TestingData):
+                        data.testing_data = next_data
+                    elif isinstance(next_data, objects.ExperimentException):
+                        data = next_data
         elif isinstance(request, objects.TestingEpisodeNovelty):
             if not isinstance(self.STATE, (objects.TestingEpisodeStart, objects.TestingEnd)):
                 errormsgs.append('ERROR: Will not accept a TestingEpisodeNovelty in this state!')
@@ -5343,26 +5600,16 @@ class TA1:
                                            casas_object=response,
                                            correlation_id=props.correlation_id)
             elif data is not None:
-                self.log.debug('RESPONSE: {}'.format(str(data.get_json())))
+                self.log.debug('RESPONSE: %s', rabbitmq.LogSummary(data))
                 self.amqp.publish_to_queue(queue_name=props.reply_to,
                                            casas_object=data,
-                                           correlation_id=props.correlation_id)
+                                           correlation_id=props.correlation_id,
+                                           content_type=self.amqp.get_reply_content_type(props))
 
         self.log.debug('STATE: {}'.format(str(self.STATE)))
 
         if self.refresh_dataset_cache and current_episode is not None:
-            # Get the next episode_id, episode_index, and dataset_id for the episode.
-            episode_id = current_episode.episode_id
-            episode_index = current_episode.episode_index
-            dataset_id = self.get_episode_dataset_id(episode_id=episode_id,
-                                                     episode_index=episode_index)
-            # Get the current data_index for the episode.
-            data_index = self.episode_cache[dataset_id][episode_index]['data_index']
-            # Load the episode data to the data_cache.
-            self.load_data_to_cache(
-                episode_id=episode_id,
-                at_data_index=data_index,
-                errormsgs=errormsgs)
+            self.refresh_episode_data_cache(episode=current_episode, errormsgs=errormsgs)
 
         if self.STATE is not None:
             self._AMQP_EXP_CALLBACK_ID = self.amqp.call_later(
@@ -5379,6 +5626,7 @@ class TA1:
 
     def force_end_experiment(self):
         self.log.warning('force_end_experiment({})'.format(self.model_experiment_id))
+        self.flush_test_instances(errormsgs=list())
         if self.experiment_type == objects.TYPE_EXPERIMENT_AIQ:
             if self.model_experiment_id is not None:
                 self.log_message(msg=LogMessage(
@@ -5425,10 +5673,10 @@ class TA1:
             self.domain_cache = list()
             del self.dataset_cache
             self.dataset_cache = dict()
-            del self.episode_cache
-            self.episode_cache = dict()
+            self.reset_episode_cache()
             del self.data_cache
             self.data_cache = dict()
+            self.data_prefetcher.reset()
             del self.rolling_score
             self.rolling_score = list()
             if self._AMQP_EXP_CALLBACK_ID is not None:
@@ -5480,10 +5728,10 @@ class TA1:
             self.domain_cache = list()
             del self.dataset_cache
             self.dataset_cache = dict()
-            del self.episode_cache
-            self.episode_cache = dict()
+            self.reset_episode_cache()
             del self.data_cache
             self.data_cache = dict()
+            self.data_prefetcher.reset()
             del self.rolling_score
             self.rolling_score = list()
             if self._live_thread is not None:
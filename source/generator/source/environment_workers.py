@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+# ************************************************************************************************ #
+# **                                                                                            ** #
+# **    AIQ-SAIL-ON Generator Environment Workers                                               ** #
+# **                                                                                            ** #
+# **        Brian L Thomas, 2020                                                                ** #
+# **                                                                                            ** #
+# **  Tools by the AI Lab - Artificial Intelligence Quotient (AIQ) in the School of Electrical  ** #
+# **  Engineering and Computer Science at Washington State University.                          ** #
+# **                                                                                            ** #
+# **  Copyright Washington State University, 2020                                               ** #
+# **  Copyright Brian L. Thomas, 2020                                                           ** #
+# **                                                                                            ** #
+# **  All rights reserved                                                                       ** #
+# **  Modification, distribution, and sale of this work is prohibited without permission from   ** #
+# **  Washington State University.                                                              ** #
+# **                                                                                            ** #
+# **  Contact: Brian L. Thomas (bthomas1@wsu.edu)                                               ** #
+# **  Contact: Larry Holder (holder@wsu.edu)                                                    ** #
+# **  Contact: Diane J. Cook (djcook@wsu.edu)                                                   ** #
+# ************************************************************************************************ #
+
+import collections
+import logging
+import multiprocessing
+import threading
+import time
+import traceback
+import uuid
+
+from objects import objects
+
+
+def build_test_handler(domain: str, novelty: int, difficulty: str, seed: int,
+                       trial_novelty: int, day_offset: int, use_image: bool,
+                       ta2_generator_config: dict, hint_level: int, phase: str):
+    test_handler = None
+    if phase == objects.PHASE_2:
+        from env_generator.phase_2.test_handler import TestHandler as TestHandler_2
+        test_handler = TestHandler_2(domain=domain,
+                                     novelty=novelty,
+                                     difficulty=difficulty,
+                                     seed=seed,
+                                     trial_novelty=trial_novelty,
+                                     day_offset=day_offset,
+                                     use_img=use_image,
+                                     ta2_generator_config=ta2_generator_config)
+    elif phase == objects.PHASE_3:
+        from env_generator.phase_3.test_handler import TestHandler as TestHandler_3
+        test_handler = TestHandler_3(domain=domain,
+                                     novelty=novelty,
+                                     difficulty=difficulty,
+                                     seed=seed,
+                                     trial_novelty=trial_novelty,
+                                     day_offset=day_offset,
+                                     use_img=use_image,
+                                     ta2_generator_config=ta2_generator_config,
+                                     hint_level=hint_level,
+                                     phase=phase)
+    elif phase in [objects.PHASE_4A, objects.PHASE_4B]:
+        from env_generator.phase_4.test_handler import TestHandler as TestHandler_4
+        test_handler = TestHandler_4(domain=domain,
+                                     novelty=novelty,
+                                     difficulty=difficulty,
+                                     seed=seed,
+                                     trial_novelty=trial_novelty,
+                                     day_offset=day_offset,
+                                     use_img=use_image,
+                                     ta2_generator_config=ta2_generator_config,
+                                     hint_level=hint_level,
+                                     phase=phase)
+    return test_handler
+
+
+class WarmEnvironmentPool(object):
+    """Keeps the TestHandlers of finished episodes, so an episode with the same domain, novelty,
+    difficulty and phase re-seeds and resets one instead of building a new environment.  The
+    least recently used handlers are closed once more than size are kept.  New handlers come
+    from build_function, which takes the keyword arguments of build_test_handler().
+    """
+    REUSABLE_DOMAINS = list(['cartpole', 'vizdoom'])
+
+    def __init__(self, log: logging.Logger, size: int, build_function=build_test_handler):
+        self.log = log.getChild('WarmEnvironmentPool')
+        self.size = size
+        self.build_function = build_function
+        # Handlers are built on a separate thread and returned from the main one.
+        self.lock = threading.Lock()
+        self.handlers = collections.OrderedDict()
+        self._handler_id = 0
+        return
+
+    @staticmethod
+    def get_key(domain: str, novelty: int, difficulty: str, phase: str, use_image: bool) -> tuple:
+        # The image flag decides how the environment is built, so it is part of the key too.
+        return tuple((domain, novelty, difficulty, phase, use_image))
+
+    def acquire(self, domain: str, novelty: int, difficulty: str, seed: int,
+                trial_novelty: int, day_offset: int, use_image: bool,
+                ta2_generator_config: dict, hint_level: int, phase: str):
+        key = self.get_key(domain=domain,
+                           novelty=novelty,
+                           difficulty=difficulty,
+                           phase=phase,
+                           use_image=use_image)
+        test_handler = None
+        with self.lock:
+            for handler_id in reversed(self.handlers):
+                if self.handlers[handler_id][0] == key:
+                    test_handler = self.handlers.pop(handler_id)[1]
+                    break
+
+        if test_handler is not None:
+            try:
+                test_handler.restart(seed=seed,
+                                     trial_novelty=trial_novelty,
+                                     day_offset=day_offset,
+                                     ta2_generator_config=ta2_generator_config,
+                                     hint_level=hint_level)
+                self.log.debug('Reusing warm environment {}'.format(key))
+                return test_handler
+            except Exception:
+                self.log.warning('Warm environment {} failed to restart, building a new one.'
+                                 .format(key))
+                self.log.debug(traceback.format_exc())
+                self.close(test_handler=test_handler)
+
+        return self.build_function(domain=domain,
+                                   novelty=novelty,
+                                   difficulty=difficulty,
+                                   seed=seed,
+                                   trial_novelty=trial_novelty,
+                                   day_offset=day_offset,
+                                   use_image=use_image,
+                                   ta2_generator_config=ta2_generator_config,
+                                   hint_level=hint_level,
+                                   phase=phase)
+
+    def release(self, test_handler):
+        # Only the phase 3 handlers know how to restart their environment.
+        if self.size < 1 or not hasattr(test_handler, 'restart') \
+                or test_handler.domain not in self.REUSABLE_DOMAINS:
+            self.close(test_handler=test_handler)
+            return
+
+        key = self.get_key(domain=test_handler.domain,
+                           novelty=test_handler.novelty,
+                           difficulty=test_handler.difficulty,
+                           phase=test_handler.phase,
+                           use_image=test_handler.use_img)
+        evicted = list()
+        with self.lock:
+            self._handler_id += 1
+            self.handlers[self._handler_id] = tuple((key, test_handler))
+            while len(self.handlers) > self.size:
+                evicted.append(self.handlers.popitem(last=False)[1][1])
+
+        for handler in evicted:
+            self.close(test_handler=handler)
+        return
+
+    def clear(self):
+        with self.lock:
+            handlers = list(self.handlers.values())
+            self.handlers.clear()
+
+        for key, handler in handlers:
+            self.close(test_handler=handler)
+        return
+
+    def close(self, test_handler):
+        if hasattr(test_handler, 'close'):
+            try:
+                test_handler.close()
+            except Exception:
+                self.log.debug(traceback.format_exc())
+        return
+
+
+def run_environment_worker(connection, frame_buffer, frame_size: int, warm_pool_size: int,
+                           build_function):
+    """Body of a worker process.  Hosts the TestHandlers of the environments it is given and
+    answers the commands sent by EnvironmentWorkerPool over connection.  Rendered frames are
+    written to the environment's slot in frame_buffer instead of being pickled through the pipe.
+    """
+    handlers = dict()
+    warm_pool = WarmEnvironmentPool(log=logging.getLogger(__name__),
+                                    size=warm_pool_size,
+                                    build_function=build_function)
+    while True:
+        command = connection.recv()
+        if command is None:
+            warm_pool.clear()
+            break
+        call_id, env_id, name, kwargs = command
+        error = None
+        result = None
+        try:
+            if name == 'start':
+                handlers[env_id] = warm_pool.acquire(**kwargs)
+            elif name == 'observe':
+                handler = handlers[env_id]
+                feature_vector = dict(handler.get_feature_vector())
+                frame_length = None
+                image = feature_vector.get('image')
+                if isinstance(image, bytes) and len(image) <= frame_size:
+                    offset = kwargs['slot'] * frame_size
+                    frame_length = len(image)
+                    memoryview(frame_buffer).cast('B')[offset:offset + frame_length] = image
+                    feature_vector['image'] = None
+                result = (feature_vector, handler.get_feature_label(), frame_length)
+            elif name == 'step':
+                handler = handlers[env_id]
+                performance = handler.apply_action(kwargs['label_prediction'])
+                result = (performance, handler.is_episode_done())
+            elif name == 'stop':
+                handler = handlers.pop(env_id, None)
+                if handler is not None:
+                    warm_pool.release(test_handler=handler)
+        except Exception:
+            error = traceback.format_exc()
+        connection.send((call_id, error, result))
+    return
+
+
+class EnvironmentWorker(object):
+    def __init__(self, context, slots: int, frame_size: int, warm_pool_size: int,
+                 build_function):
+        self.connection, child_connection = context.Pipe()
+        # One frame slot per environment this worker can host, shared with the process.
+        self.frame_buffer = context.RawArray('B', slots * frame_size)
+        self.free_slots = list(range(slots))
+        self.replies = dict()
+        self.environments = 0
+        self.process = context.Process(target=run_environment_worker,
+                                       args=(child_connection, self.frame_buffer, frame_size,
+                                             warm_pool_size, build_function),
+                                       daemon=True)
+        return
+
+
+class RemoteTestHandler(object):
+    """Stands in for a TestHandler that lives in a worker process, with the same methods."""
+    def __init__(self, pool, worker: EnvironmentWorker, env_id: str, slot: int):
+        self.pool = pool
+        self.worker = worker
+        self.env_id = env_id
+        self.slot = slot
+        self.feature_label = dict()
+        self.is_done = False
+        return
+
+    def get_feature_vector(self) -> dict:
+        feature_vector, self.feature_label, frame_length = self.pool.call(
+            worker=self.worker,
+            env_id=self.env_id,
+            name='observe',
+            kwargs=dict({'slot': self.slot}))
+        if frame_length is not None:
+            offset = self.slot * self.pool.frame_size
+            feature_vector['image'] = bytes(
+                memoryview(self.worker.frame_buffer).cast('B')[offset:offset + frame_length])
+        return feature_vector
+
+    def get_feature_label(self) -> dict:
+        return self.feature_label
+
+    def apply_action(self, action: dict) -> float:
+        performance, self.is_done = self.pool.call(worker=self.worker,
+                                                   env_id=self.env_id,
+                                                   name='step',
+                                                   kwargs=dict({'label_prediction': action}))
+        return performance
+
+    def is_episode_done(self) -> bool:
+        return self.is_done
+
+    def close(self):
+        self.pool.stop_environment(test_handler=self)
+        return
+
+
+class EnvironmentWorkerPool(object):
+    """Steps the environments in a pool of worker processes, so the process talking to the broker
+    only does I/O.  While a worker is busy, idle_function is called to keep heartbeats and the
+    other episodes going.  build_function is pickled to the workers, so it has to be a module
+    level function.
+    """
+    def __init__(self, log: logging.Logger, processes: int, max_environments: int,
+                 frame_size: int, warm_pool_size: int, idle_function,
+                 build_function=build_test_handler):
+        self.log = log.getChild('EnvironmentWorkerPool')
+        self.frame_size = frame_size
+        self.warm_pool_size = warm_pool_size
+        self.build_function = build_function
+        self.idle_function = idle_function
+        # Spawned rather than forked, so the workers do not inherit the broker connection.
+        self.context = multiprocessing.get_context('spawn')
+        self.slots = int((max_environments + processes - 1) / processes)
+        self.workers = list()
+        for i in range(processes):
+            self.workers.append(self.new_worker())
+        self._call_id = 0
+        return
+
+    def new_worker(self) -> EnvironmentWorker:
+        return EnvironmentWorker(context=self.context,
+                                 slots=self.slots,
+                                 frame_size=self.frame_size,
+                                 warm_pool_size=self.warm_pool_size,
+                                 build_function=self.build_function)
+
+    def start(self):
+        for worker in self.workers:
+            worker.process.start()
+        return
+
+    def replace_dead_workers(self):
+        # The environments of a dead worker went with it, so its replacement starts empty.
+        for index, worker in enumerate(self.workers):
+            if not worker.process.is_alive():
+                self.log.warning('Environment worker process {} died, starting a new one.'
+                                 .format(worker.process.pid))
+                worker.connection.close()
+                self.workers[index] = self.new_worker()
+                self.workers[index].process.start()
+        return
+
+    def stop(self):
+        for worker in self.workers:
+            if worker.process.is_alive():
+                worker.connection.send(None)
+        for worker in self.workers:
+            worker.process.join(timeout=5.0)
+        return
+
+    def call(self, worker: EnvironmentWorker, env_id: str, name: str, kwargs: dict):
+        self._call_id += 1
+        call_id = self._call_id
+        try:
+            worker.connection.send((call_id, env_id, name, kwargs))
+        except OSError:
+            # The pipe is broken, the loop below finds the process gone.
+            pass
+        # Callbacks run by idle_function may wait on the same worker, so replies are kept by
+        # call_id for whichever caller they belong to.
+        while call_id not in worker.replies:
+            try:
+                if worker.connection.poll(0.01):
+                    reply = worker.connection.recv()
+                    worker.replies[reply[0]] = reply
+                    continue
+            except (EOFError, OSError):
+                # The other end is gone, wait for the process to be reaped below.
+                time.sleep(0.01)
+            if not worker.process.is_alive():
+                self.replace_dead_workers()
+                raise objects.AiqExperimentException('Environment worker process died.')
+            self.idle_function()
+        call_id, error, result = worker.replies.pop(call_id)
+        if error is not None:
+            self.log.error(error)
+            raise objects.AiqExperimentException('Environment {} failed in {}().'.format(env_id,
+                                                                                         name))
+        return result
+
+    def start_environment(self, **kwargs) -> RemoteTestHandler:
+        self.replace_dead_workers()
+        worker = min(self.workers, key=lambda w: w.environments)
+        if len(worker.free_slots) == 0:
+            raise objects.AiqExperimentException('No environment slots are free.')
+        test_handler = RemoteTestHandler(pool=self,
+                                         worker=worker,
+                                         env_id=str(uuid.uuid4().hex),
+                                         slot=worker.free_slots.pop())
+        worker.environments += 1
+        try:
+            self.call(worker=worker, env_id=test_handler.env_id, name='start', kwargs=kwargs)
+        except objects.AiqExperimentException:
+            self.release(test_handler=test_handler)
+            raise
+        return test_handler
+
+    def stop_environment(self, test_handler: RemoteTestHandler):
+        if test_handler.worker not in self.workers:
+            # Its worker died and was replaced, there is nothing left to stop.
+            return
+        try:
+            self.call(worker=test_handler.worker, env_id=test_handler.env_id, name='stop',
+                      kwargs=dict())
+        finally:
+            self.release(test_handler=test_handler)
+        return
+
+    def release(self, test_handler: RemoteTestHandler):
+        test_handler.worker.environments -= 1
+        test_handler.worker.free_slots.append(test_handler.slot)
+        return
@@ -129,6 +129,10 @@ class TA2Logic(object):
         self._amqp_vhost = self._config.get("amqp", "vhost")
         self._amqp_port = self._config.getint("amqp", "port")
         self._amqp_ssl = self._config.getboolean("amqp", "ssl")
+        self._amqp_binary = self._config.getboolean("amqp", "binary_transport")
+        self._amqp_codec = self._config.get("amqp", "wire_codec")
+        objects.set_zero_copy(self._config.getboolean("amqp", "zero_copy"))
+        self._amqp_pipeline = self._config.getboolean("amqp", "pipeline_steps")
 
         self._description = None
         self._seed = None
@@ -195,13 +199,7 @@ class TA2Logic(object):
             raise objects.AiqDataException('You cannot request just one trial of work without '
                                            'providing the experiment_secret in the config.')
 
-        self._amqp = rabbitmq.Connection(agent_name=self._agent_name,
-                                         amqp_user=self._amqp_user,
-                                         amqp_pass=self._amqp_pass,
-                                         amqp_host=self._amqp_host,
-                                         amqp_port=self._amqp_port,
-                                         amqp_vhost=self._amqp_vhost,
-                                         amqp_ssl=self._amqp_ssl)
+        self._amqp = self._build_connection()
 
         self._model_filename_pat = 'model/model.TA2.{}.{}.file'.format(self._sail_on_domain, '{}')
         self._model_filename = None
@@ -209,6 +207,17 @@ class TA2Logic(object):
         self.end_experiment_early = False
         return
 
+    def _build_connection(self):
+        return rabbitmq.Connection(agent_name=self._agent_name,
+                                   amqp_user=self._amqp_user,
+                                   amqp_pass=self._amqp_pass,
+                                   amqp_host=self._amqp_host,
+                                   amqp_port=self._amqp_port,
+                                   amqp_vhost=self._amqp_vhost,
+                                   amqp_ssl=self._amqp_ssl,
+                                   binary_transport=self._amqp_binary,
+                                   wire_codec=self._amqp_codec)
+
     def _get_command_line_options(self):
         parser = optparse.OptionParser(usage="usage: %prog [options]")
         parser = self._add_command_line_options(parser)
@@ -293,6 +302,10 @@ class TA2Logic(object):
         config.set("amqp", "vhost", "/")
         config.set("amqp", "port", "5671")
         config.set("amqp", "ssl", "True")
+        config.set("amqp", "binary_transport", "False")
+        config.set("amqp", "wire_codec", objects.WIRE_CODEC_JSON)
+        config.set("amqp", "zero_copy", "False")
+        config.set("amqp", "pipeline_steps", "False")
         return config
 
     def _write_config_file(self):
@@ -319,6 +332,17 @@ class TA2Logic(object):
                        'physical_ram': physical_ram})
         return result
 
+    @staticmethod
+    def _unpack_image(feature_vector: dict):
+        if 'image' in feature_vector:
+            if feature_vector['image'] is not None:
+                comp_image = feature_vector['image']
+                # Images arrive as raw bytes in a binary frame, or base64 in plain JSON.
+                if isinstance(comp_image, str):
+                    comp_image = b64decode(comp_image)
+                feature_vector['image'] = blosc.unpack_array(comp_image)
+        return
+
     def _run_sail_on_trial(self):
         # We already called the trial start function with the trial number.
 
@@ -342,16 +366,14 @@ class TA2Logic(object):
                 self.testing_episode_start(episode_number=my_state.episode_number)
 
                 # Collect testing data until we get TestingEpisodeEnd.
+                test_data = None
                 while not isinstance(my_state, objects.TestingEpisodeEnd):
-                    # Get testing data.
-                    test_data = self._amqp.get_testing_data()
+                    # Get testing data, unless the last TestingDataAck already carried it.
+                    if test_data is None:
+                        test_data = self._amqp.get_testing_data()
 
                     # Decompress the image if there is one.
-                    if 'image' in test_data.feature_vector:
-                        if test_data.feature_vector['image'] is not None:
-                            comp_image = b64decode(test_data.feature_vector['image'])
-                            test_data.feature_vector['image'] \
-                                = blosc.unpack_array(comp_image)
+                    self._unpack_image(feature_vector=test_data.feature_vector)
 
                     # Evaluate the testing data.
                     label_prediction = \
@@ -362,10 +384,13 @@ class TA2Logic(object):
                     # the training episode is over.
                     my_state = self._amqp.send_testing_predictions(
                         label_prediction=label_prediction,
-                        end_early=self.end_experiment_early)
+                        end_early=self.end_experiment_early,
+                        request_next=self._amqp_pipeline)
+                    test_data = None
                     if isinstance(my_state, objects.TestingDataAck):
                         self.testing_performance(performance=my_state.performance,
                                                  feedback=my_state.feedback)
+                        test_data = my_state.testing_data
 
                 # We are done with the training episode.
                 if isinstance(my_state, objects.TestingEpisodeEnd):
@@ -435,11 +460,7 @@ class TA2Logic(object):
                 training_data = self._amqp.get_training_data()
 
                 # Decompress the image if there is one.
-                if 'image' in training_data.feature_vector:
-                    if training_data.feature_vector['image'] is not None:
-                        comp_image = b64decode(training_data.feature_vector['image'])
-                        training_data.feature_vector['image'] \
-                            = blosc.unpack_array(comp_image)
+                self._unpack_image(feature_vector=training_data.feature_vector)
                 # Handle the training data.
                 label_prediction = \
                     self.training_instance(feature_vector=training_data.feature_vector,
@@ -22,6 +22,7 @@
 # ** Contact: Brian L. Thomas (bthomas1@wsu.edu)
 # ** Contact: Diane J. Cook (djcook@wsu.edu)
 # *****************************************************************************#
+import base64
 import copy
 import datetime
 import dateutil
@@ -30,10 +31,20 @@ import logging
 import logging.handlers
 import pytz
 import re
+import struct
 import time
 import types
 import uuid
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
 __major_version__ = '0.8'
 __minor_version__ = '2'
 __db_version__ = '0.6'
@@ -344,10 +355,39 @@ CLIENT_RPC_QUEUE = 'rpc.client.v{}'.format(__major_version__)
 SERVER_RPC_QUEUE = 'rpc.server.v{}'.format(__major_version__)
 GENERATOR_RPC_QUEUE = 'rpc.generator.v{}'.format(__major_version__)
 NOVELTY_DESC_RPC_QUEUE = 'rpc.novelty_description.v{}'.format(__major_version__)
+# RabbitMQ direct reply-to pseudo queue, replies go straight to the consumer on this channel.
+DIRECT_REPLY_TO_QUEUE = 'amq.rabbitmq.reply-to'
 LIVE_GENERATOR_QUEUES = dict()
 for domain in VALID_DOMAINS:
     LIVE_GENERATOR_QUEUES[domain] = 'live.generator.{}.v{}'.format(domain, __major_version__)
 
+# Zero-copy mode for the per-tick data objects, see set_zero_copy().
+_ZERO_COPY = False
+
+# AIQ binary message framing.
+# A binary frame is laid out as:
+#     BINARY_FRAME_MAGIC | uint32 header length | JSON header | (uint32 length | raw bytes) * N
+# Any bytes value in the message (such as a blosc packed image) is replaced in the JSON header
+# with dict({BINARY_FRAME_REF: index}) and appended as raw bytes after the header.
+BINARY_FRAME_MAGIC = b'AIQB'
+BINARY_FRAME_LENGTH = struct.Struct('>I')
+BINARY_FRAME_REF = '__aiq_binary__'
+
+# AIQ wire codecs, the content type is carried in the AMQP message properties.
+CONTENT_TYPE_JSON = 'application/json'
+CONTENT_TYPE_BINARY_FRAME = 'application/x-aiq-frame'
+CONTENT_TYPE_MSGPACK = 'application/msgpack'
+CONTENT_TYPE_CBOR = 'application/cbor'
+WIRE_CODEC_JSON = 'json'
+WIRE_CODEC_MSGPACK = 'msgpack'
+WIRE_CODEC_CBOR = 'cbor'
+WIRE_CODECS = dict({WIRE_CODEC_JSON: CONTENT_TYPE_JSON,
+                    WIRE_CODEC_MSGPACK: CONTENT_TYPE_MSGPACK,
+                    WIRE_CODEC_CBOR: CONTENT_TYPE_CBOR})
+# AMQP header a client sets on its requests with a comma separated list of the content types it
+# can read in the response, in order of preference.  JSON is always accepted.
+AMQP_HEADER_ACCEPT = 'x-aiq-accept'
+
 # TA1 default command line arg values.
 DEFAULT_TA1_DEBUG = False
 DEFAULT_TA1_FULLDEBUG = False
@@ -3939,6 +3979,32 @@ class RequestDataset(CasasObject):
         return json.dumps(obj)
 
 
+def set_zero_copy(enabled: bool):
+    """Turn the zero-copy mode on or off for this process.  In zero-copy mode the per-tick data
+    objects (the *Data, *DataPrediction, *DataAck, *EpisodeEnd and Request*Data classes) take
+    ownership of the dicts passed to them and get_json_obj() returns them without a defensive
+    deep copy, so callers must not change a dict after handing it over or after reading it.
+
+    Parameters
+    ----------
+    enabled : bool
+        True to turn zero-copy on, False (the default) to deep copy as before.
+    """
+    global _ZERO_COPY
+    _ZERO_COPY = bool(enabled)
+    return
+
+
+def is_zero_copy() -> bool:
+    return _ZERO_COPY
+
+
+def _owned(value):
+    if _ZERO_COPY:
+        return value
+    return copy.deepcopy(value)
+
+
 class AiqObject(CasasObject):
     def __init__(self):
         super().__init__()
@@ -3955,9 +4021,161 @@ class AiqObject(CasasObject):
         raise ValueError('This object did not implement get_json_obj().')
 
     def get_json_str(self) -> str:
-        return json.dumps(self.get_json_obj())
+        return json.dumps(self.get_json_obj(), default=json_default)
+
+    def get_encoded(self, content_type: str = CONTENT_TYPE_JSON):
+        return encode_message(json_obj=self.get_json_obj(), content_type=content_type)
+
+
+# The AiqObject decoders by obj_type, filled in by the @aiq_decoder class decorators below.
+AIQ_DECODERS = dict()
+SUBOBJECT_SINGLE = 'single'
+SUBOBJECT_LIST = 'list'
+
+
+class AiqDecoder(object):
+    """Declarative description of how to build an AiqObject from its decoded JSON object.
+
+    Attributes
+    ----------
+    obj_type : str
+        The obj_type value this decoder handles.
+    aiq_class : type
+        The AiqObject class to build, it is called with the field values as keyword arguments.
+    required : list
+        The JSON attributes that must be in the object.
+    optional : dict
+        The JSON attributes that may be in the object, with the value to use when they are not.
+    arg_names : dict
+        Maps a JSON attribute to the keyword argument name of aiq_class when they differ.
+    subobjects : dict
+        Maps a JSON attribute to SUBOBJECT_SINGLE or SUBOBJECT_LIST for attributes that hold
+        nested AiqObjects, these are built with get_subobject() or get_subobject_list().
+    build : function
+        Optional function(values: dict) to call instead of aiq_class(**values).
+    """
+    def __init__(self, obj_type: str, aiq_class: type, required: list = None,
+                 optional: dict = None, arg_names: dict = None, subobjects: dict = None,
+                 build=None):
+        self.obj_type = obj_type
+        self.aiq_class = aiq_class
+        self.required = list()
+        if required is not None:
+            self.required = list(required)
+        self.optional = dict()
+        if optional is not None:
+            self.optional = dict(optional)
+        self.arg_names = dict()
+        if arg_names is not None:
+            self.arg_names = dict(arg_names)
+        self.subobjects = dict()
+        if subobjects is not None:
+            self.subobjects = dict(subobjects)
+        self.build = build
+        return
+
+    def decode(self, obj: dict, errormsgs: list, amqp_obj=None):
+        """Validate the object and build the AiqObject.
+
+        Parameters
+        ----------
+        obj : dict
+            The decoded JSON object.
+        errormsgs : list
+            A list that any error messages are appended to.
+        amqp_obj : object (optional)
+            A rabbitmq.py Connection object to help keep things alive during large objects.
+
+        Returns
+        -------
+        AiqObject|None
+            The new object, or None if there were errors.
+        """
+        values = dict()
+        for field in self.required:
+            if field in obj:
+                values[field] = obj[field]
+            else:
+                errormsgs.append('Could not obtain attribute {0}, please include json '
+                                 'attribute {0}.'.format(field))
+        if len(errormsgs) > 0:
+            return None
+        for field in self.optional:
+            values[field] = obj.get(field, self.optional[field])
+        for field in self.subobjects:
+            if values[field] is None:
+                # An optional subobject that was not sent.
+                continue
+            if self.subobjects[field] == SUBOBJECT_LIST:
+                sub_value = list()
+                if len(values[field]) > 0:
+                    sub_value = get_subobject_list(casas_object=json.dumps(values[field]),
+                                                   errormsgs=errormsgs,
+                                                   amqp_obj=amqp_obj)
+            elif isinstance(values[field], dict) and values[field].get('obj_type', None) \
+                    in AIQ_DECODERS:
+                # Decode it in place, it may hold bytes from a binary codec that json can not
+                # encode again.
+                sub_value = AIQ_DECODERS[values[field]['obj_type']].decode(
+                    obj=values[field],
+                    errormsgs=errormsgs,
+                    amqp_obj=amqp_obj)
+            else:
+                sub_json = values[field]
+                if not isinstance(sub_json, str):
+                    sub_json = '[{}]'.format(json.dumps(sub_json))
+                sub_value = get_subobject(casas_object=sub_json,
+                                          errormsgs=errormsgs,
+                                          amqp_obj=amqp_obj)
+            values[field] = sub_value
+        if len(errormsgs) > 0:
+            return None
+        for field in self.arg_names:
+            values[self.arg_names[field]] = values.pop(field)
+        if self.build is not None:
+            return self.build(values)
+        return self.aiq_class(**values)
+
+
+def register_decoder(decoder: AiqDecoder):
+    """Register an AiqDecoder so build_objects_from_json() can decode its obj_type.  This
+    replaces any decoder already registered for the same obj_type.
+
+    Parameters
+    ----------
+    decoder : AiqDecoder
+        The decoder to register.
+    """
+    AIQ_DECODERS[decoder.obj_type] = decoder
+    return
 
 
+def aiq_decoder(obj_type: str, required: list = None, optional: dict = None,
+                arg_names: dict = None, subobjects: dict = None, build=None):
+    """Class decorator that registers an AiqObject class with build_objects_from_json(), see
+    AiqDecoder for the parameters.
+    """
+    def register_class(aiq_class):
+        register_decoder(decoder=AiqDecoder(obj_type=obj_type,
+                                            aiq_class=aiq_class,
+                                            required=required,
+                                            optional=optional,
+                                            arg_names=arg_names,
+                                            subobjects=subobjects,
+                                            build=build))
+        return aiq_class
+    return register_class
+
+
+def _raise_experiment_exception(values: dict):
+    if values['message'] is None:
+        raise AiqExperimentException(value='Experiment Exception raised without a message!')
+    raise AiqExperimentException(value=values['message'])
+
+
+@aiq_decoder(REQ_MODEL,
+             required=list(['aiq_username', 'aiq_secret', 'model_name', 'organization',
+                            'description']))
 class RequestModel(AiqObject):
     def __init__(self, aiq_username: str, aiq_secret: str, model_name: str, organization: str,
                  description: str = None):
@@ -3980,6 +4198,7 @@ class RequestModel(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(REQ_STATE)
 class RequestState(AiqObject):
     def __init__(self):
         super().__init__()
@@ -3991,6 +4210,9 @@ class RequestState(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(MODEL,
+             required=list(['aiq_username', 'aiq_secret', 'model_name', 'organization',
+                            'description']))
 class Model(AiqObject):
     def __init__(self, model_name: str, organization: str, aiq_username: str, aiq_secret: str,
                  description: str = None):
@@ -4014,6 +4236,12 @@ class Model(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(REQ_EXPERIMENT,
+             required=list(['model', 'novelty', 'novelty_visibility', 'client_rpc_queue',
+                            'git_version', 'seed', 'domain_dict', 'experiment_type', 'no_testing',
+                            'description']),
+             optional=dict({'generator_config': None, 'epoch': None}),
+             subobjects=dict({'model': SUBOBJECT_SINGLE}))
 class RequestExperiment(AiqObject):
     def __init__(self, model: Model, novelty: int, novelty_visibility: int, client_rpc_queue: str,
                  git_version: str, experiment_type: str, seed: int = None,
@@ -4069,6 +4297,11 @@ class RequestExperiment(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(REQ_EXP_TRIALS,
+             required=list(['model', 'experiment_secret', 'client_rpc_queue', 'experiment_type',
+                            'just_one_trial', 'domain_dict']),
+             optional=dict({'generator_config': None, 'epoch': None}),
+             subobjects=dict({'model': SUBOBJECT_SINGLE}))
 class RequestExperimentTrials(RequestExperiment):
     def __init__(self, model: Model, experiment_secret: str, client_rpc_queue: str,
                  experiment_type: str, just_one_trial: bool = False, epoch: float = None,
@@ -4105,6 +4338,9 @@ class RequestExperimentTrials(RequestExperiment):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(EXPERIMENT_RESP,
+             required=list(['server_rpc_queue', 'experiment_secret', 'model_experiment_id',
+                            'experiment_timeout']))
 class ExperimentResponse(AiqObject):
     def __init__(self, server_rpc_queue: str, experiment_secret: str, model_experiment_id: int,
                  experiment_timeout: float):
@@ -4125,6 +4361,7 @@ class ExperimentResponse(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(EXPERIMENT_START)
 class ExperimentStart(AiqObject):
     def __init__(self):
         super().__init__()
@@ -4136,6 +4373,7 @@ class ExperimentStart(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(EXPERIMENT_END)
 class ExperimentEnd(AiqObject):
     def __init__(self):
         super().__init__()
@@ -4147,6 +4385,9 @@ class ExperimentEnd(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(EXPERIMENT_EXCEPTION,
+             optional=dict({'message': None}),
+             build=_raise_experiment_exception)
 class ExperimentException(AiqObject):
     def __init__(self, message: str):
         super().__init__()
@@ -4160,6 +4401,8 @@ class ExperimentException(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(BENCHMARK_REQ,
+             required=list(['benchmark_script']))
 class BenchmarkRequest(AiqObject):
     def __init__(self, benchmark_script: str):
         super().__init__()
@@ -4173,6 +4416,8 @@ class BenchmarkRequest(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(BENCHMARK_DATA,
+             required=list(['benchmark_data']))
 class BenchmarkData(AiqObject):
     def __init__(self, benchmark_data: dict):
         super().__init__()
@@ -4186,6 +4431,7 @@ class BenchmarkData(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(BENCHMARK_ACK)
 class BenchmarkAck(AiqObject):
     def __init__(self):
         super().__init__()
@@ -4197,6 +4443,7 @@ class BenchmarkAck(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(NOVELTY_START)
 class NoveltyStart(AiqObject):
     def __init__(self):
         super().__init__()
@@ -4208,6 +4455,7 @@ class NoveltyStart(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(NOVELTY_END)
 class NoveltyEnd(AiqObject):
     def __init__(self):
         super().__init__()
@@ -4219,6 +4467,8 @@ class NoveltyEnd(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(TRIAL_START,
+             required=list(['trial_number', 'total_trials', 'message', 'novelty_description']))
 class TrialStart(AiqObject):
     def __init__(self, trial_number: int = 0, total_trials: int = 0, message: str = None,
                  novelty_description: dict = None):
@@ -4241,6 +4491,7 @@ class TrialStart(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(TRIAL_END)
 class TrialEnd(AiqObject):
     def __init__(self):
         super().__init__()
@@ -4252,6 +4503,7 @@ class TrialEnd(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(TRAINING_START)
 class TrainingStart(AiqObject):
     def __init__(self):
         super().__init__()
@@ -4263,6 +4515,7 @@ class TrainingStart(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(TRAINING_ACTIVE)
 class TrainingActive(AiqObject):
     def __init__(self):
         super().__init__()
@@ -4274,6 +4527,8 @@ class TrainingActive(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(TRAINING_END,
+             required=list(['message']))
 class TrainingEnd(AiqObject):
     def __init__(self, message: str = None):
         super().__init__()
@@ -4287,6 +4542,7 @@ class TrainingEnd(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(TRAINING_MODEL_END)
 class TrainingModelEnd(AiqObject):
     def __init__(self):
         super().__init__()
@@ -4298,6 +4554,7 @@ class TrainingModelEnd(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(TRAINING_END_EARLY)
 class TrainingEndEarly(AiqObject):
     def __init__(self):
         super().__init__()
@@ -4309,6 +4566,8 @@ class TrainingEndEarly(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(TRAIN_EPISODE_START,
+             required=list(['episode_number', 'total_episodes']))
 class TrainingEpisodeStart(AiqObject):
     def __init__(self, episode_number: int = 0, total_episodes: int = 0):
         super().__init__()
@@ -4324,6 +4583,7 @@ class TrainingEpisodeStart(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(TRAIN_EPISODE_ACTIVE)
 class TrainingEpisodeActive(AiqObject):
     def __init__(self):
         super().__init__()
@@ -4335,21 +4595,25 @@ class TrainingEpisodeActive(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(EPISODE_END,
+             required=list(['performance', 'feedback']))
 class EpisodeEnd(AiqObject):
     def __init__(self, performance: float, feedback: dict = None):
         super().__init__()
         self.obj_type = EPISODE_END
         self.performance = performance
-        self.feedback = copy.deepcopy(feedback)
+        self.feedback = _owned(feedback)
         return
 
     def get_json_obj(self):
         obj = {'obj_type': self.obj_type,
                'performance': self.performance,
                'feedback': self.feedback}
-        return copy.deepcopy(obj)
+        return _owned(obj)
 
 
+@aiq_decoder(BASIC_DATA,
+             required=list(['feature_vector', 'feature_label']))
 class BasicData(AiqObject):
     def __init__(self, feature_vector: dict, feature_label: dict):
         super().__init__()
@@ -4369,9 +4633,11 @@ class BasicData(AiqObject):
         obj = {'obj_type': self.obj_type,
                'feature_vector': self.feature_vector,
                'feature_label': self.feature_label}
-        return copy.deepcopy(obj)
+        return _owned(obj)
 
 
+@aiq_decoder(BASIC_DATA_PREDICTION,
+             required=list(['label_prediction']))
 class BasicDataPrediction(AiqObject):
     def __init__(self, label_prediction: dict = None):
         super().__init__()
@@ -4392,15 +4658,17 @@ class BasicDataPrediction(AiqObject):
     def get_json_obj(self):
         obj = {'obj_type': self.obj_type,
                'label_prediction': self.label_prediction}
-        return copy.deepcopy(obj)
+        return _owned(obj)
 
 
+@aiq_decoder(BASIC_DATA_ACK,
+             required=list(['performance', 'feedback']))
 class BasicDataAck(AiqObject):
     def __init__(self, performance: float = None, feedback: dict = None):
         super().__init__()
         self.obj_type = BASIC_DATA_ACK
         self.performance = performance
-        self.feedback = copy.deepcopy(feedback)
+        self.feedback = _owned(feedback)
         if self.feedback is None:
             self.feedback = dict()
         return
@@ -4409,9 +4677,12 @@ class BasicDataAck(AiqObject):
         obj = {'obj_type': self.obj_type,
                'performance': self.performance,
                'feedback': self.feedback}
-        return copy.deepcopy(obj)
+        return _owned(obj)
 
 
+@aiq_decoder(BASIC_EPISODE_NOVELTY,
+             required=list(['novelty_probability', 'novelty_threshold', 'novelty',
+                            'novelty_characterization']))
 class BasicEpisodeNovelty(AiqObject):
     def __init__(self, novelty_probability: float = None, novelty_threshold: float = None,
                  novelty: int = None, novelty_characterization: dict = None):
@@ -4432,6 +4703,8 @@ class BasicEpisodeNovelty(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(TRAIN_EPISODE_END,
+             required=list(['performance', 'feedback']))
 class TrainingEpisodeEnd(EpisodeEnd):
     def __init__(self, performance: float = None, feedback: dict = None):
         super().__init__(performance=performance,
@@ -4443,9 +4716,10 @@ class TrainingEpisodeEnd(EpisodeEnd):
         obj = {'obj_type': self.obj_type,
                'performance': self.performance,
                'feedback': self.feedback}
-        return copy.deepcopy(obj)
+        return _owned(obj)
 
 
+@aiq_decoder(REQ_DATA)
 class RequestData(AiqObject):
     def __init__(self):
         super().__init__()
@@ -4454,9 +4728,11 @@ class RequestData(AiqObject):
 
     def get_json_obj(self):
         obj = {'obj_type': self.obj_type}
-        return copy.deepcopy(obj)
+        return _owned(obj)
 
 
+@aiq_decoder(REQ_TRAIN_DATA,
+             required=list(['model_experiment_id', 'secret']))
 class RequestTrainingData(RequestData):
     def __init__(self, model_experiment_id: str, secret: str):
         super().__init__()
@@ -4469,16 +4745,19 @@ class RequestTrainingData(RequestData):
         obj = {'obj_type': self.obj_type,
                'model_experiment_id': self.model_experiment_id,
                'secret': self.secret}
-        return copy.deepcopy(obj)
+        return _owned(obj)
 
 
+@aiq_decoder(TRAINING_DATA,
+             required=list(['secret', 'feature_vector', 'feature_label',
+                            'utc_remote_epoch_received', 'utc_remote_epoch_sent']))
 class TrainingData(AiqObject):
     def __init__(self, secret: str, feature_vector: dict, feature_label: dict,
                  utc_remote_epoch_received: float = None, utc_remote_epoch_sent: float = None):
         super().__init__()
         self.obj_type = TRAINING_DATA
         self.secret = secret
-        self.feature_vector = copy.deepcopy(feature_vector)
+        self.feature_vector = _owned(feature_vector)
         self.feature_label = dict()
         valid_label = False
         if 'action' in feature_label:
@@ -4500,9 +4779,12 @@ class TrainingData(AiqObject):
                'feature_label': self.feature_label,
                'utc_remote_epoch_received': self.utc_remote_epoch_received,
                'utc_remote_epoch_sent': time.time()}
-        return copy.deepcopy(obj)
+        return _owned(obj)
 
 
+@aiq_decoder(TRAIN_DATA_PRED,
+             required=list(['secret', 'utc_remote_epoch_received', 'utc_remote_epoch_sent',
+                            'label_prediction', 'end_early']))
 class TrainingDataPrediction(BasicDataPrediction):
     def __init__(self, secret: str, utc_remote_epoch_received: float = None,
                  utc_remote_epoch_sent: float = None, label_prediction: dict = None,
@@ -4532,16 +4814,18 @@ class TrainingDataPrediction(BasicDataPrediction):
                'utc_remote_epoch_sent': time.time(),
                'label_prediction': self.label_prediction,
                'end_early': self.end_early}
-        return copy.deepcopy(obj)
+        return _owned(obj)
 
 
+@aiq_decoder(TRAIN_DATA_ACK,
+             required=list(['secret', 'performance', 'feedback']))
 class TrainingDataAck(AiqObject):
     def __init__(self, secret: str, performance: float = None, feedback: dict = None):
         super().__init__()
         self.obj_type = TRAIN_DATA_ACK
         self.secret = secret
         self.performance = performance
-        self.feedback = copy.deepcopy(feedback)
+        self.feedback = _owned(feedback)
         return
 
     def get_json_obj(self):
@@ -4549,9 +4833,12 @@ class TrainingDataAck(AiqObject):
                'secret': self.secret,
                'performance': self.performance,
                'feedback': self.feedback}
-        return copy.deepcopy(obj)
+        return _owned(obj)
 
 
+@aiq_decoder(TRAIN_EPISODE_NOVELTY,
+             required=list(['novelty_probability', 'novelty_threshold', 'novelty',
+                            'novelty_characterization']))
 class TrainingEpisodeNovelty(BasicEpisodeNovelty):
     def __init__(self, novelty_probability: float = None, novelty_threshold: float = None,
                  novelty: int = None, novelty_characterization: dict = None):
@@ -4571,6 +4858,7 @@ class TrainingEpisodeNovelty(BasicEpisodeNovelty):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(TRAIN_EPISODE_NOVELTY_ACK)
 class TrainingEpisodeNoveltyAck(AiqObject):
     def __init__(self):
         super().__init__()
@@ -4582,6 +4870,7 @@ class TrainingEpisodeNoveltyAck(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(TESTING_START)
 class TestingStart(AiqObject):
     def __init__(self):
         super().__init__()
@@ -4593,6 +4882,7 @@ class TestingStart(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(TESTING_ACTIVE)
 class TestingActive(AiqObject):
     def __init__(self):
         super().__init__()
@@ -4604,6 +4894,7 @@ class TestingActive(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(TESTING_END)
 class TestingEnd(AiqObject):
     def __init__(self):
         super().__init__()
@@ -4615,6 +4906,8 @@ class TestingEnd(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(TEST_EPISODE_START,
+             required=list(['episode_number', 'total_episodes']))
 class TestingEpisodeStart(AiqObject):
     def __init__(self, episode_number: int = 0, total_episodes: int = 0):
         super().__init__()
@@ -4630,6 +4923,7 @@ class TestingEpisodeStart(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(TEST_EPISODE_ACTIVE)
 class TestingEpisodeActive(AiqObject):
     def __init__(self):
         super().__init__()
@@ -4641,6 +4935,8 @@ class TestingEpisodeActive(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(TEST_EPISODE_END,
+             required=list(['performance', 'feedback']))
 class TestingEpisodeEnd(EpisodeEnd):
     def __init__(self, performance: float = None, feedback: dict = None):
         super().__init__(performance=performance,
@@ -4652,9 +4948,11 @@ class TestingEpisodeEnd(EpisodeEnd):
         obj = {'obj_type': self.obj_type,
                'performance': self.performance,
                'feedback': self.feedback}
-        return copy.deepcopy(obj)
+        return _owned(obj)
 
 
+@aiq_decoder(REQ_TEST_DATA,
+             required=list(['model_experiment_id', 'secret']))
 class RequestTestingData(RequestData):
     def __init__(self, model_experiment_id: str, secret: str):
         super().__init__()
@@ -4667,16 +4965,19 @@ class RequestTestingData(RequestData):
         obj = {'obj_type': self.obj_type,
                'model_experiment_id': self.model_experiment_id,
                'secret': self.secret}
-        return copy.deepcopy(obj)
+        return _owned(obj)
 
 
+@aiq_decoder(TESTING_DATA,
+             required=list(['secret', 'feature_vector', 'utc_remote_epoch_received',
+                            'utc_remote_epoch_sent', 'novelty_indicator']))
 class TestingData(AiqObject):
     def __init__(self, secret: str, feature_vector: dict, utc_remote_epoch_received: float = None,
                  utc_remote_epoch_sent: float = None, novelty_indicator: bool = None):
         super().__init__()
         self.obj_type = TESTING_DATA
         self.secret = secret
-        self.feature_vector = copy.deepcopy(feature_vector)
+        self.feature_vector = _owned(feature_vector)
         self.utc_remote_epoch_received = utc_remote_epoch_received
         if self.utc_remote_epoch_received is None:
             self.utc_remote_epoch_received = time.time()
@@ -4691,13 +4992,17 @@ class TestingData(AiqObject):
                'utc_remote_epoch_received': self.utc_remote_epoch_received,
                'utc_remote_epoch_sent': time.time(),
                'novelty_indicator': self.novelty_indicator}
-        return copy.deepcopy(obj)
+        return _owned(obj)
 
 
+@aiq_decoder(TEST_DATA_PRED,
+             required=list(['secret', 'utc_remote_epoch_received', 'utc_remote_epoch_sent',
+                            'label_prediction', 'end_early']),
+             optional=dict({'request_next': False}))
 class TestingDataPrediction(BasicDataPrediction):
     def __init__(self, secret: str, utc_remote_epoch_received: float = None,
                  utc_remote_epoch_sent: float = None, label_prediction: dict = None,
-                 end_early: bool = False):
+                 end_early: bool = False, request_next: bool = False):
         super().__init__(label_prediction=label_prediction)
         self.obj_type = TEST_DATA_PRED
         self.secret = secret
@@ -4714,6 +5019,8 @@ class TestingDataPrediction(BasicDataPrediction):
         if not valid_label:
             raise AiqDataException('A label prediction must be a dict({"action": str(value)})!')
         self.end_early = end_early
+        # Ask for the next TestingData to be sent back with the TestingDataAck.
+        self.request_next = request_next
         return
 
     def get_json_obj(self):
@@ -4722,17 +5029,25 @@ class TestingDataPrediction(BasicDataPrediction):
                'utc_remote_epoch_received': self.utc_remote_epoch_received,
                'utc_remote_epoch_sent': time.time(),
                'label_prediction': self.label_prediction,
-               'end_early': self.end_early}
-        return copy.deepcopy(obj)
+               'end_early': self.end_early,
+               'request_next': self.request_next}
+        return _owned(obj)
 
 
+@aiq_decoder(TEST_DATA_ACK,
+             required=list(['secret', 'performance', 'feedback']),
+             optional=dict({'testing_data': None}),
+             subobjects=dict({'testing_data': SUBOBJECT_SINGLE}))
 class TestingDataAck(AiqObject):
-    def __init__(self, secret: str, performance: float = None, feedback: dict = None):
+    def __init__(self, secret: str, performance: float = None, feedback: dict = None,
+                 testing_data: TestingData = None):
         super().__init__()
         self.obj_type = TEST_DATA_ACK
         self.secret = secret
         self.performance = performance
-        self.feedback = copy.deepcopy(feedback)
+        self.feedback = _owned(feedback)
+        # The next TestingData when the prediction set request_next.
+        self.testing_data = testing_data
         return
 
     def get_json_obj(self):
@@ -4740,9 +5055,14 @@ class TestingDataAck(AiqObject):
                'secret': self.secret,
                'performance': self.performance,
                'feedback': self.feedback}
-        return copy.deepcopy(obj)
+        if self.testing_data is not None:
+            obj['testing_data'] = self.testing_data.get_json_obj()
+        return _owned(obj)
 
 
+@aiq_decoder(TEST_EPISODE_NOVELTY,
+             required=list(['novelty_probability', 'novelty_threshold', 'novelty',
+                            'novelty_characterization']))
 class TestingEpisodeNovelty(BasicEpisodeNovelty):
     def __init__(self, novelty_probability: float = None, novelty_threshold: float = None,
                  novelty: int = None, novelty_characterization: dict = None):
@@ -4762,6 +5082,7 @@ class TestingEpisodeNovelty(BasicEpisodeNovelty):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(TEST_EPISODE_NOVELTY_ACK)
 class TestingEpisodeNoveltyAck(AiqObject):
     def __init__(self):
         super().__init__()
@@ -4773,6 +5094,8 @@ class TestingEpisodeNoveltyAck(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(END_EXPERIMENT,
+             required=list(['model_experiment_id', 'secret']))
 class EndExperiment(AiqObject):
     def __init__(self, model_experiment_id: str, secret: str):
         super().__init__()
@@ -4788,6 +5111,7 @@ class EndExperiment(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(WAIT_ON_SOTA)
 class WaitOnSota(AiqObject):
     def __init__(self):
         super().__init__()
@@ -4799,6 +5123,7 @@ class WaitOnSota(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(SOTA_IDLE)
 class SotaIdle(AiqObject):
     def __init__(self):
         super().__init__()
@@ -4810,6 +5135,10 @@ class SotaIdle(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(OBJ_EPISODE,
+             required=list(['novelty', 'difficulty', 'seed', 'domain', 'data_type', 'episode_index',
+                            'episode_id', 'trial_novelty', 'day_offset', 'trial_episode_index',
+                            'use_image', 'hint_level', 'phase']))
 class Episode(AiqObject):
     def __init__(self, novelty: int, difficulty: str, seed: int, domain: str, data_type: str,
                  episode_index: int = None, episode_id: int = None,
@@ -4865,6 +5194,9 @@ class Episode(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(OBJ_TRAINING,
+             required=list(['episodes']),
+             subobjects=dict({'episodes': SUBOBJECT_LIST}))
 class Training(AiqObject):
     def __init__(self, episodes: list):
         super().__init__()
@@ -4880,6 +5212,10 @@ class Training(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(OBJ_TRIAL,
+             required=list(['episodes', 'novelty', 'novelty_visibility', 'difficulty',
+                            'hint_level']),
+             subobjects=dict({'episodes': SUBOBJECT_LIST}))
 class Trial(AiqObject):
     def __init__(self, episodes: list, novelty: int, novelty_visibility: int, difficulty: str,
                  hint_level: int):
@@ -4904,6 +5240,9 @@ class Trial(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(OBJ_NOVELTY_GRP,
+             required=list(['trials']),
+             subobjects=dict({'trials': SUBOBJECT_LIST}))
 class NoveltyGroup(AiqObject):
     def __init__(self, trials: list):
         super().__init__()
@@ -4919,6 +5258,10 @@ class NoveltyGroup(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(OBJ_EXPERIMENT,
+             required=list(['training', 'novelty_groups', 'budget', 'phase']),
+             subobjects=dict({'training': SUBOBJECT_SINGLE,
+                                      'novelty_groups': SUBOBJECT_LIST}))
 class Experiment(AiqObject):
     def __init__(self, training: Training, novelty_groups: list, budget: float, phase: str):
         super().__init__()
@@ -4941,6 +5284,9 @@ class Experiment(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(REQ_NOVELTY_DESCRIPTION,
+             required=list(['domain', 'novelty', 'difficulty']),
+             arg_names=dict({'domain': 'r_domain'}))
 class RequestNoveltyDescription(AiqObject):
     def __init__(self, r_domain: str, novelty: int, difficulty: str):
         super().__init__()
@@ -4964,6 +5310,8 @@ class RequestNoveltyDescription(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(OBJ_NOVELTY_DESCRIPTION,
+             required=list(['novelty_description']))
 class NoveltyDescription(AiqObject):
     def __init__(self, novelty_description: dict):
         super().__init__()
@@ -4977,6 +5325,7 @@ class NoveltyDescription(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(GENERATOR_IDLE)
 class GeneratorIdle(AiqObject):
     def __init__(self):
         super().__init__()
@@ -4988,6 +5337,7 @@ class GeneratorIdle(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(GENERATOR_RESET)
 class GeneratorReset(AiqObject):
     def __init__(self):
         super().__init__()
@@ -4999,6 +5349,11 @@ class GeneratorReset(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(START_GENERATOR,
+             required=list(['domain', 'novelty', 'difficulty', 'seed', 'server_rpc_queue',
+                            'trial_novelty', 'epoch', 'day_offset', 'request_timeout', 'use_image',
+                            'hint_level', 'phase']),
+             optional=dict({'generator_config': None}))
 class StartGenerator(AiqObject):
     def __init__(self, domain: str, novelty: int, difficulty: str, seed: int, server_rpc_queue: str,
                  trial_novelty: int, epoch: float = None, day_offset: int = 0,
@@ -5053,6 +5408,8 @@ class StartGenerator(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(GENERATOR_RESPONSE,
+             required=list(['generator_rpc_queue']))
 class GeneratorResponse(AiqObject):
     def __init__(self, generator_rpc_queue: str):
         super().__init__()
@@ -5066,6 +5423,8 @@ class GeneratorResponse(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(ANALYSIS_READY,
+             required=list(['model_experiment_id']))
 class AnalysisReady(AiqObject):
     def __init__(self, model_experiment_id: int):
         super().__init__()
@@ -5079,6 +5438,8 @@ class AnalysisReady(AiqObject):
         return copy.deepcopy(obj)
 
 
+@aiq_decoder(ANALYSIS_PARTIAL,
+             required=list(['model_experiment_id', 'experiment_trial_id']))
 class AnalysisPartial(AiqObject):
     def __init__(self, model_experiment_id: int, experiment_trial_id: int):
         super().__init__()
@@ -5283,15 +5644,206 @@ def build_routing_key(action=EVENT, sensor_type='*', package_type='*', site='*',
     return routing_key
 
 
-def build_objects_from_json(message, amqp_obj=None):
+def json_default(value):
+    """Helper for json.dumps() so raw bytes values (such as packed images) can still be sent to
+    clients that do not read binary frames, they are base64 encoded like they always have been.
+
+    Parameters
+    ----------
+    value : object
+        The value json.dumps() was unable to serialize.
+
+    Returns
+    -------
+    str
+        The base64 ascii string of the bytes value.
+    """
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(value).decode('ascii')
+    raise TypeError('Object of type {} is not JSON serializable'.format(type(value).__name__))
+
+
+def _extract_binary(value, blobs):
+    if isinstance(value, dict):
+        return dict((key, _extract_binary(value[key], blobs)) for key in value)
+    if isinstance(value, (list, tuple)):
+        return list([_extract_binary(item, blobs) for item in value])
+    if isinstance(value, (bytes, bytearray)):
+        blobs.append(value)
+        return dict({BINARY_FRAME_REF: len(blobs) - 1})
+    return value
+
+
+def _restore_binary(value, blobs):
+    if isinstance(value, dict):
+        if len(value) == 1 and BINARY_FRAME_REF in value:
+            return blobs[value[BINARY_FRAME_REF]]
+        for key in value:
+            value[key] = _restore_binary(value[key], blobs)
+    elif isinstance(value, list):
+        for i in range(len(value)):
+            value[i] = _restore_binary(value[i], blobs)
+    return value
+
+
+def is_binary_frame(message) -> bool:
+    """Check if a message body is a binary frame rather than a JSON string.
+
+    Parameters
+    ----------
+    message : str|bytes
+        The message body.
+
+    Returns
+    -------
+    bool
+    """
+    return isinstance(message, (bytes, bytearray)) and message[:4] == BINARY_FRAME_MAGIC
+
+
+def pack_binary_frame(json_obj) -> bytes:
+    """Pack a JSON object into a binary frame.  Any bytes values are moved out of the JSON
+    header and sent as raw bytes behind it, so they are never base64 encoded or run through
+    json.dumps().
+
+    Parameters
+    ----------
+    json_obj : dict
+        The result of AiqObject.get_json_obj().
+
+    Returns
+    -------
+    bytes
+        The packed binary frame, the JSON header is a list with the single object in it to
+        match the "[{}]" bodies sent by rabbitmq.Connection.
+    """
+    blobs = list()
+    header = json.dumps(list([_extract_binary(json_obj, blobs)])).encode('utf-8')
+    parts = list([BINARY_FRAME_MAGIC, BINARY_FRAME_LENGTH.pack(len(header)), header])
+    for blob in blobs:
+        parts.append(BINARY_FRAME_LENGTH.pack(len(blob)))
+        parts.append(bytes(blob))
+    return b''.join(parts)
+
+
+def unpack_binary_frame(message):
+    """Unpack a binary frame made by pack_binary_frame().
+
+    Parameters
+    ----------
+    message : bytes
+        The binary frame.
+
+    Returns
+    -------
+    list
+        The decoded JSON header with the raw bytes values put back in place.
+    """
+    view = memoryview(message)
+    offset = len(BINARY_FRAME_MAGIC)
+    size = BINARY_FRAME_LENGTH.size
+    if len(view) < offset + size:
+        raise ValueError('Binary frame is too short to contain a header.')
+    header_len = BINARY_FRAME_LENGTH.unpack_from(view, offset)[0]
+    offset += size
+    header = json.loads(bytes(view[offset:offset + header_len]).decode('utf-8'))
+    offset += header_len
+    blobs = list()
+    while offset < len(view):
+        if offset + size > len(view):
+            raise ValueError('Binary frame is truncated.')
+        blob_len = BINARY_FRAME_LENGTH.unpack_from(view, offset)[0]
+        offset += size
+        if offset + blob_len > len(view):
+            raise ValueError('Binary frame is truncated.')
+        blobs.append(bytes(view[offset:offset + blob_len]))
+        offset += blob_len
+    return _restore_binary(header, blobs)
+
+
+def available_content_types() -> list:
+    """Get the content types this install is able to encode and decode.
+
+    Returns
+    -------
+    list
+        The content types, msgpack and CBOR are only available if their packages are installed.
+    """
+    content_types = list([CONTENT_TYPE_JSON, CONTENT_TYPE_BINARY_FRAME])
+    if msgpack is not None:
+        content_types.append(CONTENT_TYPE_MSGPACK)
+    if cbor2 is not None:
+        content_types.append(CONTENT_TYPE_CBOR)
+    return content_types
+
+
+def encode_message(json_obj, content_type: str = CONTENT_TYPE_JSON):
+    """Encode a JSON object as a message body for the given content type.
+
+    Parameters
+    ----------
+    json_obj : dict
+        The result of AiqObject.get_json_obj().
+    content_type : str, optional
+        One of the CONTENT_TYPE_* values, the default is CONTENT_TYPE_JSON.
+
+    Returns
+    -------
+    str|bytes
+        The message body, a string for JSON and bytes for everything else.  The object is
+        always wrapped in a list to match the "[{}]" bodies sent by rabbitmq.Connection.
+    """
+    if content_type == CONTENT_TYPE_BINARY_FRAME:
+        return pack_binary_frame(json_obj=json_obj)
+    if content_type == CONTENT_TYPE_MSGPACK and msgpack is not None:
+        return msgpack.packb(list([json_obj]), use_bin_type=True)
+    if content_type == CONTENT_TYPE_CBOR and cbor2 is not None:
+        return cbor2.dumps(list([json_obj]))
+    if content_type not in [None, CONTENT_TYPE_JSON]:
+        raise AiqDataException('Unable to encode content type {}.'.format(content_type))
+    return '[{}]'.format(json.dumps(json_obj, default=json_default))
+
+
+def decode_message(message, content_type: str = None):
+    """Decode a message body into the list of JSON objects it holds.
+
+    Parameters
+    ----------
+    message : str|bytes
+        The message body.
+    content_type : str, optional
+        The content type from the AMQP properties.  If it is not provided the message is
+        treated as JSON, or as a binary frame if it starts with BINARY_FRAME_MAGIC.
+
+    Returns
+    -------
+    list|dict
+    """
+    if content_type == CONTENT_TYPE_MSGPACK:
+        if msgpack is None:
+            raise ValueError('Received a msgpack message but msgpack is not installed.')
+        return msgpack.unpackb(message, raw=False)
+    if content_type == CONTENT_TYPE_CBOR:
+        if cbor2 is None:
+            raise ValueError('Received a CBOR message but cbor2 is not installed.')
+        return cbor2.loads(message)
+    if is_binary_frame(message):
+        return unpack_binary_frame(message)
+    return json.loads(message)
+
+
+def build_objects_from_json(message, amqp_obj=None, content_type=None):
     """This function converts a string message into a list of casas.objects.
 
     Parameters
     ----------
-    message : str
-        A string of a JSON list containing dictionaries.
+    message : str|bytes
+        A string of a JSON list containing dictionaries, or a message body encoded by
+        encode_message().
     amqp_obj : object (optional)
         A rabbitmq.py Connection object to help keep things alive during large objects.
+    content_type : str (optional)
+        The content type of the message from the AMQP properties, see decode_message().
 
     Returns
     -------
@@ -5299,19 +5851,19 @@ def build_objects_from_json(message, amqp_obj=None):
         A list containing Event, Tag, Control, Heartbeat, or Translation objects.
         This list can be mixed for different types so make sure to check the action variable.
     """
-    log.debug("build_objects_from_json( {} )".format(str(message)))
+    log.debug("build_objects_from_json( %d bytes, content_type=%s )", len(message), content_type)
     response = CasasResponse(status='success',
                              response_type='data',
                              error_message='No Errors')
     return_objects = list()
     result = None
     try:
-        blob = json.loads(message)
+        blob = decode_message(message=message, content_type=content_type)
 
         # AIQ quick modification.
         if isinstance(blob, dict):
             if 'obj_type' in blob:
-                blob = list([copy.deepcopy(blob)])
+                blob = list([blob])
 
         if len(blob) == 0:
             response.add_error(
@@ -5320,796 +5872,22 @@ def build_objects_from_json(message, amqp_obj=None):
 
         element_id = 0
         for obj in blob:
-            log.debug("object: {}".format(str(obj)))
+            if isinstance(obj, dict):
+                log.debug("object: obj_type=%s", obj.get('obj_type', None))
             errormsgs = list()
             obj_uuid = "unknown"
 
             if 'obj_type' in obj:
-                if obj['obj_type'] == REQ_MODEL:
-                    if 'aiq_username' not in obj:
-                        errormsgs.append('Could not obtain attribute aiq_username, '
-                                         'please include json attribute aiq_username.')
-                    if 'aiq_secret' not in obj:
-                        errormsgs.append('Could not obtain attribute aiq_secret, '
-                                         'please include json attribute aiq_secret.')
-                    if 'model_name' not in obj:
-                        errormsgs.append('Could not obtain attribute model_name, '
-                                         'please include json attribute model_name.')
-                    if 'organization' not in obj:
-                        errormsgs.append('Could not obtain attribute organization, '
-                                         'please include json attribute organization.')
-                    if 'description' not in obj:
-                        errormsgs.append('Could not obtain attribute description, '
-                                         'please include json attribute description.')
-                    if len(errormsgs) == 0:
-                        result = RequestModel(aiq_username=obj['aiq_username'],
-                                              aiq_secret=obj['aiq_secret'],
-                                              model_name=obj['model_name'],
-                                              organization=obj['organization'],
-                                              description=obj['description'])
-                elif obj['obj_type'] == REQ_STATE:
-                    if len(errormsgs) == 0:
-                        result = RequestState()
-                elif obj['obj_type'] == MODEL:
-                    if 'aiq_username' not in obj:
-                        errormsgs.append('Could not obtain attribute aiq_username, '
-                                         'please include json attribute aiq_username.')
-                    if 'aiq_secret' not in obj:
-                        errormsgs.append('Could not obtain attribute aiq_secret, '
-                                         'please include json attribute aiq_secret.')
-                    if 'model_name' not in obj:
-                        errormsgs.append('Could not obtain attribute model_name, '
-                                         'please include json attribute model_name.')
-                    if 'organization' not in obj:
-                        errormsgs.append('Could not obtain attribute organization, '
-                                         'please include json attribute organization.')
-                    if 'description' not in obj:
-                        errormsgs.append('Could not obtain attribute description, '
-                                         'please include json attribute description.')
-                    result = Model(model_name=obj['model_name'],
-                                   organization=obj['organization'],
-                                   aiq_username=obj['aiq_username'],
-                                   aiq_secret=obj['aiq_secret'],
-                                   description=obj['description'])
-                elif obj['obj_type'] == REQ_EXPERIMENT:
-                    model = None
-                    epoch = None
-                    if 'model' in obj:
-                        model = get_subobject(casas_object=obj['model'],
-                                              errormsgs=errormsgs,
-                                              amqp_obj=amqp_obj)
-                    else:
-                        errormsgs.append('Could not obtain attribute model, '
-                                         'please include json attribute model.')
-                    if 'novelty' not in obj:
-                        errormsgs.append('Could not obtain attribute novelty, '
-                                         'please include json attribute novelty.')
-                    if 'novelty_visibility' not in obj:
-                        errormsgs.append('Could not obtain attribute novelty_visibility, '
-                                         'please include json attribute novelty_visibility.')
-                    if 'client_rpc_queue' not in obj:
-                        errormsgs.append('Could not obtain attribute client_rpc_queue, '
-                                         'please include json attribute client_rpc_queue.')
-                    if 'git_version' not in obj:
-                        errormsgs.append('Could not obtain attribute git_version, '
-                                         'please include json attribute git_version.')
-                    if 'seed' not in obj:
-                        errormsgs.append('Could not obtain attribute seed, '
-                                         'please include json attribute seed.')
-                    if 'domain_dict' not in obj:
-                        errormsgs.append('Could not obtain attribute domain_dict, '
-                                         'please include json attribute domain_dict.')
-                    if 'experiment_type' not in obj:
-                        errormsgs.append('Could not obtain attribute experiment_type, '
-                                         'please include json attribute experiment_type.')
-                    if 'no_testing' not in obj:
-                        errormsgs.append('Could not obtain attribute no_testing, '
-                                         'please include json attribute no_testing.')
-                    if 'description' not in obj:
-                        errormsgs.append('Could not obtain attribute description, '
-                                         'please include json attribute description.')
-                    if 'generator_config' not in obj:
-                        obj['generator_config'] = None
-                    if 'epoch' in obj:
-                        epoch = obj['epoch']
-                    if len(errormsgs) == 0:
-                        result = RequestExperiment(model=model,
-                                                   novelty=obj['novelty'],
-                                                   novelty_visibility=obj['novelty_visibility'],
-                                                   client_rpc_queue=obj['client_rpc_queue'],
-                                                   git_version=obj['git_version'],
-                                                   experiment_type=obj['experiment_type'],
-                                                   seed=obj['seed'],
-                                                   domain_dict=obj['domain_dict'],
-                                                   epoch=epoch,
-                                                   no_testing=obj['no_testing'],
-                                                   description=obj['description'],
-                                                   generator_config=obj['generator_config'])
-                elif obj['obj_type'] == REQ_EXP_TRIALS:
-                    model = None
-                    epoch = None
-                    if 'model' in obj:
-                        model = get_subobject(casas_object=obj['model'],
-                                              errormsgs=errormsgs,
-                                              amqp_obj=amqp_obj)
-                    else:
-                        errormsgs.append('Could not obtain attribute model, '
-                                         'please include json attribute model.')
-                    if 'experiment_secret' not in obj:
-                        errormsgs.append('Could not obtain attribute experiment_secret, '
-                                         'please include json attribute experiment_secret.')
-                    if 'client_rpc_queue' not in obj:
-                        errormsgs.append('Could not obtain attribute client_rpc_queue, '
-                                         'please include json attribute client_rpc_queue.')
-                    if 'experiment_type' not in obj:
-                        errormsgs.append('Could not obtain attribute experiment_type, '
-                                         'please include json attribute experiment_type.')
-                    if 'just_one_trial' not in obj:
-                        errormsgs.append('Could not obtain attribute just_one_trial, '
-                                         'please include json attribute just_one_trial.')
-                    if 'domain_dict' not in obj:
-                        errormsgs.append('Could not obtain attribute domain_dict, '
-                                         'please include json attribute domain_dict.')
-                    if 'generator_config' not in obj:
-                        obj['generator_config'] = None
-                    if 'epoch' in obj:
-                        epoch = obj['epoch']
-                    if len(errormsgs) == 0:
-                        result = RequestExperimentTrials(
-                            model=model,
-                            experiment_secret=obj['experiment_secret'],
-                            client_rpc_queue=obj['client_rpc_queue'],
-                            experiment_type=obj['experiment_type'],
-                            just_one_trial=obj['just_one_trial'],
-                            domain_dict=obj['domain_dict'],
-                            epoch=epoch,
-                            generator_config=obj['generator_config'])
-                elif obj['obj_type'] == EXPERIMENT_RESP:
-                    if 'server_rpc_queue' not in obj:
-                        errormsgs.append('Could not obtain attribute server_rpc_queue, '
-                                         'please include json attribute server_rpc_queue.')
-                    if 'experiment_secret' not in obj:
-                        errormsgs.append('Could not obtain attribute experiment_secret, '
-                                         'please include json attribute experiment_secret.')
-                    if 'model_experiment_id' not in obj:
-                        errormsgs.append('Could not obtain attribute model_experiment_id, '
-                                         'please include json attribute model_experiment_id.')
-                    if 'experiment_timeout' not in obj:
-                        errormsgs.append('Could not obtain attribute experiment_timeout, '
-                                         'please include json attribute experiment_timeout.')
-                    if len(errormsgs) == 0:
-                        result = ExperimentResponse(server_rpc_queue=obj['server_rpc_queue'],
-                                                    experiment_secret=obj['experiment_secret'],
-                                                    model_experiment_id=obj['model_experiment_id'],
-                                                    experiment_timeout=obj['experiment_timeout'])
-                elif obj['obj_type'] == EXPERIMENT_START:
-                    if len(errormsgs) == 0:
-                        result = ExperimentStart()
-                elif obj['obj_type'] == EXPERIMENT_END:
-                    if len(errormsgs) == 0:
-                        result = ExperimentEnd()
-                elif obj['obj_type'] == EXPERIMENT_EXCEPTION:
-                    if 'message' not in obj:
-                        raise AiqExperimentException(
-                            value='Experiment Exception raised without a message!')
-                    else:
-                        raise AiqExperimentException(value=obj['message'])
-                elif obj['obj_type'] == BENCHMARK_REQ:
-                    if 'benchmark_script' not in obj:
-                        errormsgs.append('Could not obtain attribute benchmark_script, '
-                                         'please include json attribute benchmark_script.')
-                    if len(errormsgs) == 0:
-                        result = BenchmarkRequest(benchmark_script=obj['benchmark_script'])
-                elif obj['obj_type'] == BENCHMARK_DATA:
-                    if 'benchmark_data' not in obj:
-                        errormsgs.append('Could not obtain attribute benchmark_data, '
-                                         'please include json attribute benchmark_data.')
-                    if len(errormsgs) == 0:
-                        result = BenchmarkData(benchmark_data=obj['benchmark_data'])
-                elif obj['obj_type'] == BENCHMARK_ACK:
-                    if len(errormsgs) == 0:
-                        result = BenchmarkAck()
-                elif obj['obj_type'] == NOVELTY_START:
-                    if len(errormsgs) == 0:
-                        result = NoveltyStart()
-                elif obj['obj_type'] == NOVELTY_END:
-                    if len(errormsgs) == 0:
-                        result = NoveltyEnd()
-                elif obj['obj_type'] == TRIAL_START:
-                    if 'trial_number' not in obj:
-                        errormsgs.append('Could not obtain attribute trial_number, '
-                                         'please include json attribute trial_number.')
-                    if 'total_trials' not in obj:
-                        errormsgs.append('Could not obtain attribute total_trials, '
-                                         'please include json attribute total_trials.')
-                    if 'message' not in obj:
-                        errormsgs.append('Could not obtain attribute message, '
-                                         'please include json attribute message.')
-                    if 'novelty_description' not in obj:
-                        errormsgs.append('Could not obtain attribute novelty_description, '
-                                         'please include json attribute novelty_description.')
-                    if len(errormsgs) == 0:
-                        result = TrialStart(trial_number=obj['trial_number'],
-                                            total_trials=obj['total_trials'],
-                                            message=obj['message'],
-                                            novelty_description=obj['novelty_description'])
-                elif obj['obj_type'] == TRIAL_END:
-                    if len(errormsgs) == 0:
-                        result = TrialEnd()
-                elif obj['obj_type'] == TRAINING_START:
-                    if len(errormsgs) == 0:
-                        result = TrainingStart()
-                elif obj['obj_type'] == TRAINING_ACTIVE:
-                    if len(errormsgs) == 0:
-                        result = TrainingActive()
-                elif obj['obj_type'] == TRAINING_END:
-                    if 'message' not in obj:
-                        errormsgs.append('Could not obtain attribute message, '
-                                         'please include json attribute message.')
-                    if len(errormsgs) == 0:
-                        result = TrainingEnd(message=obj['message'])
-                elif obj['obj_type'] == TRAINING_MODEL_END:
-                    if len(errormsgs) == 0:
-                        result = TrainingModelEnd()
-                elif obj['obj_type'] == TRAINING_END_EARLY:
-                    if len(errormsgs) == 0:
-                        result = TrainingEndEarly()
-                elif obj['obj_type'] == TRAIN_EPISODE_START:
-                    if 'episode_number' not in obj:
-                        errormsgs.append('Could not obtain attribute episode_number, '
-                                         'please include json attribute episode_number.')
-                    if 'total_episodes' not in obj:
-                        errormsgs.append('Could not obtain attribute total_episodes, '
-                                         'please include json attribute total_episodes.')
-                    if len(errormsgs) == 0:
-                        result = TrainingEpisodeStart(episode_number=obj['episode_number'],
-                                                      total_episodes=obj['total_episodes'])
-                elif obj['obj_type'] == TRAIN_EPISODE_ACTIVE:
-                    if len(errormsgs) == 0:
-                        result = TrainingEpisodeActive()
-                elif obj['obj_type'] == TRAIN_EPISODE_END:
-                    if 'performance' not in obj:
-                        errormsgs.append('Could not obtain attribute performance, '
-                                         'please include json attribute performance.')
-                    if 'feedback' not in obj:
-                        errormsgs.append('Could not obtain attribute feedback, '
-                                         'please include json attribute feedback.')
-                    if len(errormsgs) == 0:
-                        result = TrainingEpisodeEnd(performance=obj['performance'],
-                                                    feedback=obj['feedback'])
-                elif obj['obj_type'] == EPISODE_END:
-                    if 'performance' not in obj:
-                        errormsgs.append('Could not obtain attribute performance, '
-                                         'please include json attribute performance.')
-                    if 'feedback' not in obj:
-                        errormsgs.append('Could not obtain attribute feedback, '
-                                         'please include json attribute feedback.')
-                    if len(errormsgs) == 0:
-                        result = EpisodeEnd(performance=obj['performance'],
-                                            feedback=obj['feedback'])
-                elif obj['obj_type'] == BASIC_DATA:
-                    if 'feature_vector' not in obj:
-                        errormsgs.append('Could not obtain attribute feature_vector, '
-                                         'please include json attribute feature_vector.')
-                    if 'feature_label' not in obj:
-                        errormsgs.append('Could not obtain attribute feature_label, '
-                                         'please include json attribute feature_label.')
-                    if len(errormsgs) == 0:
-                        result = BasicData(feature_vector=obj['feature_vector'],
-                                           feature_label=obj['feature_label'])
-                elif obj['obj_type'] == BASIC_DATA_PREDICTION:
-                    if 'label_prediction' not in obj:
-                        errormsgs.append('Could not obtain attribute label_prediction, '
-                                         'please include json attribute label_prediction.')
-                    if len(errormsgs) == 0:
-                        result = BasicDataPrediction(label_prediction=obj['label_prediction'])
-                elif obj['obj_type'] == BASIC_DATA_ACK:
-                    if 'performance' not in obj:
-                        errormsgs.append('Could not obtain attribute performance, '
-                                         'please include json attribute performance.')
-                    if 'feedback' not in obj:
-                        errormsgs.append('Could not obtain attribute feedback, '
-                                         'please include json attribute feedback.')
-                    if len(errormsgs) == 0:
-                        result = BasicDataAck(performance=obj['performance'],
-                                              feedback=obj['feedback'])
-                elif obj['obj_type'] == BASIC_EPISODE_NOVELTY:
-                    if 'novelty_probability' not in obj:
-                        errormsgs.append('Could not obtain attribute novelty_probability, '
-                                         'please include json attribute novelty_probability.')
-                    if 'novelty_threshold' not in obj:
-                        errormsgs.append('Could not obtain attribute novelty_threshold, '
-                                         'please include json attribute novelty_threshold.')
-                    if 'novelty' not in obj:
-                        errormsgs.append('Could not obtain attribute novelty, '
-                                         'please include json attribute novelty.')
-                    if 'novelty_characterization' not in obj:
-                        errormsgs.append('Could not obtain attribute novelty_characterization, '
-                                         'please include json attribute novelty_characterization.')
-                    if len(errormsgs) == 0:
-                        result = BasicEpisodeNovelty(
-                            novelty_probability=obj['novelty_probability'],
-                            novelty_threshold=obj['novelty_threshold'],
-                            novelty=obj['novelty'],
-                            novelty_characterization=obj['novelty_characterization'])
-                elif obj['obj_type'] == REQ_DATA:
-                    if len(errormsgs) == 0:
-                        result = RequestData()
-                elif obj['obj_type'] == REQ_TRAIN_DATA:
-                    if 'model_experiment_id' not in obj:
-                        errormsgs.append('Could not obtain attribute model_experiment_id, '
-                                         'please include json attribute model_experiment_id.')
-                    if 'secret' not in obj:
-                        errormsgs.append('Could not obtain attribute secret, '
-                                         'please include json attribute secret.')
-                    if len(errormsgs) == 0:
-                        result = RequestTrainingData(model_experiment_id=obj['model_experiment_id'],
-                                                     secret=obj['secret'])
-                elif obj['obj_type'] == TRAINING_DATA:
-                    if 'secret' not in obj:
-                        errormsgs.append('Could not obtain attribute secret, '
-                                         'please include json attribute secret.')
-                    if 'feature_vector' not in obj:
-                        errormsgs.append('Could not obtain attribute feature_vector, '
-                                         'please include json attribute feature_vector.')
-                    if 'feature_label' not in obj:
-                        errormsgs.append('Could not obtain attribute feature_label, '
-                                         'please include json attribute feature_label.')
-                    if 'utc_remote_epoch_received' not in obj:
-                        errormsgs.append('Could not obtain attribute utc_remote_epoch_received, '
-                                         'please include json attribute utc_remote_epoch_received.')
-                    if 'utc_remote_epoch_sent' not in obj:
-                        errormsgs.append('Could not obtain attribute utc_remote_epoch_sent, '
-                                         'please include json attribute utc_remote_epoch_sent.')
-                    if len(errormsgs) == 0:
-                        result = TrainingData(
-                            secret=obj['secret'],
-                            feature_vector=obj['feature_vector'],
-                            feature_label=obj['feature_label'],
-                            utc_remote_epoch_received=obj['utc_remote_epoch_received'],
-                            utc_remote_epoch_sent=obj['utc_remote_epoch_sent'])
-                elif obj['obj_type'] == TRAIN_DATA_PRED:
-                    if 'secret' not in obj:
-                        errormsgs.append('Could not obtain attribute secret, '
-                                         'please include json attribute secret.')
-                    if 'utc_remote_epoch_received' not in obj:
-                        errormsgs.append('Could not obtain attribute utc_remote_epoch_received, '
-                                         'please include json attribute utc_remote_epoch_received.')
-                    if 'utc_remote_epoch_sent' not in obj:
-                        errormsgs.append('Could not obtain attribute utc_remote_epoch_sent, '
-                                         'please include json attribute utc_remote_epoch_sent.')
-                    if 'label_prediction' not in obj:
-                        errormsgs.append('Could not obtain attribute label_prediction, '
-                                         'please include json attribute label_prediction.')
-                    if 'end_early' not in obj:
-                        errormsgs.append('Could not obtain attribute end_early, '
-                                         'please include json attribute end_early.')
-                    if len(errormsgs) == 0:
-                        result = TrainingDataPrediction(
-                            secret=obj['secret'],
-                            utc_remote_epoch_received=obj['utc_remote_epoch_received'],
-                            utc_remote_epoch_sent=obj['utc_remote_epoch_sent'],
-                            label_prediction=obj['label_prediction'],
-                            end_early=obj['end_early'])
-                elif obj['obj_type'] == TRAIN_DATA_ACK:
-                    if 'secret' not in obj:
-                        errormsgs.append('Could not obtain attribute secret, '
-                                         'please include json attribute secret.')
-                    if 'performance' not in obj:
-                        errormsgs.append('Could not obtain attribute performance, '
-                                         'please include json attribute performance.')
-                    if 'feedback' not in obj:
-                        errormsgs.append('Could not obtain attribute feedback, '
-                                         'please include json attribute feedback.')
-                    if len(errormsgs) == 0:
-                        result = TrainingDataAck(
-                            secret=obj['secret'],
-                            performance=obj['performance'],
-                            feedback=obj['feedback'])
-                elif obj['obj_type'] == TRAIN_EPISODE_NOVELTY:
-                    if 'novelty_probability' not in obj:
-                        errormsgs.append('Could not obtain attribute novelty_probability, '
-                                         'please include json attribute novelty_probability.')
-                    if 'novelty_threshold' not in obj:
-                        errormsgs.append('Could not obtain attribute novelty_threshold, '
-                                         'please include json attribute novelty_threshold.')
-                    if 'novelty' not in obj:
-                        errormsgs.append('Could not obtain attribute novelty, '
-                                         'please include json attribute novelty.')
-                    if 'novelty_characterization' not in obj:
-                        errormsgs.append('Could not obtain attribute novelty_characterization, '
-                                         'please include json attribute novelty_characterization.')
-                    if len(errormsgs) == 0:
-                        result = TrainingEpisodeNovelty(
-                            novelty_probability=obj['novelty_probability'],
-                            novelty_threshold=obj['novelty_threshold'],
-                            novelty=obj['novelty'],
-                            novelty_characterization=obj['novelty_characterization'])
-                elif obj['obj_type'] == TRAIN_EPISODE_NOVELTY_ACK:
-                    if len(errormsgs) == 0:
-                        result = TrainingEpisodeNoveltyAck()
-                elif obj['obj_type'] == TESTING_START:
-                    if len(errormsgs) == 0:
-                        result = TestingStart()
-                elif obj['obj_type'] == TESTING_ACTIVE:
-                    if len(errormsgs) == 0:
-                        result = TestingActive()
-                elif obj['obj_type'] == TESTING_END:
-                    if len(errormsgs) == 0:
-                        result = TestingEnd()
-                elif obj['obj_type'] == TEST_EPISODE_START:
-                    if 'episode_number' not in obj:
-                        errormsgs.append('Could not obtain attribute episode_number, '
-                                         'please include json attribute episode_number.')
-                    if 'total_episodes' not in obj:
-                        errormsgs.append('Could not obtain attribute total_episodes, '
-                                         'please include json attribute total_episodes.')
-                    if len(errormsgs) == 0:
-                        result = TestingEpisodeStart(episode_number=obj['episode_number'],
-                                                     total_episodes=obj['total_episodes'])
-                elif obj['obj_type'] == TEST_EPISODE_ACTIVE:
-                    if len(errormsgs) == 0:
-                        result = TestingEpisodeActive()
-                elif obj['obj_type'] == TEST_EPISODE_END:
-                    if 'performance' not in obj:
-                        errormsgs.append('Could not obtain attribute performance, '
-                                         'please include json attribute performance.')
-                    if 'feedback' not in obj:
-                        errormsgs.append('Could not obtain attribute feedback, '
-                                         'please include json attribute feedback.')
-                    if len(errormsgs) == 0:
-                        result = TestingEpisodeEnd(performance=obj['performance'],
-                                                   feedback=obj['feedback'])
-                elif obj['obj_type'] == REQ_TEST_DATA:
-                    if 'model_experiment_id' not in obj:
-                        errormsgs.append('Could not obtain attribute model_experiment_id, '
-                                         'please include json attribute model_experiment_id.')
-                    if 'secret' not in obj:
-                        errormsgs.append('Could not obtain attribute secret, '
-                                         'please include json attribute secret.')
-                    if len(errormsgs) == 0:
-                        result = RequestTestingData(model_experiment_id=obj['model_experiment_id'],
-                                                    secret=obj['secret'])
-                elif obj['obj_type'] == TESTING_DATA:
-                    if 'secret' not in obj:
-                        errormsgs.append('Could not obtain attribute secret, '
-                                         'please include json attribute secret.')
-                    if 'feature_vector' not in obj:
-                        errormsgs.append('Could not obtain attribute feature_vector, '
-                                         'please include json attribute feature_vector.')
-                    if 'utc_remote_epoch_received' not in obj:
-                        errormsgs.append('Could not obtain attribute utc_remote_epoch_received, '
-                                         'please include json attribute utc_remote_epoch_received.')
-                    if 'utc_remote_epoch_sent' not in obj:
-                        errormsgs.append('Could not obtain attribute utc_remote_epoch_sent, '
-                                         'please include json attribute utc_remote_epoch_sent.')
-                    if 'novelty_indicator' not in obj:
-                        errormsgs.append('Could not obtain attribute novelty_indicator, '
-                                         'please include json attribute novelty_indicator.')
-                    if len(errormsgs) == 0:
-                        result = TestingData(
-                            secret=obj['secret'],
-                            feature_vector=obj['feature_vector'],
-                            utc_remote_epoch_received=obj['utc_remote_epoch_received'],
-                            utc_remote_epoch_sent=obj['utc_remote_epoch_sent'],
-                            novelty_indicator=obj['novelty_indicator'])
-                elif obj['obj_type'] == TEST_DATA_PRED:
-                    if 'secret' not in obj:
-                        errormsgs.append('Could not obtain attribute secret, '
-                                         'please include json attribute secret.')
-                    if 'utc_remote_epoch_received' not in obj:
-                        errormsgs.append('Could not obtain attribute utc_remote_epoch_received, '
-                                         'please include json attribute utc_remote_epoch_received.')
-                    if 'utc_remote_epoch_sent' not in obj:
-                        errormsgs.append('Could not obtain attribute utc_remote_epoch_sent, '
-                                         'please include json attribute utc_remote_epoch_sent.')
-                    if 'label_prediction' not in obj:
-                        errormsgs.append('Could not obtain attribute label_prediction, '
-                                         'please include json attribute label_prediction.')
-                    if 'end_early' not in obj:
-                        errormsgs.append('Could not obtain attribute end_early, '
-                                         'please include json attribute end_early.')
-                    if len(errormsgs) == 0:
-                        result = TestingDataPrediction(
-                            secret=obj['secret'],
-                            utc_remote_epoch_received=obj['utc_remote_epoch_received'],
-                            utc_remote_epoch_sent=obj['utc_remote_epoch_sent'],
-                            label_prediction=obj['label_prediction'],
-                            end_early=obj['end_early'])
-                elif obj['obj_type'] == TEST_DATA_ACK:
-                    if 'secret' not in obj:
-                        errormsgs.append('Could not obtain attribute secret, '
-                                         'please include json attribute secret.')
-                    if 'performance' not in obj:
-                        errormsgs.append('Could not obtain attribute performance, '
-                                         'please include json attribute performance.')
-                    if 'feedback' not in obj:
-                        errormsgs.append('Could not obtain attribute feedback, '
-                                         'please include json attribute feedback.')
-                    if len(errormsgs) == 0:
-                        result = TestingDataAck(secret=obj['secret'],
-                                                performance=obj['performance'],
-                                                feedback=obj['feedback'])
-                elif obj['obj_type'] == TEST_EPISODE_NOVELTY:
-                    if 'novelty_probability' not in obj:
-                        errormsgs.append('Could not obtain attribute novelty_probability, '
-                                         'please include json attribute novelty_probability.')
-                    if 'novelty_threshold' not in obj:
-                        errormsgs.append('Could not obtain attribute novelty_threshold, '
-                                         'please include json attribute novelty_threshold.')
-                    if 'novelty' not in obj:
-                        errormsgs.append('Could not obtain attribute novelty, '
-                                         'please include json attribute novelty.')
-                    if 'novelty_characterization' not in obj:
-                        errormsgs.append('Could not obtain attribute novelty_characterization, '
-                                         'please include json attribute novelty_characterization.')
-                    if len(errormsgs) == 0:
-                        result = TestingEpisodeNovelty(
-                            novelty_probability=obj['novelty_probability'],
-                            novelty_threshold=obj['novelty_threshold'],
-                            novelty=obj['novelty'],
-                            novelty_characterization=obj['novelty_characterization'])
-                elif obj['obj_type'] == TEST_EPISODE_NOVELTY_ACK:
-                    if len(errormsgs) == 0:
-                        result = TestingEpisodeNoveltyAck()
-                elif obj['obj_type'] == END_EXPERIMENT:
-                    if 'model_experiment_id' not in obj:
-                        errormsgs.append('Could not obtain attribute model_experiment_id, '
-                                         'please include json attribute model_experiment_id.')
-                    if 'secret' not in obj:
-                        errormsgs.append('Could not obtain attribute secret, '
-                                         'please include json attribute secret.')
-                    if len(errormsgs) == 0:
-                        result = EndExperiment(model_experiment_id=obj['model_experiment_id'],
-                                               secret=obj['secret'])
-                elif obj['obj_type'] == WAIT_ON_SOTA:
-                    if len(errormsgs) == 0:
-                        result = WaitOnSota()
-                elif obj['obj_type'] == SOTA_IDLE:
-                    if len(errormsgs) == 0:
-                        result = SotaIdle()
-                elif obj['obj_type'] == OBJ_EPISODE:
-                    if 'novelty' not in obj:
-                        errormsgs.append('Could not obtain attribute novelty, '
-                                         'please include json attribute novelty.')
-                    if 'difficulty' not in obj:
-                        errormsgs.append('Could not obtain attribute difficulty, '
-                                         'please include json attribute difficulty.')
-                    if 'seed' not in obj:
-                        errormsgs.append('Could not obtain attribute seed, '
-                                         'please include json attribute seed.')
-                    if 'domain' not in obj:
-                        errormsgs.append('Could not obtain attribute domain, '
-                                         'please include json attribute domain.')
-                    if 'data_type' not in obj:
-                        errormsgs.append('Could not obtain attribute data_type, '
-                                         'please include json attribute data_type.')
-                    if 'episode_index' not in obj:
-                        errormsgs.append('Could not obtain attribute episode_index, '
-                                         'please include json attribute episode_index.')
-                    if 'episode_id' not in obj:
-                        errormsgs.append('Could not obtain attribute episode_id, '
-                                         'please include json attribute episode_id.')
-                    if 'trial_novelty' not in obj:
-                        errormsgs.append('Could not obtain attribute trial_novelty, '
-                                         'please include json attribute trial_novelty.')
-                    if 'day_offset' not in obj:
-                        errormsgs.append('Could not obtain attribute day_offset, '
-                                         'please include json attribute day_offset.')
-                    if 'trial_episode_index' not in obj:
-                        errormsgs.append('Could not obtain attribute trial_episode_index, '
-                                         'please include json attribute trial_episode_index.')
-                    if 'use_image' not in obj:
-                        errormsgs.append('Could not obtain attribute use_image, '
-                                         'please include json attribute use_image.')
-                    if 'hint_level' not in obj:
-                        errormsgs.append('Could not obtain attribute hint_level, '
-                                         'please include json attribute hint_level.')
-                    if 'phase' not in obj:
-                        errormsgs.append('Could not obtain attribute phase, '
-                                         'please include json attribute phase.')
-                    if len(errormsgs) == 0:
-                        result = Episode(novelty=obj['novelty'],
-                                         difficulty=obj['difficulty'],
-                                         domain=obj['domain'],
-                                         data_type=obj['data_type'],
-                                         seed=obj['seed'],
-                                         episode_index=obj['episode_index'],
-                                         episode_id=obj['episode_id'],
-                                         trial_novelty=obj['trial_novelty'],
-                                         day_offset=obj['day_offset'],
-                                         trial_episode_index=obj['trial_episode_index'],
-                                         use_image=obj['use_image'],
-                                         hint_level=obj['hint_level'],
-                                         phase=obj['phase'])
-                elif obj['obj_type'] == OBJ_TRAINING:
-                    if 'episodes' not in obj:
-                        errormsgs.append('Could not obtain attribute episodes, '
-                                         'please include json attribute episodes.')
-                    episodes = list()
-                    if len(errormsgs) == 0:
-                        if len(obj['episodes']) > 0:
-                            episodes = get_subobject_list(
-                                casas_object=json.dumps(obj['episodes']),
-                                errormsgs=errormsgs,
-                                amqp_obj=amqp_obj)
-                    if len(errormsgs) == 0:
-                        result = Training(episodes=episodes)
-                elif obj['obj_type'] == OBJ_TRIAL:
-                    if 'episodes' not in obj:
-                        errormsgs.append('Could not obtain attribute episodes, '
-                                         'please include json attribute episodes.')
-                    if 'novelty' not in obj:
-                        errormsgs.append('Could not obtain attribute novelty, '
-                                         'please include json attribute novelty.')
-                    if 'novelty_visibility' not in obj:
-                        errormsgs.append('Could not obtain attribute novelty_visibility, '
-                                         'please include json attribute novelty_visibiliy.')
-                    if 'difficulty' not in obj:
-                        errormsgs.append('Could not obtain attribute difficulty, '
-                                         'please include json attribute difficulty.')
-                    if 'hint_level' not in obj:
-                        errormsgs.append('Could not obtain attribute hint_level, '
-                                         'please include json attribute hint_level.')
-                    episodes = list()
-                    if len(errormsgs) == 0:
-                        if len(obj['episodes']) > 0:
-                            episodes = get_subobject_list(
-                                casas_object=json.dumps(obj['episodes']),
-                                errormsgs=errormsgs,
-                                amqp_obj=amqp_obj)
-                    if len(errormsgs) == 0:
-                        result = Trial(episodes=episodes,
-                                       novelty=obj['novelty'],
-                                       novelty_visibility=obj['novelty_visibility'],
-                                       difficulty=obj['difficulty'],
-                                       hint_level=obj['hint_level'])
-                elif obj['obj_type'] == OBJ_NOVELTY_GRP:
-                    if 'trials' not in obj:
-                        errormsgs.append('Could not obtain attribute trials, '
-                                         'please include json attribute trials.')
-                    trials = list()
-                    if len(errormsgs) == 0:
-                        if len(obj['trials']) > 0:
-                            trials = get_subobject_list(
-                                casas_object=json.dumps(obj['trials']),
-                                errormsgs=errormsgs,
-                                amqp_obj=amqp_obj)
-                    if len(errormsgs) == 0:
-                        result = NoveltyGroup(trials=trials)
-                elif obj['obj_type'] == OBJ_EXPERIMENT:
-                    if 'training' not in obj:
-                        errormsgs.append('Could not obtain attribute training, '
-                                         'please include json attribute training.')
-                    if 'novelty_groups' not in obj:
-                        errormsgs.append('Could not obtain attribute novelty_groups, '
-                                         'please include json attribute novelty_groups.')
-                    if 'budget' not in obj:
-                        errormsgs.append('Could not obtain attribute budget, '
-                                         'please include json attribute budget.')
-                    if 'phase' not in obj:
-                        errormsgs.append('Could not obtain attribute phase, '
-                                         'please include json attribute phase.')
-                    training = None
-                    nov_groups = list()
-                    if len(errormsgs) == 0:
-                        training = get_subobject(
-                            casas_object='[{}]'.format(json.dumps(obj['training'])),
-                            errormsgs=errormsgs,
-                            amqp_obj=amqp_obj)
-                    if len(errormsgs) == 0:
-                        if len(obj['novelty_groups']) > 0:
-                            nov_groups = get_subobject_list(
-                                casas_object=json.dumps(obj['novelty_groups']),
-                                errormsgs=errormsgs,
-                                amqp_obj=amqp_obj)
-                    if len(errormsgs) == 0:
-                        result = Experiment(training=training,
-                                            novelty_groups=nov_groups,
-                                            budget=obj['budget'],
-                                            phase=obj['phase'])
-                elif obj['obj_type'] == REQ_NOVELTY_DESCRIPTION:
-                    if 'domain' not in obj:
-                        errormsgs.append('Could not obtain attribute domain, '
-                                         'please include json attribute domain.')
-                    if 'novelty' not in obj:
-                        errormsgs.append('Could not obtain attribute novelty, '
-                                         'please include json attribute novelty.')
-                    if 'difficulty' not in obj:
-                        errormsgs.append('Could not obtain attribute difficulty, '
-                                         'please include json attribute difficulty.')
-                    if len(errormsgs) == 0:
-                        result = RequestNoveltyDescription(r_domain=obj['domain'],
-                                                           novelty=obj['novelty'],
-                                                           difficulty=obj['difficulty'])
-                elif obj['obj_type'] == OBJ_NOVELTY_DESCRIPTION:
-                    if 'novelty_description' not in obj:
-                        errormsgs.append('Coule not obtain attribute novelty_description, '
-                                         'please include json attribute novelty_description.')
-                    if len(errormsgs) == 0:
-                        result = NoveltyDescription(novelty_description=obj['novelty_description'])
-                elif obj['obj_type'] == GENERATOR_IDLE:
-                    if len(errormsgs) == 0:
-                        result = GeneratorIdle()
-                elif obj['obj_type'] == GENERATOR_RESET:
-                    if len(errormsgs) == 0:
-                        result = GeneratorReset()
-                elif obj['obj_type'] == START_GENERATOR:
-                    if 'domain' not in obj:
-                        errormsgs.append('Could not obtain attribute domain, '
-                                         'please include json attribute domain.')
-                    if 'novelty' not in obj:
-                        errormsgs.append('Could not obtain attribute novelty, '
-                                         'please include json attribute novelty.')
-                    if 'difficulty' not in obj:
-                        errormsgs.append('Could not obtain attribute difficulty, '
-                                         'please include json attribute difficulty.')
-                    if 'seed' not in obj:
-                        errormsgs.append('Could not obtain attribute seed, '
-                                         'please include json attribute seed.')
-                    if 'server_rpc_queue' not in obj:
-                        errormsgs.append('Could not obtain attribute server_rpc_queue, '
-                                         'please include json attribute server_rpc_queue.')
-                    if 'trial_novelty' not in obj:
-                        errormsgs.append('Could not obtain attribute trial_novelty, '
-                                         'please include json attribute trial_novelty.')
-                    if 'epoch' not in obj:
-                        errormsgs.append('Could not obtain attribute epoch, '
-                                         'please include json attribute epoch.')
-                    if 'day_offset' not in obj:
-                        errormsgs.append('Could not obtain attribute day_offset, '
-                                         'please include json attribute day_offset.')
-                    if 'request_timeout' not in obj:
-                        errormsgs.append('Could not obtain attribute request_timeout, '
-                                         'please include json attribute request_timeout.')
-                    if 'use_image' not in obj:
-                        errormsgs.append('Could not obtain attribute use_image, '
-                                         'please include json attribute use_image.')
-                    if 'generator_config' not in obj:
-                        obj['generator_config'] = None
-                    if 'hint_level' not in obj:
-                        errormsgs.append('Could not obtain attribute hint_level, '
-                                         'please include json attribute hint_level.')
-                    if 'phase' not in obj:
-                        errormsgs.append('Could not obtain attribute phase, '
-                                         'please include json attribute phase.')
-                    if len(errormsgs) == 0:
-                        result = StartGenerator(domain=obj['domain'],
-                                                novelty=obj['novelty'],
-                                                difficulty=obj['difficulty'],
-                                                seed=obj['seed'],
-                                                server_rpc_queue=obj['server_rpc_queue'],
-                                                trial_novelty=obj['trial_novelty'],
-                                                epoch=obj['epoch'],
-                                                day_offset=obj['day_offset'],
-                                                request_timeout=obj['request_timeout'],
-                                                use_image=obj['use_image'],
-                                                generator_config=obj['generator_config'],
-                                                hint_level=obj['hint_level'],
-                                                phase=obj['phase'])
-                elif obj['obj_type'] == GENERATOR_RESPONSE:
-                    if 'generator_rpc_queue' not in obj:
-                        errormsgs.append('Could not obtain attribute generator_rpc_queue, '
-                                         'please include json attribute generator_rpc_queue.')
-                    if len(errormsgs) == 0:
-                        result = GeneratorResponse(generator_rpc_queue=obj['generator_rpc_queue'])
-                elif obj['obj_type'] == ANALYSIS_READY:
-                    if 'model_experiment_id' not in obj:
-                        errormsgs.append('Could not obtain attribute model_experiment_id, '
-                                         'please include json attribute model_experiment_id.')
-                    if len(errormsgs) == 0:
-                        result = AnalysisReady(model_experiment_id=obj['model_experiment_id'])
-                elif obj['obj_type'] == ANALYSIS_PARTIAL:
-                    if 'model_experiment_id' not in obj:
-                        errormsgs.append('Could not obtain attribute model_experiment_id, '
-                                         'please include json attribute model_experiment_id.')
-                    if 'experiment_trial_id' not in obj:
-                        errormsgs.append('Could not obtain attribute experiment_trial_id, '
-                                         'please include json attribute experiment_trial_id.')
-                    if len(errormsgs) == 0:
-                        result = AnalysisPartial(model_experiment_id=obj['model_experiment_id'],
-                                                 experiment_trial_id=obj['experiment_trial_id'])
-                return_objects.append(copy.deepcopy(result))
+                result = None
+                decoder = AIQ_DECODERS.get(obj['obj_type'], None)
+                if decoder is not None:
+                    result = decoder.decode(obj=obj,
+                                            errormsgs=errormsgs,
+                                            amqp_obj=amqp_obj)
+                else:
+                    errormsgs.append('Unknown obj_type {}.'.format(str(obj['obj_type'])))
+                # The result was just built from the message, so nothing else holds it.
+                return_objects.append(result)
             elif 'action' not in obj:
                 errormsgs.append("Could not obtain attribute action, "
                                  "please include json attribute action.")
@@ -7264,7 +7042,7 @@ def build_objects_from_json(message, amqp_obj=None):
 def get_subobject(casas_object, errormsgs, amqp_obj=None):
     if amqp_obj is not None:
         amqp_obj.process_data_events()
-    log.debug("get_subobject( {} )".format(str(casas_object)))
+    log.debug("get_subobject( %d chars )", len(casas_object))
     new_object = None
     values = build_objects_from_json(casas_object, amqp_obj=amqp_obj)
     if isinstance(values, list):
@@ -7283,7 +7061,7 @@ def get_subobject(casas_object, errormsgs, amqp_obj=None):
 def get_subobject_list(casas_object, errormsgs, amqp_obj=None):
     if amqp_obj is not None:
         amqp_obj.process_data_events()
-    log.debug("get_subobject( {} )".format(str(casas_object)))
+    log.debug("get_subobject_list( %d chars )", len(casas_object))
     new_object_list = list()
     values = build_objects_from_json(casas_object, amqp_obj=amqp_obj)
     valid = False
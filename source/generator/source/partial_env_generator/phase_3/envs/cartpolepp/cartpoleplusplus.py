@@ -19,6 +19,10 @@ from pybullet_utils import bullet_client as bc
 class CartPoleBulletEnv(gym.Env):
     metadata = {'render.modes': ['human', 'rgb_array'], 'video.frames_per_second': 50}
 
+    # Rows and columns of the array read_state() fills once per tick
+    CART, POLE, BLOCKS = 0, 1, 2
+    POSITION, ORIENTATION, VELOCITY = slice(0, 3), slice(3, 7), slice(7, 10)
+
     def __init__(self, params: dict = None):
         # start the bullet physics server
         self._render_height = 480
@@ -60,6 +64,13 @@ class CartPoleBulletEnv(gym.Env):
         self.walls = None
         self.state = None
         self.origin = None
+        self.state_array = None
+
+        # Models of the bodies that are reused between episodes, and the joint state they were
+        # loaded in
+        self.cartpole_path = os.path.join(self.path, 'models', 'ground_cart.urdf')
+        self.block_path = os.path.join(self.path, 'models', 'block.urdf')
+        self.rest_states = dict()
 
         # Functions to be run directly after init
         self.seed(self.params['seed'])
@@ -70,6 +81,28 @@ class CartPoleBulletEnv(gym.Env):
         self.np_random, seed = seeding.np_random(seed)
         return None
 
+    # Draws the random parameters a novelty fixes for the life of an instance
+    def sample_params(self):
+        return None
+
+    # Used to prepare a warm instance for another episode, the next reset() then plays out as it
+    # would on a new instance built with this seed and config
+    def reseed(self, seed, config=None):
+        self.config = config
+        self.init_zero = False
+        self.seed(seed)
+        self.sample_params()
+
+        # Read user config here
+        if self.config is not None:
+            if 'start_zeroed_out' in self.config:
+                self.init_zero = self.config['start_zeroed_out']
+            if 'episode_seed' in self.config:
+                if self.config['episode_seed'] is not None:
+                    self.seed(self.config['episode_seed'])
+
+        return None
+
     def step(self, action):
         p = self._p
 
@@ -86,7 +119,7 @@ class CartPoleBulletEnv(gym.Env):
             action = 4
 
         # Adjust forces so they always apply in reference to world frame
-        _, ori, _, _, _, _ = p.getLinkState(self.cartpole, 0)
+        ori = self.read_state()[self.CART, self.ORIENTATION].tolist()
         cart_angle = p.getEulerFromQuaternion(ori)[2] # yaw
         fx = self.force_mag * np.cos(cart_angle)
         fy = self.force_mag * np.sin(cart_angle) * -1
@@ -122,7 +155,7 @@ class CartPoleBulletEnv(gym.Env):
         for i in self.blocks:
             p.applyExternalForce(i, -1, (0, 0, 9.8), (0, 0, 0), p.LINK_FRAME)
 
-        p.stepSimulation()
+        self.step_simulation()
 
         done = self.is_done()
         reward = self.get_reward()
@@ -138,9 +171,8 @@ class CartPoleBulletEnv(gym.Env):
             return True
 
         # Check pole angle condition
-        p = self._p
-        _, _, _, _, _, ori, _, _ = p.getLinkState(self.cartpole, 1, 1)
-        eulers = p.getEulerFromQuaternion(ori)
+        ori = self.read_state()[self.POLE, self.ORIENTATION].tolist()
+        eulers = self._p.getEulerFromQuaternion(ori)
         x_angle, y_angle = eulers[0], eulers[1]
 
         if abs(x_angle) > self.angle_limit or abs(y_angle) > self.angle_limit:
@@ -169,6 +201,7 @@ class CartPoleBulletEnv(gym.Env):
 
         self.tick = 0
         self.reset_world()
+        self.state_array = None
 
         # Run for one step to get everything going
         self.step(0)
@@ -207,9 +240,10 @@ class CartPoleBulletEnv(gym.Env):
         p.setRealTimeSimulation(0)
 
         # Load world objects
-        self.cartpole = p.loadURDF(os.path.join(self.path, 'models', 'ground_cart.urdf'))
-        self.walls = p.loadURDF(os.path.join(self.path, 'models', 'walls.urdf'))
-        self.origin = p.loadURDF(os.path.join(self.path, 'models', 'origin.urdf'))
+        self.rest_states = dict()
+        self.cartpole = self.load_urdf(self.cartpole_path)
+        self.walls = self.load_urdf(os.path.join(self.path, 'models', 'walls.urdf'))
+        self.origin = self.load_urdf(os.path.join(self.path, 'models', 'origin.urdf'))
 
         # Set walls to be bouncy
         for joint_nb in range(-1, 6):
@@ -218,16 +252,58 @@ class CartPoleBulletEnv(gym.Env):
 
         return None
 
-    def reset_world(self):
-        # Reset world (assume is created)
+    # Loads a model, the visual shapes parsed from it are shared by every later load
+    def load_urdf(self, file_name):
+        p = self._p
+        body = p.loadURDF(file_name, flags=p.URDF_ENABLE_CACHED_GRAPHICS_SHAPES)
+
+        # Keep the joint state it starts in to put it back to rest when reused
+        rest_state = list()
+        for joint_nb in range(p.getNumJoints(body)):
+            pos, vel, _, _ = p.getJointStateMultiDof(body, joint_nb)
+            if len(pos) > 0:
+                rest_state.append((joint_nb, pos, [0.0] * len(vel)))
+        self.rest_states[body] = rest_state
+
+        return body
+
+    def remove_body(self, body):
+        self._p.removeBody(body)
+        self.rest_states.pop(body, None)
+        return None
+
+    # Puts a reused body back to the state it was loaded in
+    def rest_body(self, body):
         p = self._p
+        p.resetBaseVelocity(body, [0, 0, 0], [0, 0, 0])
+        for joint_nb, pos, vel in self.rest_states.get(body, list()):
+            p.resetJointStateMultiDof(body, joint_nb, targetValue=pos, targetVelocity=vel)
+        return None
 
-        # Delete cartpole
+    def reset_cartpole(self):
         if self.cartpole == -10:
-            self.cartpole = p.loadURDF(os.path.join(self.path, 'models', 'ground_cart.urdf'))
+            self.cartpole = self.load_urdf(self.cartpole_path)
         else:
-            p.removeBody(self.cartpole)
-            self.cartpole = p.loadURDF(os.path.join(self.path, 'models', 'ground_cart.urdf'))
+            self._p.resetBasePositionAndOrientation(self.cartpole, [0, 0, 0], [0, 0, 0, 1])
+            self.rest_body(self.cartpole)
+        return None
+
+    # Makes self.blocks hold nb_blocks blocks, reusing the ones of the last episode
+    def reset_blocks(self):
+        while len(self.blocks) > self.nb_blocks:
+            self.remove_body(self.blocks.pop())
+        for i in self.blocks:
+            self.rest_body(i)
+        while len(self.blocks) < self.nb_blocks:
+            self.blocks.append(self.load_urdf(self.block_path))
+        return None
+
+    def reset_world(self):
+        # Reset world (assume is created)
+        p = self._p
+
+        # The cartpole is only loaded once, then put back to rest
+        self.reset_cartpole()
 
         # This big line sets the spehrical joint on the pole to loose
         p.setJointMotorControlMultiDof(self.cartpole, 1, p.POSITION_CONTROL, targetPosition=[0, 0, 0, 1],
@@ -256,15 +332,9 @@ class CartPoleBulletEnv(gym.Env):
         pole_ori = list(randstate[3:5]) + [0]
         p.resetJointStateMultiDof(self.cartpole, 1, targetValue=pole_pos, targetVelocity=pole_ori)
 
-        # Delete old blocks
-        for i in self.blocks:
-            p.removeBody(i)
-
-        # Load blocks in
+        # Load or remove only the blocks that differ in count from the last episode
         self.nb_blocks = self.np_random.randint(3) + 2
-        self.blocks = [None] * self.nb_blocks
-        for i in range(self.nb_blocks):
-            self.blocks[i] = p.loadURDF(os.path.join(self.path, 'models', 'block.urdf'))
+        self.reset_blocks()
 
         # Set blocks to be bouncy
         for i in self.blocks:
@@ -317,82 +387,68 @@ class CartPoleBulletEnv(gym.Env):
         for i in self.blocks:
             p.resetBasePositionAndOrientation(i, blocks_p[i], [0, 0, 1, 0])
             p.resetBaseVelocity(i, blocks_v[i], [0, 0, 0])
+        self.state_array = None
         return None
 
-    # Unified function for getting state information
-    def get_state(self, initial=False):
+    def step_simulation(self):
+        self._p.stepSimulation()
+        self.state_array = None
+        return None
+
+    # Position, orientation and linear velocity of a block
+    def read_block(self, block):
         p = self._p
-        world_state = dict()
+        pos, ori = p.getBasePositionAndOrientation(block)
+        vel, _ = p.getBaseVelocity(block)
+        return pos + ori + vel
+
+    # Reads the state of every body once per tick, one row each for the cart, the pole and the
+    # blocks.  The cart row holds its link orientation and linear velocity, the pole row its frame
+    # orientation and angular velocity.
+    def read_state(self):
+        if self.state_array is None:
+            cart, pole = self._p.getLinkStates(self.cartpole, [0, 1], computeLinkVelocity=1)
+            rows = [cart[0] + cart[1] + cart[6], pole[0] + pole[5] + pole[7]]
+            for i in self.blocks:
+                rows.append(self.read_block(i))
+            self.state_array = np.array(rows, dtype=np.float64)
+        return self.state_array
+
+    # Builds the dict sent as sensors from an array of read_state()
+    def state_to_dict(self, state_array, initial=False):
         round_amount = 6
+        values = np.round(state_array, round_amount).tolist()
+        world_state = dict()
 
         # Get cart info ============================================
-        state = dict()
-
-        # Handle pos, vel
-        pos, _, _, _, _, _ = p.getLinkState(self.cartpole, 0)
-        state['x_position'] = round(pos[0], round_amount)
-        state['y_position'] = round(pos[1], round_amount)
-        state['z_position'] = round(pos[2], round_amount)
-
-        # Cart velocity from planar joint (buggy in PyBullet; thus reverse order)
-        # _, vel, _, _ = p.getJointStateMultiDof(self.cartpole, 0)
-        # state['x_velocity'] = round(vel[2], round_amount)
-        # state['y_velocity'] = round(vel[1], round_amount)
-        # state['z_velocity'] = round(vel[0], round_amount)
-
-        # Cart velocity from cart
-        _, _, _, _, _, _, vel, _ = p.getLinkState(self.cartpole, 0, 1)
-        state['x_velocity'] = round(vel[0], round_amount)
-        state['y_velocity'] = round(vel[1], round_amount)
-        state['z_velocity'] = round(vel[2], round_amount)
-
-        # Set world state of cart
-        world_state['cart'] = state
+        cart = values[self.CART]
+        world_state['cart'] = dict({'x_position': cart[0],
+                                    'y_position': cart[1],
+                                    'z_position': cart[2],
+                                    'x_velocity': cart[7],
+                                    'y_velocity': cart[8],
+                                    'z_velocity': cart[9]})
 
         # Get pole info =============================================
-        state = dict()
-        use_euler = False
-
-        # Orientation and A_velocity, the others not used
-        _, _, _, _, _, ori, _, vel = p.getLinkState(self.cartpole, 1, 1)
-
-        # Orientation
-        if use_euler:
-            # Convert quats to eulers
-            eulers = p.getEulerFromQuaternion(ori)
-            state['x_euler'] = round(eulers[0], round_amount)
-            state['y_euler'] = round(eulers[1], round_amount)
-            state['z_euler'] = round(eulers[2], round_amount)
-        else:
-            state['x_quaternion'] = round(ori[0], round_amount)
-            state['y_quaternion'] = round(ori[1], round_amount)
-            state['z_quaternion'] = round(ori[2], round_amount)
-            state['w_quaternion'] = round(ori[3], round_amount)
-
-        # A_velocity
-        state['x_velocity'] = round(vel[0], round_amount)
-        state['y_velocity'] = round(vel[1], round_amount)
-        state['z_velocity'] = round(vel[2], round_amount)
-
-        world_state['pole'] = state
+        pole = values[self.POLE]
+        world_state['pole'] = dict({'x_quaternion': pole[3],
+                                    'y_quaternion': pole[4],
+                                    'z_quaternion': pole[5],
+                                    'w_quaternion': pole[6],
+                                    'x_velocity': pole[7],
+                                    'y_velocity': pole[8],
+                                    'z_velocity': pole[9]})
 
         # get block info ====================================
         block_state = list()
-        for ind, val in enumerate(self.blocks):
-            state = dict()
-            state['id'] = val
-
-            pos, _ = p.getBasePositionAndOrientation(val)
-            state['x_position'] = round(pos[0], round_amount)
-            state['y_position'] = round(pos[1], round_amount)
-            state['z_position'] = round(pos[2], round_amount)
-
-            vel, _ = p.getBaseVelocity(val)
-            state['x_velocity'] = round(vel[0], round_amount)
-            state['y_velocity'] = round(vel[1], round_amount)
-            state['z_velocity'] = round(vel[2], round_amount)
-
-            block_state.append(state)
+        for block, row in zip(self.blocks, values[self.BLOCKS:]):
+            block_state.append(dict({'id': block,
+                                     'x_position': row[0],
+                                     'y_position': row[1],
+                                     'z_position': row[2],
+                                     'x_velocity': row[7],
+                                     'y_velocity': row[8],
+                                     'z_velocity': row[9]}))
 
         world_state['blocks'] = block_state
 
@@ -413,6 +469,10 @@ class CartPoleBulletEnv(gym.Env):
 
         return world_state
 
+    # Unified function for getting state information
+    def get_state(self, initial=False):
+        return self.state_to_dict(self.read_state(), initial=initial)
+
     def get_image(self):
         if self.use_img:
             return self.render()
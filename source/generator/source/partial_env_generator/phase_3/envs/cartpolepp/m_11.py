@@ -30,7 +30,7 @@ class CartPolePPMock11(CartPoleBulletEnv):
             action = 3
 
         # Adjust forces so they always apply in reference to world frame
-        _, ori, _, _, _, _ = p.getLinkState(self.cartpole, 0)
+        ori = self.read_state()[self.CART, self.ORIENTATION].tolist()
         cart_angle = p.getEulerFromQuaternion(ori)[2] # yaw
         fx = self.force_mag * np.cos(cart_angle)
         fy = self.force_mag * np.sin(cart_angle) * -1
@@ -63,7 +63,7 @@ class CartPolePPMock11(CartPoleBulletEnv):
         for i in self.blocks:
             p.applyExternalForce(i, -1, (0, 0, 9.8), (0, 0, 0), p.LINK_FRAME)
 
-        p.stepSimulation()
+        self.step_simulation()
 
         done = self.is_done()
         reward = self.get_reward()
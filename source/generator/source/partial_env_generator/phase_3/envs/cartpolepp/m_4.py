@@ -11,6 +11,7 @@ class CartPolePPMock4(CartPoleBulletEnv):
         super().__init__(params=params)
 
         self.difficulty = difficulty
+        self.block_path = os.path.join(self.path, 'models', 'm4', 'block.urdf')
 
         return None
 
@@ -19,12 +20,8 @@ class CartPolePPMock4(CartPoleBulletEnv):
         # Reset world (assume is created)
         p = self._p
 
-        # Delete cartpole
-        if self.cartpole == -10:
-            self.cartpole = p.loadURDF(os.path.join(self.path, 'models', 'ground_cart.urdf'))
-        else:
-            p.removeBody(self.cartpole)
-            self.cartpole = p.loadURDF(os.path.join(self.path, 'models', 'ground_cart.urdf'))
+        # The cartpole is only loaded once, then put back to rest
+        self.reset_cartpole()
 
         # This big line sets the spehrical joint on the pole to loose
         p.setJointMotorControlMultiDof(self.cartpole, 1, p.POSITION_CONTROL, targetPosition=[0, 0, 0, 1],
@@ -53,15 +50,9 @@ class CartPolePPMock4(CartPoleBulletEnv):
         pole_ori = list(randstate[3:5]) + [0]
         p.resetJointStateMultiDof(self.cartpole, 1, targetValue=pole_pos, targetVelocity=pole_ori)
 
-        # Delete old blocks
-        for i in self.blocks:
-            p.removeBody(i)
-
-        # Load blocks in
+        # Load or remove only the blocks that differ in count from the last episode
         self.nb_blocks = self.np_random.randint(3) + 2
-        self.blocks = [None] * self.nb_blocks
-        for i in range(self.nb_blocks):
-            self.blocks[i] = p.loadURDF(os.path.join(self.path, 'models', 'm4', 'block.urdf'))
+        self.reset_blocks()
 
         # Set blocks to be bouncy
         for i in self.blocks:
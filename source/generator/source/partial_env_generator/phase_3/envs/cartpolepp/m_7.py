@@ -37,7 +37,7 @@ class CartPolePPMock7(CartPoleBulletEnv):
             action = 4
 
         # Adjust forces so they always apply in reference to world frame
-        _, ori, _, _, _, _ = p.getLinkState(self.cartpole, 0)
+        ori = self.read_state()[self.CART, self.ORIENTATION].tolist()
         cart_angle = p.getEulerFromQuaternion(ori)[2] # yaw
         fx = self.force_mag * np.cos(cart_angle)
         fy = self.force_mag * np.sin(cart_angle) * -1
@@ -85,7 +85,7 @@ class CartPolePPMock7(CartPoleBulletEnv):
                 u1 = np.multiply(u1 / np.linalg.norm(u1), self.block_force)
             p.applyExternalForce(i, -1, (-u1[0], -u1[1], u1[2]), (0, 0, 0), p.LINK_FRAME)
 
-        p.stepSimulation()
+        self.step_simulation()
 
         done = self.is_done()
         reward = self.get_reward()
@@ -36,6 +36,15 @@ class CartPolePPMock8(CartPoleBulletEnv):
         self.directions.append([state['cart']['x_velocity'], state['cart']['y_velocity']])
         return state, reward, done, info
 
+    def reset_world(self):
+        super().reset_world()
+
+        # Spawning starts over every episode, a reused env is not ahead or carrying old directions
+        self.block_tick = 0
+        self.directions = []
+
+        return None
+
     def spawn_block(self):
         p = self._p
 
@@ -43,7 +52,7 @@ class CartPolePPMock8(CartPoleBulletEnv):
         self.nb_blocks = self.nb_blocks + 1
         self.blocks.append(None)
 
-        self.blocks[-1] = p.loadURDF(os.path.join(self.path, 'models', 'block.urdf'))
+        self.blocks[-1] = self.load_urdf(self.block_path)
 
         # Set blocks to be bouncy
         p.changeDynamics(self.blocks[-1], -1, restitution=1.0, lateralFriction=0.0,
@@ -59,7 +68,7 @@ class CartPolePPMock8(CartPoleBulletEnv):
         while self.too_close(min_dist, pos) or self.is_out(pos):
             attempt = attempt + 1
             if attempt > max_attempts:
-                p.removeBody(self.blocks[-1])
+                self.remove_body(self.blocks[-1])
                 self.nb_blocks = self.nb_blocks - 1
                 del self.blocks[-1]
                 return None
@@ -28,12 +28,8 @@ class CartPolePPNovel1(CartPoleBulletEnv):
         # Reset world (assume is created)
         p = self._p
 
-        # Delete cartpole
-        if self.cartpole == -10:
-            self.cartpole = p.loadURDF(self.cartpole_path)
-        else:
-            p.removeBody(self.cartpole)
-            self.cartpole = p.loadURDF(self.cartpole_path)
+        # The cartpole is only loaded once, then put back to rest
+        self.reset_cartpole()
 
         # This big line sets the spehrical joint on the pole to loose
         p.setJointMotorControlMultiDof(self.cartpole, 1, p.POSITION_CONTROL, targetPosition=[0, 0, 0, 1],
@@ -62,15 +58,9 @@ class CartPolePPNovel1(CartPoleBulletEnv):
         pole_ori = list(randstate[3:5]) + [0]
         p.resetJointStateMultiDof(self.cartpole, 1, targetValue=pole_pos, targetVelocity=pole_ori)
 
-        # Delete old blocks
-        for i in self.blocks:
-            p.removeBody(i)
-
-        # Load blocks in
+        # Load or remove only the blocks that differ in count from the last episode
         self.nb_blocks = self.np_random.randint(3) + 2
-        self.blocks = [None] * self.nb_blocks
-        for i in range(self.nb_blocks):
-            self.blocks[i] = p.loadURDF(os.path.join(self.path, 'models', 'block.urdf'))
+        self.reset_blocks()
 
         # Set blocks to be bouncy
         for i in self.blocks:
@@ -14,6 +14,7 @@ class CartPolePPNovel2(CartPoleBulletEnv):
         super().__init__(params=params)
 
         self.difficulty = difficulty
+        self.block_path = os.path.join(self.path, 'models', 'n2', 'block.urdf')
 
         if self.difficulty == 'easy':
             self.min_dist = 3
@@ -26,109 +27,19 @@ class CartPolePPNovel2(CartPoleBulletEnv):
             self.max_dist = 2
         return None
 
-    # Unified function for getting state information
-    def get_state(self, initial=False):
+    # Blocks are reported by where they are on their line
+    def read_block(self, block):
         p = self._p
-        world_state = dict()
-        round_amount = 6
-
-        # Get cart info ============================================
-        state = dict()
-
-        # Handle pos, vel
-        pos, _, _, _, _, _ = p.getLinkState(self.cartpole, 0)
-        state['x_position'] = round(pos[0], round_amount)
-        state['y_position'] = round(pos[1], round_amount)
-        state['z_position'] = round(pos[2], round_amount)
-
-        # Cart velocity from planar joint (buggy in PyBullet; thus reverse order)
-        # _, vel, _, _ = p.getJointStateMultiDof(self.cartpole, 0)
-        # state['x_velocity'] = round(vel[2], round_amount)
-        # state['y_velocity'] = round(vel[1], round_amount)
-        # state['z_velocity'] = round(vel[0], round_amount)
-
-        # Cart velocity from cart
-        _, _, _, _, _, _, vel, _ = p.getLinkState(self.cartpole, 0, 1)
-        state['x_velocity'] = round(vel[0], round_amount)
-        state['y_velocity'] = round(vel[1], round_amount)
-        state['z_velocity'] = round(vel[2], round_amount)
-
-        # Set world state of cart
-        world_state['cart'] = state
-
-        # Get pole info =============================================
-        state = dict()
-        use_euler = False
-
-        # Orientation and A_velocity, the others not used
-        _, _, _, _, _, ori, _, vel = p.getLinkState(self.cartpole, 1, 1)
-
-        # Orientation
-        if use_euler:
-            # Convert quats to eulers
-            eulers = p.getEulerFromQuaternion(ori)
-            state['x_euler'] = round(eulers[0], round_amount)
-            state['y_euler'] = round(eulers[1], round_amount)
-            state['z_euler'] = round(eulers[2], round_amount)
-        else:
-            state['x_quaternion'] = round(ori[0], round_amount)
-            state['y_quaternion'] = round(ori[1], round_amount)
-            state['z_quaternion'] = round(ori[2], round_amount)
-            state['w_quaternion'] = round(ori[3], round_amount)
-
-        # A_velocity
-        state['x_velocity'] = round(vel[0], round_amount)
-        state['y_velocity'] = round(vel[1], round_amount)
-        state['z_velocity'] = round(vel[2], round_amount)
-
-        world_state['pole'] = state
-
-        # get block info ====================================
-        block_state = list()
-        for ind, val in enumerate(self.blocks):
-            state = dict()
-            state['id'] = val
-
-            pos, _, _, _, _, _, vel, _ = p.getLinkState(val, 0, 1)
-            state['x_position'] = round(pos[0], round_amount)
-            state['y_position'] = round(pos[1], round_amount)
-            state['z_position'] = round(pos[2], round_amount)
-
-            vel, _ = p.getBaseVelocity(val)
-            state['x_velocity'] = round(vel[0], round_amount)
-            state['y_velocity'] = round(vel[1], round_amount)
-            state['z_velocity'] = round(vel[2], round_amount)
-
-            block_state.append(state)
-
-        world_state['blocks'] = block_state
-
-        # Get wall info ======================================
-        if initial:
-            state = list()
-            state.append([-5, -5, 0])
-            state.append([5, -5, 0])
-            state.append([5, 5, 0])
-            state.append([-5, 5, 0])
-            state.append([-5, -5, 10])
-            state.append([5, -5, 10])
-            state.append([5, 5, 10])
-            state.append([-5, 5, 10])
-
-            world_state['walls'] = state
-
-        return world_state
+        pos, ori, _, _, _, _ = p.getLinkState(block, 0)
+        vel, _ = p.getBaseVelocity(block)
+        return pos + ori + vel
 
     def reset_world(self):
         # Reset world (assume is created)
         p = self._p
 
-        # Delete cartpole
-        if self.cartpole == -10:
-            self.cartpole = p.loadURDF(os.path.join(self.path, 'models', 'ground_cart.urdf'))
-        else:
-            p.removeBody(self.cartpole)
-            self.cartpole = p.loadURDF(os.path.join(self.path, 'models', 'ground_cart.urdf'))
+        # The cartpole is only loaded once, then put back to rest
+        self.reset_cartpole()
 
         # This big line sets the spehrical joint on the pole to loose
         p.setJointMotorControlMultiDof(self.cartpole, 1, p.POSITION_CONTROL, targetPosition=[0, 0, 0, 1],
@@ -157,15 +68,9 @@ class CartPolePPNovel2(CartPoleBulletEnv):
         pole_ori = list(randstate[3:5]) + [0]
         p.resetJointStateMultiDof(self.cartpole, 1, targetValue=pole_pos, targetVelocity=pole_ori)
 
-        # Delete old blocks
-        for i in self.blocks:
-            p.removeBody(i)
-
-        # Load blocks in
+        # Load or remove only the blocks that differ in count from the last episode
         self.nb_blocks = self.np_random.randint(3) + 2
-        self.blocks = [None] * self.nb_blocks
-        for i in range(self.nb_blocks):
-            self.blocks[i] = p.loadURDF(os.path.join(self.path, 'models', 'n2', 'block.urdf'))
+        self.reset_blocks()
 
         # Change block params
         for i in self.blocks:
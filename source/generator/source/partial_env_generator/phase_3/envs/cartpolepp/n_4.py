@@ -18,6 +18,11 @@ class CartPolePPNovel4(CartPoleBulletEnv):
         self.difficulty = difficulty
 
         self.rest = 1.0
+        self.sample_params()
+
+        return None
+
+    def sample_params(self):
         if self.difficulty == 'easy':
             # Between 1.05 and 1.15
             self.rest = 1.05 + self.np_random.random() / 10
@@ -28,6 +33,11 @@ class CartPolePPNovel4(CartPoleBulletEnv):
             # Between 1.35 and 1.45
             self.rest = 1.35 + self.np_random.random() / 10
 
+        # Walls of a warm world keep the restitution they were loaded with otherwise
+        if self._physics_client_id >= 0:
+            for joint_nb in range(-1, 6):
+                self._p.changeDynamics(self.walls, joint_nb, restitution=self.rest)
+
         return None
 
     # Used to generate the initial world state
@@ -62,9 +72,10 @@ class CartPolePPNovel4(CartPoleBulletEnv):
         p.setRealTimeSimulation(0)
 
         # Load world objects
-        self.cartpole = p.loadURDF(os.path.join(self.path, 'models', 'ground_cart.urdf'))
-        self.walls = p.loadURDF(os.path.join(self.path, 'models', 'walls.urdf'))
-        self.origin = p.loadURDF(os.path.join(self.path, 'models', 'origin.urdf'))
+        self.rest_states = dict()
+        self.cartpole = self.load_urdf(self.cartpole_path)
+        self.walls = self.load_urdf(os.path.join(self.path, 'models', 'walls.urdf'))
+        self.origin = self.load_urdf(os.path.join(self.path, 'models', 'origin.urdf'))
 
         # Set walls to be bouncy
         for joint_nb in range(-1, 6):
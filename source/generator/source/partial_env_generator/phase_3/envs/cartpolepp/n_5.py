@@ -36,7 +36,7 @@ class CartPolePPNovel5(CartPoleBulletEnv):
             action = 4
 
         # Adjust forces so they always apply in reference to world frame
-        _, ori, _, _, _, _ = p.getLinkState(self.cartpole, 0)
+        ori = self.read_state()[self.CART, self.ORIENTATION].tolist()
         cart_angle = p.getEulerFromQuaternion(ori)[2] # yaw
         fx = self.force_mag * np.cos(cart_angle)
         fy = self.force_mag * np.sin(cart_angle) * -1
@@ -93,7 +93,7 @@ class CartPolePPNovel5(CartPoleBulletEnv):
                 p.applyExternalForce(i, -1, (u1[0], u1[1], -u1[2]), (0, 0, 0), p.LINK_FRAME)
 
 
-        p.stepSimulation()
+        self.step_simulation()
 
         done = self.is_done()
         reward = self.get_reward()
@@ -16,6 +16,7 @@ class CartPole(CartPoleBulletEnv):
             self.file_name = 'cartpole_hard.urdf'
         else:
             self.file_name = 'cartpole.urdf'
+        self.cartpole_path = os.path.join(self.path, 'models/p/', self.file_name)
 
         return None
 
@@ -23,12 +24,8 @@ class CartPole(CartPoleBulletEnv):
         # Reset world (assume is created)
         p = self._p
 
-        # Delete cartpole
-        if self.cartpole == -10:
-            self.cartpole = p.loadURDF(os.path.join(self.path, 'models/p/', self.file_name))
-        else:
-            p.removeBody(self.cartpole)
-            self.cartpole = p.loadURDF(os.path.join(self.path, 'models/p/', self.file_name))
+        # The cartpole is only loaded once, then put back to rest
+        self.reset_cartpole()
 
         # Set cart to have no friction
         p.changeDynamics(self.cartpole, -1, linearDamping=0, angularDamping=0)
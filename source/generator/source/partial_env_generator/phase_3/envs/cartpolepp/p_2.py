@@ -10,6 +10,11 @@ class CartPole(CartPoleBulletEnv):
 
         self.difficulty = difficulty
 
+        self.sample_params()
+
+        return None
+
+    def sample_params(self):
         if self.difficulty == 'medium':
             zones = 20
             self.friction_zones = self.np_random.uniform(low=0.0125, high=0.1, size=(zones,))
@@ -52,7 +57,7 @@ class CartPole(CartPoleBulletEnv):
 
         p.applyExternalForce(self.cartpole, 0, (fx, 0.0, 0.0), (0, 0, 0), p.LINK_FRAME)
 
-        p.stepSimulation()
+        self.step_simulation()
 
         done = self.is_done()
         reward = self.get_reward()
@@ -65,12 +70,8 @@ class CartPole(CartPoleBulletEnv):
         # Reset world (assume is created)
         p = self._p
 
-        # Delete cartpole
-        if self.cartpole == -10:
-            self.cartpole = p.loadURDF(os.path.join(self.path, 'models/p/', 'cartpole.urdf'))
-        else:
-            p.removeBody(self.cartpole)
-            self.cartpole = p.loadURDF(os.path.join(self.path, 'models/p/', 'cartpole.urdf'))
+        # The cartpole is only loaded once, then put back to rest
+        self.reset_cartpole()
 
         # Set cart to have no friction
         if self.difficulty == 'easy':
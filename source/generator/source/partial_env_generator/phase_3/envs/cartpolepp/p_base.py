@@ -55,6 +55,7 @@ class CartPoleBulletEnv(CartPoleBulletEnv):
         # Object definitions
         self.cartpole = -10
         self.state = None
+        self.cartpole_path = os.path.join(self.path, 'models/p/', 'cartpole.urdf')
 
         if self._discrete_actions:
             self.action_space = spaces.Discrete(5)
@@ -70,6 +71,12 @@ class CartPoleBulletEnv(CartPoleBulletEnv):
 
         return None
 
+    # Phase one environments are never seeded or configured, keep it that way when reused
+    def reseed(self, seed, config=None):
+        self.seed()
+        self.sample_params()
+        return None
+
     def step(self, action):
         p = self._p
 
@@ -93,7 +100,7 @@ class CartPoleBulletEnv(CartPoleBulletEnv):
 
         p.applyExternalForce(self.cartpole, 0, (fx, 0.0, 0.0), (0, 0, 0), p.LINK_FRAME)
 
-        p.stepSimulation()
+        self.step_simulation()
 
         done = self.is_done()
         reward = self.get_reward()
@@ -104,11 +111,11 @@ class CartPoleBulletEnv(CartPoleBulletEnv):
 
     # Check if is done
     def is_done(self):
-        state = self.get_state()
+        state = self.read_state()
 
-        if abs(state['cart']['x_position']) > self.x_threshold:
+        if abs(state[self.CART, 0]) > self.x_threshold:
             return True
-        if abs(state['pole']['y_quaternion']) > self.theta_threshold_radians:
+        if abs(state[self.POLE, 4]) > self.theta_threshold_radians:
             return True
 
         return False
@@ -134,7 +141,8 @@ class CartPoleBulletEnv(CartPoleBulletEnv):
         p.setRealTimeSimulation(0)
 
         # Load world objects
-        self.cartpole = p.loadURDF(os.path.join(self.path, 'models/p/', 'cartpole.urdf'))
+        self.rest_states = dict()
+        self.cartpole = self.load_urdf(self.cartpole_path)
 
         return None
 
@@ -142,12 +150,8 @@ class CartPoleBulletEnv(CartPoleBulletEnv):
         # Reset world (assume is created)
         p = self._p
 
-        # Delete cartpole
-        if self.cartpole == -10:
-            self.cartpole = p.loadURDF(os.path.join(self.path, 'models/p/', 'cartpole.urdf'))
-        else:
-            p.removeBody(self.cartpole)
-            self.cartpole = p.loadURDF(os.path.join(self.path, 'models/p/', 'cartpole.urdf'))
+        # The cartpole is only loaded once, then put back to rest
+        self.reset_cartpole()
 
         # Set cart to have no friction
         p.changeDynamics(self.cartpole, -1, linearDamping=0, angularDamping=0)
@@ -166,50 +170,28 @@ class CartPoleBulletEnv(CartPoleBulletEnv):
 
         return None
 
-    # Unified function for getting state information
-    def get_state(self, initial=False):
+    # Joint values theta, theta_dot, x, x_dot the state is built from
+    def read_joints(self):
         p = self._p
-        world_state = dict()
-        round_amount = 6
+        return p.getJointState(self.cartpole, 1)[0:2] + p.getJointState(self.cartpole, 0)[0:2]
 
-        # Get cart info ============================================
-        state = dict()
+    # Same rows as the 3d cartpole, the cart moves along x and the pole turns about y
+    def read_state(self):
+        if self.state_array is None:
+            self.state = self.read_joints()
+            theta, theta_dot, x, x_dot = self.state
 
-        # Handle pos, ori
-        self.state = p.getJointState(self.cartpole, 1)[0:2] + p.getJointState(self.cartpole, 0)[0:2]
-        theta, theta_dot, x, x_dot = self.state
-        state['x_position'] = round(x, round_amount)
-        state['y_position'] = round(0.0, round_amount)
-        state['z_position'] = round(0.0, round_amount)
-
-        # Handle velocity
-        state['x_velocity'] = round(x_dot, round_amount)
-        state['y_velocity'] = round(0.0, round_amount)
-        state['z_velocity'] = round(0.0, round_amount)
-
-        world_state['cart'] = state
-        
-        # Get pole info =============================================
-        #quat = self.eulerToQuaternion(theta, 0, 0)
-        # Pole angle along x is a rotation about the y axis (Euler pitch)
-        quat = p.getQuaternionFromEuler([0, theta, 0])
-
-        state = dict()
-        #state['x_quaternion'] = round(quat[1], round_amount)
-        #state['y_quaternion'] = round(quat[0], round_amount)
-        state['x_quaternion'] = round(quat[0], round_amount)
-        state['y_quaternion'] = round(quat[1], round_amount)
-        state['z_quaternion'] = round(quat[2], round_amount)
-        state['w_quaternion'] = round(quat[3], round_amount)
-
-        # Velocity
-        #state['x_velocity'] = round(theta_dot, round_amount)
-        #state['y_velocity'] = round(0.0, round_amount)
-        state['x_velocity'] = round(0.0, round_amount)
-        state['y_velocity'] = round(theta_dot, round_amount)
-        state['z_velocity'] = round(0.0, round_amount)
-
-        world_state['pole'] = state
+            # Pole angle along x is a rotation about the y axis (Euler pitch)
+            quat = self._p.getQuaternionFromEuler([0, theta, 0])
+
+            self.state_array = np.array([[x, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0, x_dot, 0.0, 0.0],
+                                         [0.0, 0.0, 0.0] + list(quat) + [0.0, theta_dot, 0.0]],
+                                        dtype=np.float64)
+        return self.state_array
+
+    # Unified function for getting state information
+    def get_state(self, initial=False):
+        world_state = super().get_state(initial=initial)
 
         # get block info ====================================
         block_state = list()
@@ -229,19 +211,4 @@ class CartPoleBulletEnv(CartPoleBulletEnv):
 
         world_state['blocks'] = block_state
 
-        # Not needed for phase one but for compatability
-        if initial:
-            state = list()
-            state.append([-5, -5, 0])
-            state.append([5, -5, 0])
-            state.append([5, 5, 0])
-            state.append([-5, 5, 0])
-
-            state.append([-5, -5, 10])
-            state.append([5, -5, 10])
-            state.append([5, 5, 10])
-            state.append([-5, 5, 10])
-
-            world_state['walls'] = state
-
         return world_state
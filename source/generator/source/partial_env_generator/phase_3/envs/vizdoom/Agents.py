@@ -4,12 +4,15 @@ import numpy as np
 
 class Agents:
 
-    def __init__(self, level, difficulty, mock):
+    def __init__(self, level, difficulty, mock, seed=None):
         # level and novelty selections
         self.level = level
         self.difficulty = difficulty
         self.mock = mock
 
+        # Own random stream, several games may share this process
+        self.random = random.Random(seed)
+
         # Set looking bounds (vision cone)
         self.left_side = 7 / 8 * np.pi
         self.right_side = np.pi / 8
@@ -83,7 +86,7 @@ class Agents:
             commands = []
             # Random behavoiur:
             for ind in range(4):
-                action = random.choice(list(range(7))) + 1
+                action = self.random.choice(list(range(7))) + 1
                 commands.append("set ai_" + str(ind + 1) + " " + str(action))
 
         # Enemies always check for facing to see if shoot
@@ -103,7 +106,7 @@ class Agents:
 
             if angle < self.right_side:
                 # Forward, left, right, shoot?
-                action = random.choice([1, 3, 4, 7])
+                action = self.random.choice([1, 3, 4, 7])
             else:
                 if sign == -1.0:
                     # Turn right
@@ -140,7 +143,7 @@ class Agents:
             # If enemy is face towards player turn away
             if angle > self.left_side:
                 # Forward, left, right, shoot?
-                action = random.choice([1, 3, 4, 7])
+                action = self.random.choice([1, 3, 4, 7])
             else:
                 if sign == 1.0:
                     # Turn right
@@ -195,7 +198,7 @@ class Agents:
 
             if angle < self.right_side:
                 # Forward, left, right, shoot?
-                action = random.choice([1, 3, 4])
+                action = self.random.choice([1, 3, 4])
             else:
                 if sign == -1.0:
                     # Turn right
@@ -253,7 +256,7 @@ class Agents:
 
         else:
             if self.hunt_tick is None:
-                r = random.random()
+                r = self.random.random()
                 if self.difficulty == 'easy':
                     r = 10
                 elif self.difficulty == 'medium':
@@ -281,7 +284,7 @@ class Agents:
             angle, sign = self.get_angle(state['player'], val)
 
             if angle < self.right_side:
-                if random.random() > 0.5:
+                if self.random.random() > 0.5:
                     # Shoot is action = 7
                     commands[self.id_to_cvar[val['id']] - 1] = "set ai_" + str(self.id_to_cvar[val['id']]) + " " + str(7)
 
@@ -323,7 +326,7 @@ class Agents:
 
                 check_dist = min(self.last_dist[ind][ind2], dist)
                 if check_dist < (30 + dist/20) and angle < np.pi / 2:
-                    action = random.choice([1, 2, 3, 4])
+                    action = self.random.choice([1, 2, 3, 4])
                     commands[self.id_to_cvar[val['id']] - 1] = "set ai_" + str(self.id_to_cvar[val['id']]) + " " + str(action)
 
                 self.last_dist[ind][ind2] = dist
@@ -349,7 +352,7 @@ class Agents:
         # If its buggy throw random value out
         #TODO: Figure out why an enemy is in the exact same pos as player
         if np.linalg.norm(np.asarray([pl_x - en_x, pl_y - en_y])) == 0:
-            return random.random() * 3.14, 1
+            return self.random.random() * 3.14, 1
 
         enemy_face_vector = np.asarray([pl_x - en_x, pl_y - en_y]) / np.linalg.norm(
             np.asarray([pl_x - en_x, pl_y - en_y]))
@@ -1,7 +1,6 @@
 import os
 import copy
 import time
-import random
 
 import numpy as np
 import vizdoom as vzd
@@ -70,7 +69,7 @@ class SailonViz:
             self.bucket_vals = np.arange(-512, 512, step=1023.9 / buckets)
 
         # Decide on agent behvoiur here
-        self.Agents = Agents(self.level, self.difficulty, self.use_mock)
+        self.Agents = Agents(self.level, self.difficulty, self.use_mock, self.seed)
 
         # Make and load game parameters here
         game = vzd.DoomGame()
@@ -121,9 +120,9 @@ class SailonViz:
         # Enables information about all sectors (map layout).
         game.set_sectors_info_enabled(True)
 
-        # Set seed here
-        random.seed(self.seed)
-        np.random.seed(self.seed)
+        # Set seed here, the random streams are kept per game as several games may share this
+        # process
+        self.np_random = np.random.RandomState(self.seed)
         game.set_seed(self.seed)
 
         # Call this at the end since no more changes can be made after
@@ -132,6 +131,23 @@ class SailonViz:
 
         return None
 
+    # Used to prepare a warm game for another episode instead of initializing a new one
+    def reseed(self, seed):
+        self.seed = seed
+
+        # Fresh agent behaviour, as a new instance would have
+        self.Agents = Agents(self.level, self.difficulty, self.use_mock, self.seed)
+
+        # Set seed here, the game seed is set again in reset()
+        self.np_random = np.random.RandomState(self.seed)
+        self.game.set_seed(self.seed)
+
+        return None
+
+    def close(self):
+        self.game.close()
+        return None
+
     def step(self, action):
         # Decode action
         action = self.actions[action]
@@ -47,6 +47,30 @@ class TestHandler:
 
         return None
 
+    # Start a new episode on the environment that is already loaded
+    def restart(self, seed: int = 123, trial_novelty: int = 0, day_offset: int = 0,
+                ta2_generator_config: dict = None, hint_level: int = -1):
+        self.seed = seed
+        self.trial_novelty = trial_novelty
+        self.day_offset = day_offset
+        self.ta2_generator_config = copy.deepcopy(ta2_generator_config)
+        self.hint_level = hint_level
+
+        self.test.restart(seed=self.seed,
+                          trial_novelty=self.trial_novelty,
+                          day_offset=self.day_offset,
+                          ta2_generator_config=self.ta2_generator_config,
+                          hint_level=self.hint_level)
+
+        # Get first information
+        self.information = self.test.get_state()
+
+        return None
+
+    def close(self):
+        self.test.close()
+        return None
+
     def apply_action(self, action):
         action = action['action']
         self.test.act(action)
@@ -7,7 +7,6 @@ import zlib
 import os.path
 
 import numpy as np
-from base64 import b64encode
 import blosc
 
 from .hints import Selector
@@ -102,6 +101,52 @@ class TestLoader:
 
         return
 
+    # Start another episode on the loaded env with new episode params, only cartpole and
+    # vizdoom can be reused this way.
+    def restart(self, seed: int = 0, trial_novelty: int = 0, day_offset: int = 0,
+                ta2_generator_config: dict = None, hint_level: int = -1):
+        if self.domain not in ['cartpole', 'vizdoom']:
+            raise ValueError('Domain: ' + self.domain + ', can not be restarted!')
+
+        self.seed = seed
+        self.trial_novelty = trial_novelty
+        self.day_offset = day_offset
+        self.ta2_generator_config = copy.deepcopy(ta2_generator_config)
+        self.hint_level = hint_level
+
+        # Set the custom seed if provided.
+        if self.ta2_generator_config is not None:
+            if 'episode_seed' in self.ta2_generator_config:
+                if self.ta2_generator_config['episode_seed'] is not None:
+                    self.seed = self.ta2_generator_config['episode_seed']
+
+        # Convert trial level to nums
+        self.trial = int(str(self.trial_novelty)[-1])
+
+        # Get hint here
+        self.hint = Selector().get_hint(domain=self.domain,
+                                        novelty_level=self.novelty_level,
+                                        hint_level=self.hint_level)
+
+        # Re-seed the env and set the internal reward as load_test() does
+        if self.domain == 'cartpole':
+            self.env.reseed(self.seed, self.ta2_generator_config)
+            self.reward = 0.0
+        elif self.domain == 'vizdoom':
+            self.env.reseed(self.seed)
+            self.reward = 2000.0
+
+        # Start episode
+        self.begin()
+
+        return None
+
+    def close(self):
+        if self.domain == 'vizdoom':
+            self.env.close()
+        self.env = None
+        return None
+
     def load_test(self):
         # Filter by domain
         if self.domain == 'cartpole':
@@ -268,10 +313,10 @@ class TestLoader:
                              'action_list': self.actions,
                              'action': self.env.last_label}
 
-        # Compress image if not None
+        # Compress image if not None, the raw bytes are sent as-is over a binary frame or
+        # base64 encoded by the objects library for plain JSON.
         if self.response['sensors']['image'] is not None:
-            comp_img = blosc.pack_array(self.response['sensors']['image'])
-            self.response['sensors']['image'] = b64encode(comp_img).decode('ascii')
+            self.response['sensors']['image'] = blosc.pack_array(self.response['sensors']['image'])
 
         if not self.hint_sent:
             self.hint_sent = True
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+import logging
+import unittest
+
+import environment_workers
+from objects import objects
+
+
+FRAME_SIZE = 1024
+
+
+class StubTestHandler(object):
+    """Renders a frame of image_size bytes filled with the seed, without an environment."""
+    def __init__(self, seed: int, image_size: int):
+        self.seed = seed
+        self.image_size = image_size
+        self.steps = 0
+        return
+
+    def get_feature_vector(self) -> dict:
+        return dict({'steps': self.steps,
+                     'image': bytes([self.seed % 256]) * (self.image_size + self.steps)})
+
+    def get_feature_label(self) -> dict:
+        return dict({'seed': self.seed})
+
+    def apply_action(self, action: dict) -> float:
+        self.steps += 1
+        return 1.0
+
+    def is_episode_done(self) -> bool:
+        return False
+
+
+def build_stub_handler(domain: str, novelty: int, difficulty: str, seed: int,
+                       trial_novelty: int, day_offset: int, use_image: bool,
+                       ta2_generator_config: dict, hint_level: int, phase: str):
+    return StubTestHandler(seed=seed, image_size=ta2_generator_config['image_size'])
+
+
+class TestEnvironmentWorkerPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = environment_workers.EnvironmentWorkerPool(log=logging.getLogger(__name__),
+                                                              processes=1,
+                                                              max_environments=2,
+                                                              frame_size=FRAME_SIZE,
+                                                              warm_pool_size=0,
+                                                              idle_function=lambda: None,
+                                                              build_function=build_stub_handler)
+        self.pool.start()
+        return
+
+    def tearDown(self):
+        self.pool.stop()
+        return
+
+    @staticmethod
+    def start_kwargs(seed: int = 1, image_size: int = 100) -> dict:
+        return dict({'domain': 'cartpole',
+                     'novelty': 200,
+                     'difficulty': 'easy',
+                     'seed': seed,
+                     'trial_novelty': 200,
+                     'day_offset': 0,
+                     'use_image': True,
+                     'ta2_generator_config': dict({'image_size': image_size}),
+                     'hint_level': -1,
+                     'phase': objects.PHASE_3})
+
+    def observe(self, test_handler: environment_workers.RemoteTestHandler) -> tuple:
+        # The raw reply, to see whether the frame came back in the slot or through the pipe.
+        return self.pool.call(worker=test_handler.worker,
+                              env_id=test_handler.env_id,
+                              name='observe',
+                              kwargs=dict({'slot': test_handler.slot}))
+
+    def test_frames_round_trip_through_their_slots(self):
+        first = self.pool.start_environment(**self.start_kwargs(seed=7))
+        second = self.pool.start_environment(**self.start_kwargs(seed=9))
+        self.assertNotEqual(first.slot, second.slot)
+
+        for i in range(3):
+            first_vector = first.get_feature_vector()
+            second_vector = second.get_feature_vector()
+            self.assertEqual(first_vector['image'], bytes([7]) * (100 + i))
+            self.assertEqual(second_vector['image'], bytes([9]) * (100 + i))
+            self.assertEqual(first_vector['steps'], i)
+            self.assertEqual(first.get_feature_label(), dict({'seed': 7}))
+            first.apply_action(dict({'action': 'left'}))
+            second.apply_action(dict({'action': 'left'}))
+
+        first.close()
+        second.close()
+        return
+
+    def test_frame_larger_than_its_slot_comes_through_the_pipe(self):
+        test_handler = self.pool.start_environment(**self.start_kwargs(seed=3,
+                                                                       image_size=FRAME_SIZE))
+        # Exactly frame_size still fits the slot.
+        feature_vector, feature_label, frame_length = self.observe(test_handler)
+        self.assertIsNone(feature_vector['image'])
+        self.assertEqual(frame_length, FRAME_SIZE)
+        self.assertEqual(test_handler.get_feature_vector()['image'], bytes([3]) * FRAME_SIZE)
+
+        test_handler.apply_action(dict({'action': 'left'}))
+        feature_vector, feature_label, frame_length = self.observe(test_handler)
+        self.assertIsNone(frame_length)
+        self.assertEqual(feature_vector['image'], bytes([3]) * (FRAME_SIZE + 1))
+        self.assertEqual(test_handler.get_feature_vector()['image'],
+                         bytes([3]) * (FRAME_SIZE + 1))
+        test_handler.close()
+        return
+
+    def test_start_environment_after_worker_dies(self):
+        test_handler = self.pool.start_environment(**self.start_kwargs())
+        dead_worker = test_handler.worker
+        dead_worker.process.terminate()
+        dead_worker.process.join(timeout=5.0)
+
+        test_handler = self.pool.start_environment(**self.start_kwargs())
+        self.assertNotIn(dead_worker, self.pool.workers)
+        self.assertTrue(test_handler.worker.process.is_alive())
+        self.assertEqual(test_handler.worker.environments, 1)
+        test_handler.close()
+        self.assertEqual(test_handler.worker.environments, 0)
+        return
+
+    def test_call_on_dead_worker_replaces_it(self):
+        test_handler = self.pool.start_environment(**self.start_kwargs())
+        dead_worker = test_handler.worker
+        dead_worker.process.terminate()
+        dead_worker.process.join(timeout=5.0)
+
+        with self.assertRaises(objects.AiqExperimentException):
+            test_handler.apply_action(dict({'action': 'left'}))
+        self.assertNotIn(dead_worker, self.pool.workers)
+        # Closing a handler of the dead worker is a no-op.
+        test_handler.close()
+
+        test_handler = self.pool.start_environment(**self.start_kwargs())
+        self.assertTrue(test_handler.worker.process.is_alive())
+        test_handler.close()
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
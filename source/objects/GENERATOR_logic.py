@@ -23,6 +23,7 @@
 import configparser
 import datetime
 import copy
+import functools
 import json
 import logging
 import logging.handlers
@@ -39,7 +40,33 @@ from . import rabbitmq
 from . import objects
 
 
+class GeneratorEnvironment(object):
+    """One hosted episode and the private RPC queue its TA1 talks to."""
+    def __init__(self, private_queue: str, request: objects.StartGenerator):
+        self.private_queue = private_queue
+        self.novelty = request.novelty
+        self.difficulty = request.difficulty
+        self.seed = request.seed
+        self.trial_novelty = request.trial_novelty
+        self.day_offset = request.day_offset
+        self.use_image = request.use_image
+        self.request_timeout = request.request_timeout
+        self.ta2_generator_config = request.generator_config
+        self.hint_level = request.hint_level
+        self.phase = request.phase
+        self.is_episode_done = False
+        self.GENERATOR = None
+        self.timeout_callback_id = None
+        return
+
+
 class GeneratorLogic(object):
+    # The client functions work on these attributes of self, they are swapped in and out for the
+    # environment being served.  Subclasses keeping more per-episode state can extend the list.
+    ENVIRONMENT_ATTRIBUTES = list(['novelty', 'difficulty', 'seed', 'trial_novelty', 'day_offset',
+                                   'use_image', 'request_timeout', 'ta2_generator_config',
+                                   'hint_level', 'phase', 'is_episode_done', 'GENERATOR'])
+
     def __init__(self, config_file: str, printout: bool, debug: bool, fulldebug: bool,
                  logfile: str, domain: str):
         self.agent_name = 'Generator'
@@ -90,6 +117,11 @@ class GeneratorLogic(object):
         self.amqp_vhost = self.config.get("amqp", "vhost")
         self.amqp_port = self.config.getint("amqp", "port")
         self.amqp_ssl = self.config.getboolean("amqp", "ssl")
+        self.amqp_binary = self.config.getboolean("amqp", "binary_transport")
+        self.amqp_codec = self.config.get("amqp", "wire_codec")
+        objects.set_zero_copy(self.config.getboolean("amqp", "zero_copy"))
+        # How many episodes this process serves at the same time.
+        self.max_environments = max(1, self.config.getint('sail-on', 'max_environments'))
 
         self.keyboard_ended = False
 
@@ -109,6 +141,11 @@ class GeneratorLogic(object):
 
         self.GENERATOR = None
 
+        # [private_queue] = GeneratorEnvironment
+        self._environments = dict()
+        self._active_environment = None
+        self._is_generator_queue_subscribed = False
+
         self.domain = self.config.get('sail-on', 'domain')
         if domain is not None:
             self.domain = domain
@@ -123,9 +160,10 @@ class GeneratorLogic(object):
                                         amqp_host=self.amqp_host,
                                         amqp_port=self.amqp_port,
                                         amqp_vhost=self.amqp_vhost,
-                                        amqp_ssl=self.amqp_ssl)
+                                        amqp_ssl=self.amqp_ssl,
+                                        binary_transport=self.amqp_binary,
+                                        wire_codec=self.amqp_codec)
 
-        self._timeout_callback_id = None
         self._subscribe_generator_queue()
         return
 
@@ -135,6 +173,10 @@ class GeneratorLogic(object):
         # Details for SAIL-ON experiments.
         config.add_section('sail-on')
         config.set('sail-on', 'domain', 'domain')
+        config.set('sail-on', 'max_environments', '1')
+        config.set('sail-on', 'worker_processes', '0')
+        config.set('sail-on', 'frame_buffer_bytes', '4194304')
+        config.set('sail-on', 'warm_pool_size', '2')
         # The RabbitMQ authentication information.
         config.add_section('amqp')
         config.set("amqp", "user", "username")
@@ -143,10 +185,16 @@ class GeneratorLogic(object):
         config.set("amqp", "vhost", "/")
         config.set("amqp", "port", "5671")
         config.set("amqp", "ssl", "True")
+        config.set("amqp", "binary_transport", "False")
+        config.set("amqp", "wire_codec", objects.WIRE_CODEC_JSON)
+        config.set("amqp", "zero_copy", "False")
         return config
 
     def _subscribe_generator_queue(self):
         self.log.debug('_subscribe_generator_queue()')
+        if self._is_generator_queue_subscribed:
+            return
+        self._is_generator_queue_subscribed = True
         self.amqp.setup_subscribe_to_queue(
             queue_name=objects.LIVE_GENERATOR_QUEUES[self.domain],
             queue_durable=True,
@@ -168,54 +216,106 @@ class GeneratorLogic(object):
         return
 
     def _unsubscribe_generator_queue(self):
-        self.log.debug('_subscribe_generator_queue()')
+        self.log.debug('_unsubscribe_generator_queue()')
+        if not self._is_generator_queue_subscribed:
+            return
+        self._is_generator_queue_subscribed = False
         self.amqp.remove_subscribe_to_queue(
             queue_name=objects.LIVE_GENERATOR_QUEUES[self.domain])
         self.amqp.remove_subscribe_to_queue(
             queue_name=objects.NOVELTY_DESC_RPC_QUEUE)
         return
 
-    def _subscribe_private_queue(self):
-        self.log.debug('_subscribe_private_queue()')
-        if self._private_queue is None:
-            self._private_queue = '{}.{}'.format(objects.GENERATOR_RPC_QUEUE,
-                                                 str(uuid.uuid4().hex))
-            self.amqp.setup_subscribe_to_queue(
-                queue_name=self._private_queue,
-                queue_exclusive=True,
-                queue_auto_delete=True,
-                casas_events=True,
-                callback_function=self.on_data_request,
-                callback_full_params=True)
+    def _subscribe_private_queue(self, environment: GeneratorEnvironment):
+        self.log.debug('_subscribe_private_queue({})'.format(environment.private_queue))
+        self.amqp.setup_subscribe_to_queue(
+            queue_name=environment.private_queue,
+            queue_exclusive=True,
+            queue_auto_delete=True,
+            casas_events=True,
+            callback_function=functools.partial(self._on_environment_request,
+                                                environment.private_queue),
+            callback_full_params=True)
         return
 
-    def _unsubscribe_private_queue(self):
-        self.log.debug('_unsubscribe_private_queue()')
-        if self._private_queue is not None:
-            self.amqp.remove_subscribe_to_queue(
-                queue_name=self._private_queue)
-            self._private_queue = None
+    def _unsubscribe_private_queue(self, environment: GeneratorEnvironment):
+        self.log.debug('_unsubscribe_private_queue({})'.format(environment.private_queue))
+        self.amqp.remove_subscribe_to_queue(
+            queue_name=environment.private_queue)
         return
 
-    def _reset_timeout(self):
-        self.log.debug('_reset_timeout()')
-        if self._timeout_callback_id is not None:
-            self.amqp.cancel_call_later(timeout_id=self._timeout_callback_id)
-        self._timeout_callback_id = self.amqp.call_later(
-            seconds=self.request_timeout,
-            function=self._reset_system)
+    def _enter_environment(self, environment: GeneratorEnvironment) -> dict:
+        # Point self at the environment and hand back what it pointed at before, so a callback
+        # dispatched while another environment is being served leaves that one untouched.
+        saved = dict({'_active_environment': self._active_environment,
+                      '_private_queue': self._private_queue})
+        for name in self.ENVIRONMENT_ATTRIBUTES:
+            saved[name] = getattr(self, name)
+            setattr(self, name, getattr(environment, name))
+        self._active_environment = environment
+        self._private_queue = environment.private_queue
+        return saved
+
+    def _leave_environment(self, environment: GeneratorEnvironment, saved: dict):
+        # An environment reset while it was being served is gone, nothing is written back to it.
+        write_back = environment.private_queue in self._environments
+        for name in self.ENVIRONMENT_ATTRIBUTES:
+            if write_back:
+                setattr(environment, name, getattr(self, name))
+            setattr(self, name, saved[name])
+        self._active_environment = saved['_active_environment']
+        self._private_queue = saved['_private_queue']
         return
 
-    def _reset_system(self):
-        self.log.debug('_reset_system()')
-        self._unsubscribe_private_queue()
-        self._subscribe_generator_queue()
+    def _reset_timeout(self, environment: GeneratorEnvironment = None):
+        if environment is None:
+            environment = self._active_environment
+        self.log.debug('_reset_timeout({})'.format(environment.private_queue))
+        if environment.timeout_callback_id is not None:
+            self.amqp.cancel_call_later(timeout_id=environment.timeout_callback_id)
+        environment.timeout_callback_id = self.amqp.call_later(
+            seconds=environment.request_timeout,
+            function=functools.partial(self._reset_system, environment))
+        return
 
-        self.cleanup_generator()
+    def _reset_system(self, environment: GeneratorEnvironment = None):
+        if environment is None:
+            environment = self._active_environment
+        self.log.debug('_reset_system({})'.format(environment.private_queue))
+        if environment.private_queue not in self._environments:
+            return
+        del self._environments[environment.private_queue]
+        self._unsubscribe_private_queue(environment=environment)
+
+        if environment.timeout_callback_id is not None:
+            self.amqp.cancel_call_later(timeout_id=environment.timeout_callback_id)
+        environment.timeout_callback_id = None
+
+        if environment is self._active_environment:
+            # Reset from a request of this environment, self already points at it.
+            self.cleanup_generator()
+        else:
+            saved = self._enter_environment(environment=environment)
+            try:
+                self.cleanup_generator()
+            finally:
+                self._leave_environment(environment=environment, saved=saved)
+        environment.GENERATOR = None
+
+        # There is room for another episode again.
+        self._subscribe_generator_queue()
+        return
 
-        if self._timeout_callback_id is not None:
-            self.amqp.cancel_call_later(timeout_id=self._timeout_callback_id)
-        self._timeout_callback_id = None
+    def _on_environment_request(self, private_queue, ch, method, props, body, request):
+        if private_queue not in self._environments:
+            self.log.warning('Request for an environment that is gone: {}'.format(private_queue))
+            return
+        environment = self._environments[private_queue]
+        saved = self._enter_environment(environment=environment)
+        try:
+            self.on_data_request(ch, method, props, body, request)
+        finally:
+            self._leave_environment(environment=environment, saved=saved)
         return
 
     def on_novelty_description_request(self, ch, method, props, body, request):
@@ -233,8 +333,6 @@ class GeneratorLogic(object):
                 self.amqp.publish_to_queue(queue_name=props.reply_to,
                                            casas_object=response,
                                            correlation_id=props.correlation_id)
-
-                self._reset_timeout()
         return
 
     def on_generator_request(self, ch, method, props, body, request):
@@ -243,42 +341,48 @@ class GeneratorLogic(object):
         response = None
 
         if isinstance(request, objects.StartGenerator):
-            self.novelty = request.novelty
-            self.difficulty = request.difficulty
-            self.seed = request.seed
-            self.trial_novelty = request.trial_novelty
-            self.day_offset = request.day_offset
-            self.use_image = request.use_image
-            self.request_timeout = request.request_timeout
-            self.ta2_generator_config = request.generator_config
-            self.hint_level = request.hint_level
-            self.phase = request.phase
-
-            self.initilize_generator(domain=self.domain,
-                                     novelty=self.novelty,
-                                     difficulty=self.difficulty,
-                                     seed=self.seed,
-                                     trial_novelty=self.trial_novelty,
-                                     day_offset=self.day_offset,
-                                     use_image=self.use_image,
-                                     ta2_generator_config=self.ta2_generator_config,
-                                     hint_level=self.hint_level,
-                                     phase=self.phase)
-            self._unsubscribe_generator_queue()
-            self._subscribe_private_queue()
-
-            response = objects.GeneratorResponse(generator_rpc_queue=self._private_queue)
+            environment = GeneratorEnvironment(
+                private_queue='{}.{}'.format(objects.GENERATOR_RPC_QUEUE, str(uuid.uuid4().hex)),
+                request=request)
+            # Registered up front so the slot is held while the generator initializes.
+            self._environments[environment.private_queue] = environment
+
+            try:
+                saved = self._enter_environment(environment=environment)
+                try:
+                    self.initilize_generator(domain=self.domain,
+                                             novelty=self.novelty,
+                                             difficulty=self.difficulty,
+                                             seed=self.seed,
+                                             trial_novelty=self.trial_novelty,
+                                             day_offset=self.day_offset,
+                                             use_image=self.use_image,
+                                             ta2_generator_config=self.ta2_generator_config,
+                                             hint_level=self.hint_level,
+                                             phase=self.phase)
+                finally:
+                    self._leave_environment(environment=environment, saved=saved)
+            except Exception:
+                # Give the slot back, the environment never got a queue or a timeout.
+                self._reset_system(environment=environment)
+                raise
+            # Stop taking new episodes once every environment slot is in use.
+            if len(self._environments) >= self.max_environments:
+                self._unsubscribe_generator_queue()
+            self._subscribe_private_queue(environment=environment)
+
+            response = objects.GeneratorResponse(generator_rpc_queue=environment.private_queue)
 
             if props.reply_to is not None:
                 self.amqp.publish_to_queue(queue_name=props.reply_to,
                                            casas_object=response,
                                            correlation_id=props.correlation_id)
 
-                self._reset_timeout()
+                self._reset_timeout(environment=environment)
         return
 
     def on_data_request(self, ch, method, props, body, request):
-        self.log.debug('on_data_request( {} )'.format(str(request)))
+        self.log.debug('on_data_request( %s )', rabbitmq.LogSummary(request))
         response = None
 
         if isinstance(request, objects.RequestData):
@@ -306,7 +410,8 @@ class GeneratorLogic(object):
             if props.reply_to is not None:
                 self.amqp.publish_to_queue(queue_name=props.reply_to,
                                            casas_object=response,
-                                           correlation_id=props.correlation_id)
+                                           correlation_id=props.correlation_id,
+                                           content_type=self.amqp.get_reply_content_type(props))
 
                 self._reset_timeout()
 
@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+# ************************************************************************************************ #
+# **                                                                                            ** #
+# **    AIQ-SAIL-ON TA2 Client Core Logic for asyncio                                           ** #
+# **                                                                                            ** #
+# **        Brian L Thomas, 2020                                                                ** #
+# **                                                                                            ** #
+# **  Tools by the AI Lab - Artificial Intelligence Quotient (AIQ) in the School of Electrical  ** #
+# **  Engineering and Computer Science at Washington State University.                          ** #
+# **                                                                                            ** #
+# **  Copyright Washington State University, 2020                                               ** #
+# **  Copyright Brian L. Thomas, 2020                                                           ** #
+# **                                                                                            ** #
+# **  All rights reserved                                                                       ** #
+# **  Modification, distribution, and sale of this work is prohibited without permission from   ** #
+# **  Washington State University.                                                              ** #
+# **                                                                                            ** #
+# **  Contact: Brian L. Thomas (bthomas1@wsu.edu)                                               ** #
+# **  Contact: Larry Holder (holder@wsu.edu)                                                    ** #
+# **  Contact: Diane J. Cook (djcook@wsu.edu)                                                   ** #
+# ************************************************************************************************ #
+
+import asyncio
+import copy
+
+from . import rabbitmq
+from . import objects
+from .TA2_logic import TA2Logic
+
+
+class AsyncTA2Logic(TA2Logic):
+    """TA2Logic with coroutine lifecycle hooks.  The AMQP connection runs on its own thread
+    through rabbitmq.AsyncConnection, so the hooks can await model inference, a UI or other I/O
+    without starving the connection heartbeats.  Subclasses implement the same hooks as
+    TA2Logic, but as `async def`.
+
+    Setting [sail-on] concurrent_trials to N > 1 works on N trials of the experiment at once, each
+    in its own RPC session with its own TA1.  Every session runs the hooks on a shallow copy of
+    this object, so attributes assigned during a trial stay with that trial while anything loaded
+    beforehand (such as the model) is shared.
+
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._concurrent_trials = 1
+        if self._config.has_option('sail-on', 'concurrent_trials'):
+            self._concurrent_trials = self._config.getint('sail-on', 'concurrent_trials')
+        if self._concurrent_trials > 1 and (self._experiment_secret is None or self._no_testing):
+            raise objects.AiqDataException('You cannot run concurrent trials without providing '
+                                           'the experiment_secret in the config.')
+        return
+
+    def _build_connection(self):
+        return rabbitmq.AsyncConnection(connection=super()._build_connection())
+
+    def _create_trial_worker(self, worker_number: int):
+        worker = copy.copy(self)
+        worker.log = self.log.getChild('worker{}'.format(worker_number))
+        worker._amqp = self._build_connection()
+        worker.end_experiment_early = False
+        return worker
+
+    async def _run_trial_worker(self, model: objects.Model, generator_config: dict):
+        try:
+            await self._amqp.run()
+            my_experiment = await self._amqp.start_work_on_experiment_trials(
+                model=model,
+                experiment_secret=self._experiment_secret,
+                just_one_trial=self._just_one_trial,
+                domain=self._sail_on_domain,
+                generator_config=generator_config)
+            if isinstance(my_experiment, objects.CasasResponse):
+                if my_experiment.status == 'error':
+                    for casas_error in my_experiment.error_list:
+                        self.log.error(casas_error.message)
+                        self.log.error(str(casas_error.error_dict))
+            else:
+                await self._run_jump_to_sail_on_testing()
+        except objects.AiqExperimentException as e:
+            self.log.error(e.value)
+        finally:
+            # Whatever stopped the worker, its connection and thread are closed.
+            await self._stop()
+        return
+
+    async def _run_concurrent_trials(self, model: objects.Model, generator_config: dict):
+        workers = list([self._create_trial_worker(worker_number=i)
+                        for i in range(self._concurrent_trials)])
+        results = await asyncio.gather(
+            *[worker._run_trial_worker(model=model, generator_config=generator_config)
+              for worker in workers],
+            return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                self.log.error('Trial worker failed: {}'.format(result))
+        return
+
+    async def _run_sail_on_trial(self):
+        # We already called the trial start function with the trial number.
+
+        # Reset the model to the saved state.
+        await self.reset_model(filename=self._model_filename)
+
+        # Expect to receive TestingStart.
+        my_state = await self._amqp.get_state()
+        if isinstance(my_state, objects.TestingStart):
+            # We have receive an objects.TestingStart.
+            await self.testing_start()
+
+            # Get the next state, should be Testing Episode Start.
+            my_state = await self._amqp.get_state()
+
+            # Iterate over episodes.
+            while isinstance(my_state, objects.TestingEpisodeStart):
+                # We just received an objects.TestingEpisodeStart.
+                await self.testing_episode_start(episode_number=my_state.episode_number)
+
+                # Collect testing data until we get TestingEpisodeEnd.
+                test_data = None
+                while not isinstance(my_state, objects.TestingEpisodeEnd):
+                    # Get testing data, unless the last TestingDataAck already carried it.
+                    if test_data is None:
+                        test_data = await self._amqp.get_testing_data()
+
+                    # Decompress the image if there is one.
+                    self._unpack_image(feature_vector=test_data.feature_vector)
+
+                    # Evaluate the testing data.
+                    label_prediction = \
+                        await self.testing_instance(feature_vector=test_data.feature_vector,
+                                                    novelty_indicator=test_data.novelty_indicator)
+
+                    # Send the prediction and update my_state, expecting TestingDataAck until
+                    # the training episode is over.
+                    my_state = await self._amqp.send_testing_predictions(
+                        label_prediction=label_prediction,
+                        end_early=self.end_experiment_early,
+                        request_next=self._amqp_pipeline)
+                    test_data = None
+                    if isinstance(my_state, objects.TestingDataAck):
+                        await self.testing_performance(performance=my_state.performance,
+                                                       feedback=my_state.feedback)
+                        test_data = my_state.testing_data
+
+                # We are done with the training episode.
+                if isinstance(my_state, objects.TestingEpisodeEnd):
+                    novelty_probability, novelty_threshold, novelty, novelty_characterization = \
+                        await self.testing_episode_end(performance=my_state.performance,
+                                                       feedback=my_state.feedback)
+                    my_state = await self._amqp.send_testing_episode_novelty(
+                        novelty_characterization=novelty_characterization,
+                        novelty_probability=novelty_probability,
+                        novelty_threshold=novelty_threshold,
+                        novelty=novelty)
+
+                self.log.debug(str(my_state))
+
+                # Find out if we have another episode or if the trial is over.
+                my_state = await self._amqp.get_state()
+
+        if isinstance(my_state, objects.TestingEnd):
+            # We have received an objects.TestingEnd.
+            await self.testing_end()
+
+            # Next we should receive an objects.TrialEnd.
+            while not isinstance(my_state, objects.TrialEnd):
+                my_state = await self._amqp.get_state()
+
+        # We have received an objects.TrialEnd.
+        await self.trial_end()
+        return
+
+    async def _run_sail_on_experiment(self):
+        my_state = await self._amqp.get_state()
+        if isinstance(my_state, objects.BenchmarkRequest):
+            benchmark_data = self._get_benchmark_data()
+            my_state = await self._amqp.send_benchmark_data(benchmark_data=benchmark_data)
+
+        # Wait until we are ready to start experiment.
+        while not isinstance(my_state, objects.ExperimentStart):
+            my_state = await self._amqp.get_state()
+
+        # We have received objects.ExperimentStart.
+        await self.experiment_start()
+
+        # Experiment has started, now look for TrainingStart.
+        while not isinstance(my_state, objects.TrainingStart):
+            my_state = await self._amqp.get_state()
+
+        # We have received objects.TrainingStart.
+        await self.training_start()
+
+        my_state = await self._amqp.get_state()
+
+        # Iterate over episodes.
+        while isinstance(my_state, objects.TrainingEpisodeStart):
+            # We have received objects.TrainingEpisodeStart.
+            await self.training_episode_start(episode_number=my_state.episode_number)
+
+            # Collect training data until we get TrainingEpisodeEnd
+            while not isinstance(my_state, objects.TrainingEpisodeEnd):
+                # Get training data.
+                training_data = await self._amqp.get_training_data()
+
+                # Decompress the image if there is one.
+                self._unpack_image(feature_vector=training_data.feature_vector)
+                # Handle the training data.
+                label_prediction = \
+                    await self.training_instance(feature_vector=training_data.feature_vector,
+                                                 feature_label=training_data.feature_label)
+
+                # Send the prediction and update my_state, expecting TrainingDataAck until
+                # the training episode is over.
+                my_state = await self._amqp.send_training_predictions(
+                    label_prediction=label_prediction,
+                    end_early=self.end_training_early)
+                if isinstance(my_state, objects.TrainingDataAck):
+                    await self.training_performance(performance=my_state.performance,
+                                                    feedback=my_state.feedback)
+
+            if isinstance(my_state, objects.TrainingEpisodeEnd):
+                # We have received objects.TrainingEpisodeEnd.
+                novelty_probability, novelty_threshold, novelty, novelty_characterization = \
+                    await self.training_episode_end(performance=my_state.performance,
+                                                    feedback=my_state.feedback)
+                my_state = await self._amqp.send_training_episode_novelty(
+                    novelty_characterization=novelty_characterization,
+                    novelty_probability=novelty_probability,
+                    novelty_threshold=novelty_threshold,
+                    novelty=novelty)
+
+            self.log.debug(str(my_state))
+
+            # Find out if we are going to start another episode or not.
+            my_state = await self._amqp.get_state()
+
+        # We must have received objects.TrainingEnd.
+        if isinstance(my_state, objects.TrainingEnd):
+            await self.training_end()
+
+            # The connection thread keeps the connection alive while we train, so unlike
+            # TA2Logic there is no need to stop it here.
+            await self.train_model()
+
+            # Save the model to disk.
+            await self.save_model(filename=self._model_filename)
+
+            # Expect to get objects.TrainingModelEnd here.
+            my_state = await self._amqp.get_state()
+
+        await self._run_sail_on_testing()
+        return
+
+    async def _run_jump_to_sail_on_testing(self):
+        self.log.debug('_run_jump_to_sail_on_testing()')
+        my_state = await self._amqp.get_state()
+        self.log.debug(str(my_state))
+        if isinstance(my_state, objects.BenchmarkRequest):
+            benchmark_data = self._get_benchmark_data()
+            my_state = await self._amqp.send_benchmark_data(benchmark_data=benchmark_data)
+            self.log.debug(str(my_state))
+
+        # Wait until we are ready to start experiment.
+        while not isinstance(my_state, objects.ExperimentStart):
+            my_state = await self._amqp.get_state()
+            self.log.info(str(my_state))
+
+        # We have received objects.ExperimentStart.
+        # Be nice and call experiment_start() before we begin jumping into testing.
+        await self.experiment_start()
+
+        await self._run_sail_on_testing()
+        return
+
+    async def _run_sail_on_testing(self):
+        self.log.debug('_run_sail_on_testing()')
+        # Based on which path we took to reach here, the current state must be
+        # objects.ExperimentStart or objects.TrainingModelEnd, the next state should be either
+        # objects.TrialStart or objects.ExperimentEnd.
+        my_state = await self._amqp.get_state()
+        self.log.info(str(my_state))
+
+        # Iterate over the trials we will run.
+        while isinstance(my_state, objects.TrialStart):
+            # We just received an objects.TrialStart.
+            await self.trial_start(trial_number=my_state.trial_number,
+                                   novelty_description=my_state.novelty_description)
+
+            # Run the trial.
+            await self._run_sail_on_trial()
+
+            # Check to see if we get another go at this loop or continue.
+            # This will either be objects.ExperimentEnd of objects.TrialStart.
+            my_state = await self._amqp.get_state()
+            self.log.info(str(my_state))
+
+        # Get Confirmation of ExperimentEnd.
+        while not isinstance(my_state, objects.ExperimentEnd):
+            my_state = await self._amqp.get_state()
+            self.log.info(str(my_state))
+        await self.experiment_end()
+
+        await self._amqp.process_data_events(time_limit=1)
+        return
+
+    async def _run_sail_on(self):
+        try:
+            await self._amqp.run()
+
+            # Build the model.
+            model = objects.Model(model_name=self._model_name,
+                                  organization=self._organization,
+                                  aiq_username=self._aiq_username,
+                                  aiq_secret=self._aiq_secret)
+
+            # Let the user know we are attempting to connect to an available TA1, and we will
+            # wait if one is not available yet.
+            message = ('Attempting to connect to an available TA1, if all are currently busy '
+                       'this will wait in line until one is available.')
+            if self._printout:
+                self.log.info(message)
+            else:
+                print(message)
+
+            generator_config = dict({'episode_seed': self._episode_seed,
+                                     'start_zeroed_out': self._start_zeroed_out,
+                                     'start_world_state': self._start_world_state})
+            # Start a SAIL-ON experiment!
+            if self._experiment_secret is None or self._no_testing:
+                # Based on these variables, we need to start a new experiment.
+                my_experiment = await self._amqp.start_sail_on_experiment(
+                    model=model,
+                    domain=self._sail_on_domain,
+                    no_testing=self._no_testing,
+                    seed=self._seed,
+                    description=self._description,
+                    generator_config=generator_config)
+                self.log.info('experiment is gathering requirements!')
+                # Store the experiment_secret locally.
+                self._experiment_secret = my_experiment.experiment_secret
+                if self._experiment_secret is not None:
+                    # Now we can set the model filename.
+                    self._set_model_filename()
+                    # Set the experiment_secret in the config object.
+                    self._config.set('sail-on', 'experiment_secret', self._experiment_secret)
+                    # Write out the config with the new experiment_secret value.
+                    self._write_config_file()
+
+                    # Run the SAIL-ON experiment!
+                    await self._run_sail_on_experiment()
+            elif self._concurrent_trials > 1:
+                self._set_model_filename()
+                # Claim and run that many trials at once, each worker has its own session.
+                await self._run_concurrent_trials(model=model,
+                                                  generator_config=generator_config)
+            else:
+                self._set_model_filename()
+                # Here we don't need to start a new experiment, just register to work on 1 or
+                # many trials for the given experiment.
+                my_experiment = await self._amqp.start_work_on_experiment_trials(
+                    model=model,
+                    experiment_secret=self._experiment_secret,
+                    just_one_trial=self._just_one_trial,
+                    domain=self._sail_on_domain,
+                    generator_config=generator_config)
+                if isinstance(my_experiment, objects.CasasResponse):
+                    if my_experiment.status == 'error':
+                        for casas_error in my_experiment.error_list:
+                            self.log.error(casas_error.message)
+                            self.log.error(str(casas_error.error_dict))
+                else:
+                    # We have our response.
+                    # Start working on trials until TA1 tells us the experiment is done, or at
+                    # least we are done with what we requested.
+                    await self._run_jump_to_sail_on_testing()
+
+        except KeyboardInterrupt:
+            await self._stop()
+        except objects.AiqExperimentException as e:
+            self.log.error(e.value)
+            await self._stop()
+        await self._stop()
+        return
+
+    async def run_async(self):
+        """Run the TA2 from a coroutine, for agents that already have an event loop running."""
+        await self._run_sail_on()
+        return
+
+    def run(self):
+        loop = asyncio.get_event_loop()
+        loop.run_until_complete(self.run_async())
+        return
+
+    async def _stop(self):
+        await self._amqp.stop()
+        return
+
+    async def process_amqp_events(self):
+        # The connection thread already does this between calls, this is kept for parity with
+        # TA2Logic.
+        await self._amqp.process_data_events(time_limit=0.5)
+        return
+
+    async def experiment_start(self):
+        """Coroutine version of TA2Logic.experiment_start()."""
+        raise ValueError('experiment_start() not defined.')
+
+    async def training_start(self):
+        """Coroutine version of TA2Logic.training_start()."""
+        raise ValueError('training_start() not defined.')
+
+    async def training_episode_start(self, episode_number: int):
+        """Coroutine version of TA2Logic.training_episode_start()."""
+        raise ValueError('training_episode_start() not defined.')
+
+    async def training_instance(self, feature_vector: dict, feature_label: dict) -> dict:
+        """Coroutine version of TA2Logic.training_instance()."""
+        raise ValueError('training_instance() not defined.')
+
+    async def training_performance(self, performance: float, feedback: dict = None):
+        """Coroutine version of TA2Logic.training_performance()."""
+        raise ValueError('training_performance() not defined.')
+
+    async def training_episode_end(self, performance: float, feedback: dict = None) -> \
+            (float, float, int, dict):
+        """Coroutine version of TA2Logic.training_episode_end()."""
+        raise ValueError('training_episode_end() not defined.')
+
+    async def training_end(self):
+        """Coroutine version of TA2Logic.training_end()."""
+        raise ValueError('training_end() not defined.')
+
+    async def train_model(self):
+        """Coroutine version of TA2Logic.train_model()."""
+        raise ValueError('train_model() not defined.')
+
+    async def save_model(self, filename: str):
+        """Coroutine version of TA2Logic.save_model()."""
+        raise ValueError('save_model() not defined.')
+
+    async def reset_model(self, filename: str):
+        """Coroutine version of TA2Logic.reset_model()."""
+        raise ValueError('reset_model() not defined.')
+
+    async def trial_start(self, trial_number: int, novelty_description: dict):
+        """Coroutine version of TA2Logic.trial_start()."""
+        raise ValueError('trial_start() not defined.')
+
+    async def testing_start(self):
+        """Coroutine version of TA2Logic.testing_start()."""
+        raise ValueError('testing_start() not defined.')
+
+    async def testing_episode_start(self, episode_number: int):
+        """Coroutine version of TA2Logic.testing_episode_start()."""
+        raise ValueError('testing_episode_start() not defined.')
+
+    async def testing_instance(self, feature_vector: dict, novelty_indicator: bool = None) -> dict:
+        """Coroutine version of TA2Logic.testing_instance()."""
+        raise ValueError('testing_instance() not defined.')
+
+    async def testing_performance(self, performance: float, feedback: dict = None):
+        """Coroutine version of TA2Logic.testing_performance()."""
+        raise ValueError('testing_performance() not defined.')
+
+    async def testing_episode_end(self, performance: float, feedback: dict = None) -> \
+            (float, float, int, dict):
+        """Coroutine version of TA2Logic.testing_episode_end()."""
+        raise ValueError('testing_episode_end() not defined.')
+
+    async def testing_end(self):
+        """Coroutine version of TA2Logic.testing_end()."""
+        raise ValueError('testing_end() not defined.')
+
+    async def trial_end(self):
+        """Coroutine version of TA2Logic.trial_end()."""
+        raise ValueError('trial_end() not defined.')
+
+    async def experiment_end(self):
+        """Coroutine version of TA2Logic.experiment_end()."""
+        raise ValueError('experiment_end() not defined.')
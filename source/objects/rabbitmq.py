@@ -22,6 +22,7 @@
 # ** Contact: Brian L. Thomas (bthomas1@wsu.edu)
 # ** Contact: Diane J. Cook (djcook@wsu.edu)
 # *****************************************************************************#
+import asyncio
 import copy
 import datetime
 import json
@@ -29,6 +30,7 @@ import logging
 import logging.handlers
 import pika
 import pytz
+import queue
 import re
 import socket
 import threading
@@ -37,6 +39,93 @@ import uuid
 
 from . import objects
 
+# Message bodies up to this many characters are logged as is, longer ones are summarized.
+LOG_BODY_LIMIT = 256
+_LOG_OBJ_TYPE_PATTERN = re.compile(rb'"obj_type"\s*:\s*"([^"]*)"')
+
+
+def summarize_payload(payload, correlation_id=None, content_type=None, limit=LOG_BODY_LIMIT):
+    """Build a short description of a message body or of the objects built from one, suitable
+    for logging.  Short text bodies are returned as is, anything longer is reduced to its
+    obj_type, size and correlation ID so images are never turned into strings.
+
+    Parameters
+    ----------
+    payload : str|bytes|objects.CasasObject|list
+        The raw message body, a single object, or a list of objects.
+    correlation_id : str, optional
+        The correlation ID of the message to include in the summary.
+    content_type : str, optional
+        The content type of the message body to include in the summary.
+    limit : int, optional
+        Text bodies up to this many characters are returned unchanged.
+
+    Returns
+    -------
+    str
+        The summary of the payload.
+    """
+    if isinstance(payload, (list, tuple)):
+        summary = "[{}]".format(", ".join([_describe_object(obj) for obj in payload]))
+    elif isinstance(payload, (str, bytes, bytearray)):
+        text = payload
+        if isinstance(payload, (bytes, bytearray)):
+            text = None
+            if content_type in [None, objects.CONTENT_TYPE_JSON] \
+                    and not objects.is_binary_frame(payload):
+                try:
+                    text = payload.decode('utf-8')
+                except UnicodeDecodeError:
+                    text = None
+        if text is not None and len(text) <= limit:
+            summary = text
+        else:
+            obj_type = None
+            if content_type in [None, objects.CONTENT_TYPE_JSON]:
+                raw = payload
+                if isinstance(raw, str):
+                    raw = raw.encode('utf-8', 'replace')
+                match = _LOG_OBJ_TYPE_PATTERN.search(raw)
+                if match is not None:
+                    obj_type = match.group(1).decode('utf-8', 'replace')
+            summary = "<obj_type={} size={}>".format(obj_type, len(payload))
+    else:
+        summary = _describe_object(payload)
+    if correlation_id is not None or content_type is not None:
+        summary = "{} corr_id={} content_type={}".format(summary, correlation_id, content_type)
+    return summary
+
+
+def _describe_object(obj):
+    if obj is None:
+        return "None"
+    obj_type = getattr(obj, 'obj_type', None)
+    if obj_type is None:
+        return type(obj).__name__
+    return "{}({})".format(type(obj).__name__, obj_type)
+
+
+class LogSummary(object):
+    """Defers summarize_payload() until a log record is actually emitted, so passing it as a
+    logging argument costs nothing when the log level drops the message.
+
+    """
+
+    __slots__ = ('payload', 'correlation_id', 'content_type', 'limit')
+
+    def __init__(self, payload, correlation_id=None, content_type=None, limit=LOG_BODY_LIMIT):
+        self.payload = payload
+        self.correlation_id = correlation_id
+        self.content_type = content_type
+        self.limit = limit
+        return
+
+    def __str__(self):
+        return summarize_payload(payload=self.payload,
+                                 correlation_id=self.correlation_id,
+                                 content_type=self.content_type,
+                                 limit=self.limit)
+
 
 class ConsumeCallback(object):
     """This is a helper class for subscribing to RabbitMQ exchanges and queues then using
@@ -136,12 +225,14 @@ class ConsumeCallback(object):
         body : str|unicode
             The message body.
         """
-        self.log.debug("on_message({})".format(str(body)))
+        self.log.debug("on_message(%s)", LogSummary(body,
+                                                    correlation_id=properties.correlation_id,
+                                                    content_type=properties.content_type))
 
         if self.casas_events:
-            obj = objects.build_objects_from_json(body)
-            self.log.debug("obj = {}".format(str(obj)))
-            self.log.debug("size of obj = {}".format(str(len(obj))))
+            obj = objects.build_objects_from_json(body, content_type=properties.content_type)
+            self.log.debug("obj = %s", LogSummary(obj))
+            self.log.debug("size of obj = %d", len(obj))
             if len(obj) > 0:
                 if self.callback_full_params:
                     self.callback_function(channel, basic_deliver, properties, body, obj[0])
@@ -174,7 +265,8 @@ class Connection:
 
     def __init__(self, agent_name, amqp_user, amqp_pass, amqp_host, amqp_port,
                  amqp_vhost='/', amqp_ssl=True, translations=None,
-                 timezone=None, request_timeout=None):
+                 timezone=None, request_timeout=None, binary_transport=False,
+                 wire_codec=None):
         """
         Create a new instance of the CASAS RammitMQ Connection class.
 
@@ -202,6 +294,15 @@ class Connection:
             Assumes all sites are 'America/Los_Angeles' unless given in dict().
         request_timeout : int,optional
             An integer of the global timeout to use.
+        binary_transport : bool,optional
+            When True, raw bytes values (such as images) are sent as binary frames instead of
+            base64 strings in JSON to any peer that says it can read them, and our own requests
+            tell the peer that we can read them.  The default value is False.
+        wire_codec : str,optional
+            The name of a compact codec from objects.WIRE_CODECS ('msgpack' or 'cbor') to
+            negotiate with peers, it is preferred over binary frames and JSON.  If the codec
+            package is not installed a warning is logged and it is not offered.  The default
+            value is None, which only uses JSON (and binary frames if enabled).
         """
         self.name = re.sub('\s', '', str(agent_name))
         self.log = logging.getLogger(__name__).getChild('Connection')
@@ -262,6 +363,20 @@ class Connection:
         self._request_timeout = objects.GLOBAL_TIMEOUT_SECONDS
         if request_timeout is not None:
             self._request_timeout = request_timeout
+        # The content types we can read, in order of preference, JSON is always implied.
+        self._accept_content_types = list()
+        if wire_codec is not None and wire_codec != objects.WIRE_CODEC_JSON:
+            content_type = objects.WIRE_CODECS.get(wire_codec, None)
+            if content_type in objects.available_content_types():
+                self._accept_content_types.append(content_type)
+            else:
+                self.log.warning('Wire codec {} is not available, falling back to JSON.'.format(
+                    str(wire_codec)))
+        if binary_transport:
+            self._accept_content_types.append(objects.CONTENT_TYPE_BINARY_FRAME)
+        # [queue_name] = the content type to send requests to that queue with, negotiated from
+        # the accept header on the replies that came back from it.
+        self._request_content_types = dict()
 
         self._url = "{}{}:{}@{}:{}{}".format(str(self.amqp_url_start),
                                              str(self.amqp_user),
@@ -694,16 +809,20 @@ class Connection:
                                             client_callback_queue=self._client_rpc_queue)
         return response
 
-    def send_testing_predictions(self, label_prediction: dict, end_early: bool = False):
+    def send_testing_predictions(self, label_prediction: dict, end_early: bool = False,
+                                 request_next: bool = False):
         self.log.debug('send_testing_predictions()')
 
         if self._server_experiment_rpc_queue is None:
             raise objects.CasasRabbitMQException('You have not established an experiment yet!')
 
+        # With request_next the TestingDataAck also carries the next TestingData, which saves
+        # the get_testing_data() round trip for the next step.
         testing_prediction = objects.TestingDataPrediction(
             secret=self._model_experiment_secret,
             label_prediction=label_prediction,
-            end_early=end_early)
+            end_early=end_early,
+            request_next=request_next)
 
         response = self._set_system_request(casas_object=testing_prediction,
                                             queue_name=self._server_experiment_rpc_queue,
@@ -792,7 +911,8 @@ class Connection:
                     raise objects.AiqExperimentException('Server took too long to respond.')
             corr_id = str(uuid.uuid4())
             if client_callback_queue is None:
-                callback_queue = 'rpc.system.request.{}'.format(str(uuid.uuid4().hex))
+                # Use RabbitMQ direct reply-to rather than a new exclusive queue per request.
+                callback_queue = objects.DIRECT_REPLY_TO_QUEUE
             else:
                 callback_queue = client_callback_queue
             try:
@@ -801,21 +921,12 @@ class Connection:
                 self._on_request_callbacks[corr_id]['queue'] = callback_queue
                 self._on_request_callbacks[corr_id]['corr_id'] = corr_id
                 self._on_request_callbacks[corr_id]['publish_queue'] = queue_name
-                self._on_request_callbacks[corr_id]['keep_queue'] = True
                 if client_callback_queue is None:
-                    self._on_request_callbacks[corr_id]['keep_queue'] = False
-                    # Subscribe to the callback queue.
-                    self.setup_subscribe_to_queue(
-                        queue_name=callback_queue,
-                        queue_exclusive=True,
-                        queue_auto_delete=True,
-                        casas_events=True,
-                        callback_function=self.process_system_request_callback,
-                        callback_full_params=True)
+                    self._setup_direct_reply_to()
 
                 self._request_response[corr_id] = None
 
-                # Declare the queue we are going to publish to.
+                # Declare the queue we are going to publish to, this is only done once.
                 if declare_server_queue:
                     self.setup_publish_to_queue(queue_name=queue_name,
                                                 queue_durable=True,
@@ -832,31 +943,67 @@ class Connection:
                                       delivery_mode=1,
                                       key=key,
                                       secret=secret,
-                                      reply_to=callback_queue)
-
-                if disable_timeout:
-                    while self._request_response[corr_id] is None:
-                        self.process_data_events(time_limit=0.02)
-                    response = copy.deepcopy(self._request_response[corr_id])
-                    del self._request_response[corr_id]
-                else:
-                    while self._request_response[corr_id] is None and \
-                            abs(float(time.time()) - start_time) < max_time_delta:
-                        self.process_data_events(time_limit=0.05)
-                    if self._request_response[corr_id] is not None:
-                        response = copy.deepcopy(self._request_response[corr_id])
-                        del self._request_response[corr_id]
+                                      reply_to=callback_queue,
+                                      content_type=self._request_content_types.get(queue_name,
+                                                                                   None))
+
+                deadline = None
+                if not disable_timeout:
+                    deadline = start_time + max_time_delta
+                if self._wait_for_response(corr_id=corr_id, deadline=deadline):
+                    # The response was built for this request only, so hand it over as is.
+                    response = self._request_response.pop(corr_id)
             except pika.exceptions.AMQPError:
                 self.log.error('_set_system_request(): pika.exceptions.AMQPError '
                                'AMQP failed, trying again.')
                 self.stop()
                 time.sleep(1)
                 self.run(timeout=max_time_delta)
-                if client_callback_queue is None:
-                    self.remove_subscribe_to_queue(callback_queue)
         self._waiting_on_request = False
         return response
 
+    def _setup_direct_reply_to(self):
+        """Start consuming from the direct reply-to pseudo queue if we are not already, the
+        consumer lasts for the life of the channel and is set up again after a reconnect.
+        """
+        for qu in self._queues_subscribe:
+            if qu['queue_name'] == objects.DIRECT_REPLY_TO_QUEUE:
+                return
+        # Direct reply-to must not be declared and must be consumed in auto-ack mode.
+        self.setup_subscribe_to_queue(queue_name=objects.DIRECT_REPLY_TO_QUEUE,
+                                      queue_declare=False,
+                                      casas_events=True,
+                                      callback_function=self.process_system_request_callback,
+                                      auto_ack=True,
+                                      callback_full_params=True)
+        return
+
+    def _wait_for_response(self, corr_id, deadline=None):
+        """Block on the connection until the response for corr_id has been delivered.  Each
+        process_data_events() call returns as soon as the broker delivers something, so the
+        response is handled when it lands rather than on the next polling tick.
+
+        Parameters
+        ----------
+        corr_id : str
+            The correlation ID of the request in _request_response.
+        deadline : float, optional
+            The epoch time to stop waiting at, None waits until the response arrives.
+
+        Returns
+        -------
+        bool
+            True if the response arrived before the deadline.
+        """
+        while self._request_response[corr_id] is None:
+            time_limit = None
+            if deadline is not None:
+                time_limit = deadline - float(time.time())
+                if time_limit <= 0:
+                    break
+            self.process_data_events(time_limit=time_limit)
+        return self._request_response[corr_id] is not None
+
     def process_system_request_callback(self, ch, method, props, body, response):
         """This is a callback function for processing the response to the getting or setting of a
         system request type object.
@@ -875,17 +1022,20 @@ class Connection:
             A list of processed casas.objects that have been built from the JSON provided in
             the message body.
         """
-        self.log.info('process_system_request_callback( {} )'.format(body))
+        self.log.debug('process_system_request_callback( %s )',
+                       LogSummary(body, correlation_id=props.correlation_id,
+                                  content_type=props.content_type))
         corr_id = props.correlation_id
         if corr_id in self._on_request_callbacks:
-            # Remove our publish to the queue.
-            self.remove_publish_to_queue(self._on_request_callbacks[corr_id]['publish_queue'])
-            if not self._on_request_callbacks[corr_id]['keep_queue']:
-                # Remove our subscription to the callback queue.
-                self.remove_subscribe_to_queue(self._on_request_callbacks[corr_id]['queue'])
-
+            # Later requests to the same queue use the codec its replies say it accepts.
+            publish_queue = self._on_request_callbacks[corr_id]['publish_queue']
+            self._request_content_types[publish_queue] = self.get_reply_content_type(props)
+            # The publish queue and callback queue stay declared for the next request.
             if isinstance(response, (objects.TrainingData, objects.TestingData)):
                 self._local_epoch_received = response.utc_remote_epoch_received
+            elif isinstance(response, objects.TestingDataAck) \
+                    and response.testing_data is not None:
+                self._local_epoch_received = response.testing_data.utc_remote_epoch_received
             elif isinstance(response, objects.ExperimentResponse):
                 self._request_timeout = response.experiment_timeout
                 self._model_experiment_id = response.model_experiment_id
@@ -904,8 +1054,7 @@ class Connection:
             # entry from our dict().
             del self._on_request_callbacks[corr_id]
             self._request_response[corr_id] = response
-            self.log.info('_request_response[{}] = {}'.format(corr_id,
-                                                              self._request_response[corr_id]))
+            self.log.debug('_request_response[%s] = %s', corr_id, LogSummary(response))
         return
 
     def request_dataset(self, site, start_stamp, end_stamp, experiment, dataset, key, secret,
@@ -1156,8 +1305,7 @@ class Connection:
                               secret=secret,
                               reply_to=callback_queue)
 
-        while self._request_response[corr_id] is None:
-            self._connection.process_data_events(time_limit=0.05)
+        self._wait_for_response(corr_id=corr_id)
         return
 
     def process_request_events_callback(self, ch, method, props, body, response):
@@ -1178,7 +1326,7 @@ class Connection:
             A list of processed casas.objects that have been built from the JSON provided in
             the message body.
         """
-        self.log.debug("process_request_events_callback({})".format(str(response)))
+        self.log.debug("process_request_events_callback(%s)", LogSummary(response))
         corr_id = props.correlation_id
         if corr_id in self._on_request_events:
             # If the request dict included a callback function in the request, then send the list
@@ -1453,7 +1601,7 @@ class Connection:
     def setup_subscribe_to_queue(self, queue_name, queue_durable=False, queue_exclusive=False,
                                  queue_auto_delete=False, casas_events=True, callback_function=None,
                                  limit_to_sensor_types=None, auto_ack=False,
-                                 callback_full_params=False, manual_ack=False):
+                                 callback_full_params=False, manual_ack=False, queue_declare=True):
         """This function sets up a subscription to events from a queue.
 
         Parameters
@@ -1483,6 +1631,10 @@ class Connection:
             ack.  This variable is overridden to False if auto_ack is True or if
             callback_full_params is False (as you need those to send the ack).  The default value
             is False.
+        queue_declare : bool, optional
+            Boolean defining if the queue is declared before consuming, set this to False for
+            server named pseudo queues such as objects.DIRECT_REPLY_TO_QUEUE.  The default value
+            is True.
         """
         if callback_function is None:
             self.log.error("casas.rabbitmq.Connection.setup_subscribe_to_queue(): "
@@ -1494,6 +1646,7 @@ class Connection:
         new_sub['queue_durable'] = queue_durable
         new_sub['queue_exclusive'] = queue_exclusive
         new_sub['queue_auto_delete'] = queue_auto_delete
+        new_sub['queue_declare'] = queue_declare
         new_sub['casas_events'] = casas_events
         new_sub['callback_function'] = callback_function
         new_sub['callback_full_params'] = callback_full_params
@@ -1565,6 +1718,10 @@ class Connection:
         delivery_mode : int
             Integer defining the delivery method for RabbitMQ.
         """
+        for qu in self._queues_publish:
+            if qu['queue_name'] == queue_name:
+                # Already declared, or it will be again when we reconnect.
+                return
         new_pub = dict()
         new_pub['queue_name'] = queue_name
         new_pub['queue_durable'] = queue_durable
@@ -1786,11 +1943,12 @@ class Connection:
         """
         try:
             if not qu['setup_queue'] and self._connection.is_open:
-                self.log.info('Declaring queue %s', qu['queue_name'])
-                self._channel.queue_declare(queue=qu['queue_name'],
-                                            durable=qu['queue_durable'],
-                                            exclusive=qu['queue_exclusive'],
-                                            auto_delete=qu['queue_auto_delete'])
+                if qu.get('queue_declare', True):
+                    self.log.info('Declaring queue %s', qu['queue_name'])
+                    self._channel.queue_declare(queue=qu['queue_name'],
+                                                durable=qu['queue_durable'],
+                                                exclusive=qu['queue_exclusive'],
+                                                auto_delete=qu['queue_auto_delete'])
                 qu['setup_queue'] = True
                 if 'consume' in qu:
                     # self._channel.basic_qos(prefetch_count=0)
@@ -1855,14 +2013,16 @@ class Connection:
             if casas_object is not None:
                 body_str = casas_object.get_json(secret=secret, key=key)
                 body_str = "[{}]".format(body_str)
-            debug_msg = "publish_to_exchange(exchange={}, ".format(str(exchange_name))
-            debug_msg += "casas_obj={}, body={}, routing_key={}, ".format(str(casas_object),
-                                                                          str(body_str),
-                                                                          str(routing_key))
-            debug_msg += "corr_id={}, key={}, secret={})".format(str(correlation_id),
-                                                                 str(key),
-                                                                 str(secret))
-            self.log.debug(debug_msg)
+            if self.log.isEnabledFor(logging.DEBUG):
+                debug_msg = "publish_to_exchange(exchange={}, ".format(str(exchange_name))
+                debug_msg += "casas_obj={}, body={}, routing_key={}, ".format(
+                    summarize_payload(casas_object),
+                    summarize_payload(body_str),
+                    str(routing_key))
+                debug_msg += "corr_id={}, key={}, secret={})".format(str(correlation_id),
+                                                                     str(key),
+                                                                     str(secret))
+                self.log.debug(debug_msg)
             self._channel.basic_publish(exchange=exchange_name,
                                         routing_key=routing_key,
                                         properties=pika.BasicProperties(
@@ -1874,7 +2034,7 @@ class Connection:
 
     def publish_to_queue(self, queue_name, casas_object=None, body_str=None,
                          correlation_id=None, delivery_mode=2, key=None,
-                         secret=None, reply_to=None):
+                         secret=None, reply_to=None, content_type=None):
         """Publish a message to the queue.
 
         Parameters
@@ -1899,31 +2059,83 @@ class Connection:
         reply_to : str, optional
             This is the name of the exclusive queue that the RPC style call on the other end
             should publish the response to.
+        content_type : str, optional
+            One of the objects.CONTENT_TYPE_* values to encode casas_object with when it is an
+            objects.AiqObject.  Use get_reply_content_type() on the request properties to decide
+            this when replying.  The default value is None, which sends JSON.
         """
         if correlation_id is None:
             correlation_id = str(uuid.uuid4())
 
         if self._channel:
             if casas_object is not None:
-                body_str = casas_object.get_json(secret=secret, key=key)
-                body_str = "[{}]".format(body_str)
-            debug_msg = "publish_to_queue(queue={}, ".format(str(queue_name))
-            debug_msg += "casas_obj={}, body={}, corr_id={}, ".format(str(casas_object),
-                                                                      str(body_str),
-                                                                      str(correlation_id))
-            debug_msg += "del_mode={}, key={}, secret={})".format(str(delivery_mode),
-                                                                  str(key),
-                                                                  str(secret))
-            self.log.debug(debug_msg)
+                if content_type not in [None, objects.CONTENT_TYPE_JSON] \
+                        and isinstance(casas_object, objects.AiqObject):
+                    body_str = casas_object.get_encoded(content_type=content_type)
+                else:
+                    content_type = objects.CONTENT_TYPE_JSON
+                    body_str = casas_object.get_json(secret=secret, key=key)
+                    body_str = "[{}]".format(body_str)
+            if self.log.isEnabledFor(logging.DEBUG):
+                debug_msg = "publish_to_queue(queue={}, ".format(str(queue_name))
+                debug_msg += "casas_obj={}, body={}, corr_id={}, ".format(
+                    summarize_payload(casas_object),
+                    summarize_payload(body_str, content_type=content_type),
+                    str(correlation_id))
+                debug_msg += "del_mode={}, key={}, secret={})".format(str(delivery_mode),
+                                                                      str(key),
+                                                                      str(secret))
+                self.log.debug(debug_msg)
+            if not isinstance(body_str, bytes):
+                body_str = str(body_str)
             self._channel.basic_publish(exchange='',
                                         routing_key=queue_name,
                                         properties=pika.BasicProperties(
+                                            content_type=content_type,
                                             correlation_id=correlation_id,
                                             delivery_mode=delivery_mode,
-                                            reply_to=reply_to),
-                                        body=str(body_str))
+                                            reply_to=reply_to,
+                                            headers=self._get_publish_headers()),
+                                        body=body_str)
         return
 
+    def _get_publish_headers(self):
+        """Build the AMQP headers to attach to messages we publish.
+
+        Returns
+        -------
+        dict|None
+        """
+        if len(self._accept_content_types) > 0:
+            return dict({objects.AMQP_HEADER_ACCEPT: ','.join(self._accept_content_types)})
+        return None
+
+    def get_reply_content_type(self, properties):
+        """Negotiate the content type to use when replying to a request.
+
+        Parameters
+        ----------
+        properties : pika.Spec.BasicProperties
+            The properties of the request being responded to.
+
+        Returns
+        -------
+        str
+            The first content type the requester listed that this connection also accepts, or
+            objects.CONTENT_TYPE_JSON if there are none in common.
+        """
+        if properties is None or properties.headers is None:
+            return objects.CONTENT_TYPE_JSON
+        accept = properties.headers.get(objects.AMQP_HEADER_ACCEPT, None)
+        if accept is None:
+            return objects.CONTENT_TYPE_JSON
+        if isinstance(accept, bytes):
+            accept = accept.decode('utf-8')
+        for content_type in str(accept).split(','):
+            if content_type.strip() in self._accept_content_types:
+                return content_type.strip()
+        return objects.CONTENT_TYPE_JSON
+
     def _add_on_cancel_callback(self):
         """Add a callback that will be invoked if RabbitMQ cancels the consumer
         for some reason. If RabbitMQ does cancel the consumer,
@@ -2234,3 +2446,139 @@ class Connection:
             The current connection state.
         """
         return self._connection.is_closing
+
+
+class AsyncConnection(object):
+    """Runs a Connection on its own thread so it can be awaited from asyncio coroutines.  The
+    blocking pika connection is only ever touched from that thread, which processes data events
+    whenever no call is waiting so heartbeats keep flowing while the coroutines are busy.
+
+    """
+
+    def __init__(self, connection: Connection, idle_time_limit=0.2):
+        """Initialize the AsyncConnection.
+
+        Parameters
+        ----------
+        connection : Connection
+            The Connection to run, it must not be used directly once this has started.
+        idle_time_limit : float, optional
+            How long the connection thread waits for a call before it processes data events.
+        """
+        self.log = logging.getLogger(__name__).getChild('AsyncConnection')
+        self.connection = connection
+        self._idle_time_limit = idle_time_limit
+        self._calls = queue.Queue()
+        self._loop = None
+        self._thread = None
+        self._done = False
+        self._is_running = False
+        return
+
+    def start(self):
+        """Start the connection thread, this must be called from the event loop that will await
+        this object.
+        """
+        if self._thread is None:
+            self._loop = asyncio.get_event_loop()
+            self._done = False
+            self._thread = threading.Thread(target=self._run_thread,
+                                            name='AsyncConnection',
+                                            daemon=True)
+            self._thread.start()
+        return
+
+    def _run_thread(self):
+        while not self._done:
+            try:
+                function, kwargs, future = self._calls.get(block=True,
+                                                           timeout=self._idle_time_limit)
+            except queue.Empty:
+                if self._is_running:
+                    # Keep heartbeats and deliveries flowing between calls.
+                    try:
+                        self.connection.process_data_events()
+                    except pika.exceptions.AMQPError as err:
+                        self.log.error('AMQPError while idle: {}'.format(err))
+                continue
+            try:
+                result = function(**kwargs)
+            except Exception as err:
+                self._loop.call_soon_threadsafe(self._set_future, future, None, err)
+            else:
+                self._loop.call_soon_threadsafe(self._set_future, future, result, None)
+        return
+
+    @staticmethod
+    def _set_future(future, result, error):
+        if future.cancelled():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+        return
+
+    async def _call(self, function, **kwargs):
+        self.start()
+        future = self._loop.create_future()
+        self._calls.put((function, kwargs, future))
+        return await future
+
+    async def run(self, **kwargs):
+        """Connect to RabbitMQ, see Connection.run()."""
+        result = await self._call(self.connection.run, **kwargs)
+        self._is_running = True
+        return result
+
+    async def stop(self):
+        """Close the connection to RabbitMQ and end the connection thread."""
+        self._is_running = False
+        try:
+            result = await self._call(self.connection.stop)
+        finally:
+            # The thread ends even if closing a broken connection failed.
+            self._done = True
+            if self._thread is not None:
+                await self._loop.run_in_executor(None, self._thread.join)
+                self._thread = None
+        return result
+
+    async def process_data_events(self, time_limit=0):
+        return await self._call(self.connection.process_data_events, time_limit=time_limit)
+
+    async def get_state(self):
+        return await self._call(self.connection.get_state)
+
+    async def start_sail_on_experiment(self, **kwargs):
+        return await self._call(self.connection.start_sail_on_experiment, **kwargs)
+
+    async def start_work_on_experiment_trials(self, **kwargs):
+        return await self._call(self.connection.start_work_on_experiment_trials, **kwargs)
+
+    async def send_benchmark_data(self, **kwargs):
+        return await self._call(self.connection.send_benchmark_data, **kwargs)
+
+    async def get_training_data(self):
+        return await self._call(self.connection.get_training_data)
+
+    async def send_training_predictions(self, **kwargs):
+        return await self._call(self.connection.send_training_predictions, **kwargs)
+
+    async def send_training_episode_novelty(self, **kwargs):
+        return await self._call(self.connection.send_training_episode_novelty, **kwargs)
+
+    async def end_training_early(self):
+        return await self._call(self.connection.end_training_early)
+
+    async def get_testing_data(self):
+        return await self._call(self.connection.get_testing_data)
+
+    async def send_testing_predictions(self, **kwargs):
+        return await self._call(self.connection.send_testing_predictions, **kwargs)
+
+    async def send_testing_episode_novelty(self, **kwargs):
+        return await self._call(self.connection.send_testing_episode_novelty, **kwargs)
+
+    async def end_experiment(self):
+        return await self._call(self.connection.end_experiment)